@@ -0,0 +1,49 @@
+"""Import time budget of the command line entry point
+
+    python -m benchmarks.import_budget            # exits with 1 when `import main` is over budget
+    python -m benchmarks.import_budget --module services.job_analysis --budget-ms 2000
+
+launchd/cron run main.py often and most runs have little to do, so `import main` must not pull in the heavy
+packages - they're imported by the commands that need them.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+IMPORT_BUDGET_MS = 150
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "jobspy", "openpyxl", "pync", "keyring", "rapidfuzz", "rank_bm25",
+                 "flask"]
+
+
+def measure_import(module: str = "main") -> tuple[float, list[str]]:
+    """milliseconds it takes a fresh interpreter to import module (python -X importtime, so the interpreter
+    startup isn't counted) and the heavy modules that got imported with it"""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                          text=True, check=True)
+    # "import time: self [us] | cumulative | imported package", the module itself is the last top level line
+    cumulative_us = next(int(line.split("|")[1]) for line in reversed(proc.stderr.splitlines())
+                         if line.startswith("import time:") and line.split("|")[2].strip() == module)
+    heavy = [name for name in proc.stdout.strip().split(",") if name]
+    return cumulative_us / 1000, heavy
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of a module against a budget")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="the best run is compared to the budget")
+    args = parser.parse_args(argv)
+
+    results = [measure_import(args.module) for _ in range(args.runs)]
+    best_ms = min(ms for ms, _ in results)
+    heavy = results[0][1]
+    print(f"[import budget] {args.module}: {best_ms:.1f}ms (budget {args.budget_ms:.0f}ms), "
+          f"heavy modules: {', '.join(heavy) or 'none'}")
+    return 0 if best_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Benchmark of the scoring pipeline stages on the a.csv postings
+
+    python -m benchmarks.scoring_benchmark --scale 10000 --output bench.json
+    python -m benchmarks.scoring_benchmark --baseline bench.json   # exits with 1 if a stage got slower
+
+--scale synthesizes a bigger corpus by mixing lines of the real postings, so it still looks like real descriptions
+(and the matcher caches don't get a free ride from exact copies).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from config.job_scoring_config import KEYWORDS_CONFIG
+from models.job import Job
+from services.create_report import write_report
+from services.job_analysis import score_job_description, split_sections, keyword_hits, bm25f_score, \
+    parse_description, score_jobs_batch, positive_terms
+
+CORPUS_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "a.csv")
+PER_JOB_STAGES = ["split_sections", "keyword_hits", "parse_description", "bm25f_score", "score_job_description"]
+BATCH_STAGES = ["score_jobs_batch", "create_report"]
+
+
+def load_corpus(file_path: str = None) -> list[str]:
+    jobs_data = pd.read_csv(file_path or CORPUS_FILE_PATH, usecols=["description"])
+    return [desc for desc in jobs_data["description"] if isinstance(desc, str)]
+
+
+def synthesize_corpus(descriptions: list[str], size: int, seed: int = 0) -> list[str]:
+    """size descriptions made of a random real posting where about a third of the lines are swapped with lines
+    of other postings"""
+    if size <= len(descriptions):
+        return descriptions[:size]
+
+    rng = random.Random(seed)
+    lines_by_desc = [desc.splitlines() for desc in descriptions]
+    all_lines = [line for lines in lines_by_desc for line in lines if line.strip()]
+    corpus = list(descriptions)
+    while len(corpus) < size:
+        lines = list(rng.choice(lines_by_desc))
+        for idx in range(len(lines)):
+            if rng.random() < 0.3:
+                lines[idx] = rng.choice(all_lines)
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def _latency_stats(samples: list[float]) -> dict:
+    arr = np.array(samples) * 1000
+    total = float(arr.sum()) / 1000
+    return {
+        "count": len(samples),
+        "total_s": total,
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p90_ms": float(np.percentile(arr, 90)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "max_ms": float(arr.max()),
+        "jobs_per_s": len(samples) / total if total else None,
+    }
+
+
+def _peak_memory(func: Callable[[], None]) -> int:
+    """peak bytes python allocated while running func (tracemalloc, so it's only run in its own pass)"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _per_job_funcs() -> dict[str, Callable]:
+    terms = positive_terms(KEYWORDS_CONFIG)
+    return {
+        "split_sections": split_sections,
+        "keyword_hits": lambda desc: keyword_hits(desc, KEYWORDS_CONFIG),
+        "parse_description": parse_description,
+        # bm25f is timed on already parsed descriptions, the parsing is timed by parse_description
+        "bm25f_score": lambda parsed: bm25f_score(parsed, terms),
+        "score_job_description": score_job_description,
+    }
+
+
+def run_benchmark(corpus: list[str], stages: list[str], workers: int = 1, memory: bool = True) -> dict:
+    results = {}
+    funcs = _per_job_funcs()
+    parsed_corpus = None
+
+    for stage in [stage for stage in PER_JOB_STAGES if stage in stages]:
+        func = funcs[stage]
+        if stage == "bm25f_score":
+            parsed_corpus = parsed_corpus or [parse_description(desc) for desc in corpus]
+            inputs = parsed_corpus
+        else:
+            inputs = corpus
+
+        samples = []
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - start)
+        results[stage] = _latency_stats(samples)
+        if memory:
+            results[stage]["peak_bytes"] = _peak_memory(lambda: [func(item) for item in inputs])
+
+    scores = None
+    if "score_jobs_batch" in stages or "create_report" in stages:
+        start = time.perf_counter()
+        scores = score_jobs_batch(corpus, workers=workers)
+        elapsed = time.perf_counter() - start
+        if "score_jobs_batch" in stages:
+            results["score_jobs_batch"] = {"count": len(corpus), "total_s": elapsed, "workers": workers,
+                                           "jobs_per_s": len(corpus) / elapsed if elapsed else None}
+            if memory:
+                results["score_jobs_batch"]["peak_bytes"] = _peak_memory(
+                    lambda: score_jobs_batch(corpus, workers=workers))
+
+    if "create_report" in stages:
+        jobs = [Job(company=f"company {idx % 500}", company_desc=None, employees_num=None, company_url=None,
+                    desc=desc, is_remote=False, level_desc=None, url=f"https://example.com/{idx}", location=None,
+                    title="Python Developer", rating=score.score if score else 0)
+                for idx, (desc, score) in enumerate(zip(corpus, scores))]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "report.xlsx")
+            start = time.perf_counter()
+            write_report(jobs, path)
+            elapsed = time.perf_counter() - start
+            results["create_report"] = {"count": len(jobs), "total_s": elapsed,
+                                        "jobs_per_s": len(jobs) / elapsed if elapsed else None,
+                                        "file_bytes": os.path.getsize(path)}
+            if memory:
+                results["create_report"]["peak_bytes"] = _peak_memory(lambda: write_report(jobs, path))
+
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """stages that got slower than the baseline by more than max_regression (0.2 = 20%)"""
+    regressions = []
+    for stage, stats in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        # per job stages compare the median latency, batch stages the throughput
+        if "p50_ms" in stats:
+            if base.get("p50_ms") and stats["p50_ms"] > base["p50_ms"] * (1 + max_regression):
+                regressions.append(f"{stage}: p50_ms {base['p50_ms']:.3f} -> {stats['p50_ms']:.3f}")
+        elif base.get("jobs_per_s") and stats["jobs_per_s"] < base["jobs_per_s"] / (1 + max_regression):
+            regressions.append(f"{stage}: jobs_per_s {base['jobs_per_s']:.1f} -> {stats['jobs_per_s']:.1f}")
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the job scoring pipeline")
+    parser.add_argument("--corpus", default=CORPUS_FILE_PATH, help="csv with a description column")
+    parser.add_argument("--scale", type=int, default=0, help="synthesize a corpus of this many jobs")
+    parser.add_argument("--stages", nargs="+", default=PER_JOB_STAGES + BATCH_STAGES,
+                        choices=PER_JOB_STAGES + BATCH_STAGES)
+    parser.add_argument("--workers", type=int, default=1, help="workers for score_jobs_batch")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc pass")
+    parser.add_argument("--output", help="write the results json here instead of stdout")
+    parser.add_argument("--baseline", help="results json of a previous run to compare to")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if args.scale:
+        corpus = synthesize_corpus(corpus, args.scale)
+
+    results = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus_size": len(corpus),
+        "stages": run_benchmark(corpus, args.stages, workers=args.workers, memory=not args.no_memory),
+        # ru_maxrss is kb on linux and bytes on mac
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"[benchmark] regression {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
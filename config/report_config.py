@@ -0,0 +1,21 @@
+# only the best jobs make it to the report (the streaming report keeps only those in memory)
+REPORT_TOP_K = 500
+# jobs that passed the gates but rated below this are left out of the report
+REPORT_SCORE_FLOOR = 0.0
+# how many postings of the backup are read and scored at a time in streaming mode
+STREAM_CHUNK_ROWS = 2000
+
+# where a new report is delivered (see services.report_delivery): "desktop" (a macos notification that opens the
+# report), "file_drop" (a json file per delivery in REPORT_DROP_DIR, None is reports/outbox) and "webhook" (a json
+# POST to REPORT_WEBHOOK_URL)
+REPORT_DELIVERY_BACKENDS = ["desktop"]
+REPORT_DROP_DIR = None
+REPORT_WEBHOOK_URL = "http://127.0.0.1:5002/reports"
+REPORT_WEBHOOK_TIMEOUT_SECONDS = 10
+# reports submitted within this many seconds of each other are delivered as one notification
+REPORT_DELIVERY_COALESCE_SECONDS = 2.0
+# a failed delivery is retried this many times, the waits between tries double from REPORT_DELIVERY_BACKOFF_SECONDS
+REPORT_DELIVERY_RETRIES = 2
+REPORT_DELIVERY_BACKOFF_SECONDS = 1.0
+# how long the end of a run waits for the deliveries still in progress before it gives up on them
+REPORT_DELIVERY_WAIT_SECONDS = 30
@@ -0,0 +1,48 @@
+from models.scrape_query import ScrapeQuery
+
+# every query runs as its own scrape_jobs call, the results are merged into one report
+SCRAPE_QUERIES: list[ScrapeQuery] = [
+    ScrapeQuery(
+        site="linkedin",
+        search_term="python fullstack developer",
+        location="Tel aviv, Israel",
+        google_search_term="python fullstack developer in tel aviv since yesterday",
+    ),
+]
+
+# passed to every scrape_jobs call
+SCRAPE_KWARGS = {
+    "country_indeed": "Israel",
+    # the descriptions are fetched by services/description_fetcher, concurrently and cached, instead of one at a
+    # time inside scrape_jobs
+    "linkedin_fetch_description": False,
+    "hours_old": 24,
+    "results_wanted": 50,
+}
+
+# how many queries run at the same time
+MAX_CONCURRENT_SCRAPES = 4
+# a proxy that failed a scrape is not used again for this many seconds
+PROXY_COOLDOWN_SECONDS = 300
+
+# postings whose descriptions share at least this much of their word shingles are merged into one report row
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 128
+# 16 bands of 8 rows - pairs above ~0.7 similarity almost always share a bucket
+LSH_BANDS = 16
+
+# how many batches of postings can wait between two stages of the pipeline before the stage before it waits
+PIPELINE_QUEUE_SIZE = 4
+
+# the description fetch of the postings a listing only scrape returns
+DESCRIPTION_FETCH_WORKERS = 16
+# requests per second to one host through one proxy
+DESCRIPTION_REQUESTS_PER_SECOND = 2.0
+DESCRIPTION_FETCH_TIMEOUT_SECONDS = 15
+# a cached description younger than this is used without asking the site, older ones are revalidated with a
+# conditional request (etag / last modified) and only downloaded again when they changed
+DESCRIPTION_CACHE_FRESH_HOURS = 24
+# descriptions are a few KB each, the cache keeps the ones used in the last month and at most this many
+DESCRIPTION_CACHE_MAX_ENTRIES = 20_000
+DESCRIPTION_CACHE_MAX_AGE_DAYS = 30
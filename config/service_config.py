@@ -0,0 +1,8 @@
+# the scoring service (python -m services.scoring_service) only listens locally
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 5001
+# the pages the browser extension calls /score and /score/batch from, no other site open in the browser can read
+# the answers and the other endpoints are for local tools only
+SERVICE_CORS_ORIGINS = ["https://www.linkedin.com"]
+# a batch bigger than this is refused, a cron job with more postings should send a few batches
+SERVICE_MAX_BATCH = 1000
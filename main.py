@@ -1,69 +1,278 @@
-from jobspy import scrape_jobs
-from pandas import DataFrame
+"""jobhunt command line
 
-from services.create_report import create_report
-from models.job import Job
-from utils.os_stuff import notify_and_open_report
-from utils.backup import save_scraping_results_to_backup_folder, delete_scraping_results_from_backup_folder, \
-    get_scraping_results_from_back_folder
-from utils.proxies import get_proxys
+    python main.py                  # scrape (or pick up the backup of a run that failed), score, report, notify
+    python main.py scrape           # only scrape into the backup
+    python main.py score            # score the new postings of the backup and print them, only the score cache
+                                    # is written (so a report after it doesn't score them again)
+    python main.py report           # report the new postings of the backup, exits right away when there's no backup
+    python main.py rescore-backup   # report every posting of the backup (seen before or not), the backup is kept.
+                                    # the keyword features are stored, so after a weight change this is fast
+    python main.py rescore-backup --stream --top-k 200   # same for a backup too big for memory, only the best jobs
+    python main.py history --keyword redis --section requirements --days 90 --min-rating 60
+                                    # the scored jobs of past runs from the job store, best rated first
 
+every scored job (and the keywords it matched) is recorded in the job store, except the jobs of a --stream rescore
 
-def run():
-    jobs_data = get_scraping_results_from_back_folder()
-    if jobs_data is None or jobs_data.empty:
+the heavy packages (pandas, jobspy, openpyxl, rapidfuzz, pync...) are imported inside the commands that use them,
+so `import main` and the commands that have nothing to do start fast (see benchmarks/import_budget.py)
+"""
+import argparse
+import sys
+import time
+
+from utils.instrumentation import INSTRUMENTATION, stage
+
+
+def run(command: str = "run", **options):
+    INSTRUMENTATION.start_profile()
+    try:
+        COMMANDS[command](**options)
+    finally:
+        summary_path = INSTRUMENTATION.write_summary()
+        if summary_path:
+            print(f"[run] Run summary written to {summary_path}")
+
+
+def _run():
+    from utils.backup import has_scraping_backup
+
+    # without a backup we scrape, every query is backed up and scored as soon as it finishes (see run_pipeline)
     # error logging here is done by the package
-        jobs_data = scrape_jobs(
-            site_name=["linkedin"],
-            search_term="python fullstack developer",
-            google_search_term="python fullstack developer in tel aviv since yesterday",
-            location="Tel aviv, Israel",
-            country_indeed="Israel",
-            linkedin_fetch_description=True,
-            hours_old=24,
-            results_wanted=50,
-            proxies=get_proxys()
-        )
-
-        # todo - validate data before saving to backup
-        save_scraping_results_to_backup_folder(jobs_data)
-
-    # example set of data
-    # script_dir = os.path.dirname(os.path.abspath(__file__))
-    # file_path = os.path.join(script_dir, 'a.csv')
-    # jobs_data = pd.read_csv(file_path)
-    # jobs_data.head()
-
-    # -------------------------------------
-    jobs = load_jobs_to_classes(jobs_data=jobs_data)
-    report_name = create_report(jobs=jobs)
-
-    delete_scraping_results_from_backup_folder()
-    notify_and_open_report(report_name)
-
-
-def load_jobs_to_classes(jobs_data: DataFrame):
-    jobs: list[Job] = []
-    for data in jobs_data.itertuples(index=False):
-        job = Job(
-            company=data.company,
-            company_desc=data.company_description,
-            employees_num=data.company_num_employees,
-            company_url=data.company_url_direct,
-            desc=data.description,
-            is_remote=data.is_remote,
-            level_desc=data.job_level,
-            url=data.job_url_direct,
-            location=data.location,
-            title=data.title,
-            linkedin_url=data.job_url,
-            linkedin_company=data.company_url
-        )
-
-        jobs.append(job)
-
-    return jobs
+    # todo - validate data before saving to backup
+    if has_scraping_backup():
+        _report()
+    else:
+        _report_pipeline(scrape=True)
+
+
+def _scrape():
+    from config.scrape_config import SCRAPE_QUERIES, SCRAPE_KWARGS
+    from services.description_fetcher import DescriptionFetcher
+    from services.scrape_scheduler import scrape_queries
+    from utils.backup import append_scraping_results_to_backup_folder
+    from utils.proxies import get_proxys
+
+    proxies = get_proxys()
+    fetcher = DescriptionFetcher(proxies)
+    try:
+        with stage("scrape"):
+            jobs_data = scrape_queries(SCRAPE_QUERIES, proxies=proxies,
+                                       on_result=append_scraping_results_to_backup_folder,
+                                       fetch_descriptions=fetcher.fetch_missing, **SCRAPE_KWARGS)
+    finally:
+        fetcher.close()
+    print(f"[scrape] Backed up {len(jobs_data)} postings")
+
+
+def _score():
+    from utils.backup import has_scraping_backup
+    if not has_scraping_backup():
+        print("[score] No backup to score")
+        return
+
+    from services.job_loader import JOB_COLUMNS, load_jobs_to_classes
+    from services.near_duplicates import collapse_near_duplicates
+    from services.scrape_scheduler import dedupe_postings
+    from utils.backup import get_scraping_results_from_back_folder
+    from utils.seen_postings import SeenPostings
+
+    with stage("backup_read"):
+        jobs_data = dedupe_postings(get_scraping_results_from_back_folder(columns=JOB_COLUMNS))
+    seen_postings = SeenPostings()
+    try:
+        jobs_data = seen_postings.filter_new(jobs_data)
+    finally:
+        seen_postings.close()
+    if jobs_data.empty:
+        print("[score] No new postings since the last run")
+        return
+
+    jobs = load_jobs_to_classes(collapse_near_duplicates(jobs_data))
+    for job in sorted(jobs, key=lambda job: -job.rating):
+        print(f"{job.rating:8.1f}  {job.title} - {job.company}  {job.url}")
+
+
+def _report():
+    from utils.backup import has_scraping_backup
+    if not has_scraping_backup():
+        print("[report] No backup to report")
+        return
+    _report_pipeline(scrape=False)
+
+
+def _rescore_backup(stream: bool = False, top_k: int = None):
+    from utils.backup import has_scraping_backup
+    if not has_scraping_backup():
+        print("[rescore-backup] No backup to score")
+        return
+    if stream:
+        from config.report_config import REPORT_TOP_K
+        from services.streaming_report import top_jobs_from_backup
+
+        _report_jobs(top_jobs_from_backup(top_k=top_k or REPORT_TOP_K))
+        return
+
+    from services.feature_store import rescore_descriptions
+    from services.job_loader import JOB_COLUMNS, load_jobs_to_classes
+    from services.near_duplicates import collapse_near_duplicates
+    from services.scrape_scheduler import dedupe_postings
+    from utils.backup import get_scraping_results_from_back_folder
+
+    with stage("backup_read"):
+        jobs_data = dedupe_postings(get_scraping_results_from_back_folder(columns=JOB_COLUMNS))
+    with stage("near_duplicates"):
+        jobs_data = collapse_near_duplicates(jobs_data)
+    # after a keyword weight change the stored features are rescored, the descriptions aren't read again
+    descriptions = jobs_data["description"].tolist() if "description" in jobs_data.columns else [None] * len(jobs_data)
+    with stage("rescore"):
+        scores = rescore_descriptions(descriptions)
+    jobs = load_jobs_to_classes(jobs_data, scores=scores)
+    _record_jobs(jobs, "rescore-backup")
+    _report_jobs(jobs)
+
+
+def _record_jobs(jobs: list, command: str):
+    from utils.job_store import JobStore
+
+    job_store = JobStore()
+    try:
+        job_store.start_run(command)
+        with stage("job_store"):
+            job_store.record(jobs)
+    finally:
+        job_store.close()
+
+
+def _report_jobs(jobs: list):
+    from services.create_report import create_report, report_path
+    from services.report_delivery import ReportDelivery
+
+    delivery = ReportDelivery()
+    try:
+        with stage("report"):
+            report_name = create_report(jobs)
+        delivery.submit(report_path(report_name))
+    finally:
+        with stage("notify"):
+            delivery.close()
+
+
+def _report_pipeline(scrape: bool, only_new: bool = True):
+    """run the pipeline on a fresh scrape or on the backup and deliver the report (see ReportDelivery), the delivery
+    starts as soon as the report is written and runs alongside the rest of the run.
+    with only_new the postings are checked against (and added to) the seen postings and the backup is deleted once
+    they made it to a report"""
+    import asyncio
+
+    from config.scrape_config import SCRAPE_QUERIES, SCRAPE_KWARGS
+    from services.create_report import report_path
+    from services.job_loader import JOB_COLUMNS
+    from services.pipeline import run_pipeline
+    from services.report_delivery import ReportDelivery
+    from utils.backup import delete_scraping_results_from_backup_folder, get_scraping_results_from_back_folder
+    from utils.job_store import JobStore
+    from utils.proxies import get_proxys
+    from utils.seen_postings import SeenPostings
+
+    jobs_data = None
+    proxies = None
+    fetcher = None
+    if scrape:
+        from services.description_fetcher import DescriptionFetcher
+
+        proxies = get_proxys()
+        fetcher = DescriptionFetcher(proxies)
+    else:
+        with stage("backup_read"):
+            jobs_data = get_scraping_results_from_back_folder(columns=JOB_COLUMNS)
+
+    seen_postings = SeenPostings() if only_new else None
+    job_store = JobStore()
+    job_store.start_run("scrape" if scrape else "report")
+    delivery = ReportDelivery()
+    try:
+        try:
+            with stage("pipeline"):
+                report_name = asyncio.run(run_pipeline(
+                    queries=SCRAPE_QUERIES if scrape else [],
+                    seen_postings=seen_postings,
+                    proxies=proxies,
+                    backup=jobs_data,
+                    fetch_descriptions=fetcher.fetch_missing if fetcher else None,
+                    job_store=job_store,
+                    on_report=lambda name: delivery.submit(report_path(name)),
+                    **SCRAPE_KWARGS,
+                ))
+        finally:
+            job_store.close()
+            if seen_postings is not None:
+                seen_postings.close()
+            if fetcher is not None:
+                fetcher.close()
+
+        if only_new:
+            delete_scraping_results_from_backup_folder()
+        if report_name is None:
+            print("[run] No new postings since the last run")
+    finally:
+        # the report is delivered (or being delivered) by now, this only waits for a slow notifier
+        with stage("notify"):
+            delivery.close()
+
+
+def _history(keyword: str = None, section: str = None, company: str = None, days: float = None,
+             min_rating: float = None, text: str = None, limit: int = 50):
+    from utils.job_store import JobStore
+
+    job_store = JobStore()
+    try:
+        jobs = job_store.query(keyword=keyword, section=section, company=company, since_days=days,
+                               min_rating=min_rating, text=text, limit=limit)
+    finally:
+        job_store.close()
+    if not jobs:
+        print("[history] No stored jobs match")
+        return
+    for job in jobs:
+        seen = time.strftime("%Y-%m-%d", time.localtime(job.last_seen))
+        print(f"{job.rating:8.1f}  {seen}  {job.title} - {job.company}  {job.url}")
+
+
+COMMANDS = {
+    "run": _run,
+    "scrape": _scrape,
+    "score": _score,
+    "report": _report,
+    "rescore-backup": _rescore_backup,
+    "history": _history,
+}
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scrape, score and report job postings")
+    parser.add_argument("command", nargs="?", default="run", choices=list(COMMANDS))
+    parser.add_argument("--stream", action="store_true",
+                        help="rescore-backup: read and score the backup in chunks, keep only the --top-k best jobs")
+    parser.add_argument("--top-k", type=int, help="rescore-backup --stream: how many jobs make it to the report")
+    history = parser.add_argument_group("history", "filters of the jobs the history command prints")
+    history.add_argument("--keyword", help="a scoring keyword the job matched")
+    history.add_argument("--section", help="only the keyword matches of this section (e.g. requirements)")
+    history.add_argument("--company")
+    history.add_argument("--days", type=float, help="jobs a run saw in the last DAYS days")
+    history.add_argument("--min-rating", type=float)
+    history.add_argument("--text", help="full text search of the title and description (fts5 query syntax)")
+    history.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.command == "rescore-backup":
+        options = {"stream": args.stream, "top_k": args.top_k}
+    elif args.command == "history":
+        options = {"keyword": args.keyword, "section": args.section, "company": args.company, "days": args.days,
+                   "min_rating": args.min_rating, "text": args.text, "limit": args.limit}
+    run(args.command, **options)
+    return 0
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    sys.exit(main())
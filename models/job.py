@@ -1,47 +1,44 @@
-import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from services.job_analysis import score_job_description
 
-
-@dataclass
+@dataclass(slots=True)
 class Job:
-    company: str
+    """A scraped job ready for the report, missing values are None (see services.job_loader.load_jobs_to_classes)"""
+    company: str | None
     company_desc: str | None
     employees_num: str | None
     company_url: str | None
-    desc: str
-    is_remote: bool
+    desc: str | None
+    is_remote: bool | None
     level_desc: str | None
-    url: str
-    location: str
-    title: str
-    rating: int
-
-    def __init__(self, company: str, company_desc: str | None, employees_num: str | None,
-                 company_url: str | None, desc: str, is_remote: bool,
-                 level_desc: str | None, url: str, location: str, title: str,
-                 linkedin_url: str, linkedin_company: str):
-        # todo - handle nans that we have instead of None
-        self.company = company
-        self.company_desc = company_desc
-        self.employees_num = employees_num
-        self.company_url = company_url or linkedin_company
-        self.desc = desc
-        self.is_remote = is_remote
-        self.level_desc = level_desc
-        self.url = url or linkedin_url
-        self.location = location
-        self.title = title
+    url: str | None
+    location: str | None
+    title: str | None
+    rating: float
+    # urls of near duplicate postings of the same job (see services.near_duplicates)
+    alternate_urls: list[str] = field(default_factory=list)
+    # why the scoring rejected the job (hard_avoid / missing_must_have), None when it passed the gates
+    fail_reason: str | None = None
+    # the posting's id (see utils.seen_postings.canonical_posting_id), what the job store keys the job by
+    posting_id: str | None = None
+    # section -> matched keyword -> its weight when the job was scored (ScoreResult.matched_by_section)
+    matched_by_section: dict[str, dict[str, int]] = field(default_factory=dict)
 
-        try:
-            _rating = 0
-            # todo - move this to main.py instead of doing this while loading the dataclass (in case of specific error)
-            if type(self.desc) is not float:
-                _rating = score_job_description(self.desc).score
-        except Exception as e:
-            _rating = 0
-            logging.exception(e)
-            pass
 
-        self.rating = _rating
\ No newline at end of file
+@dataclass(slots=True)
+class StoredJob:
+    """A job as the job store (utils.job_store) has it, times are unix timestamps"""
+    posting_id: str
+    run_id: int
+    first_seen: float
+    last_seen: float
+    company: str | None
+    title: str | None
+    location: str | None
+    url: str | None
+    level_desc: str | None
+    is_remote: bool | None
+    rating: float
+    fail_reason: str | None
+    desc: str | None
+    matched_by_section: dict[str, dict[str, int]] = field(default_factory=dict)
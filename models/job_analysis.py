@@ -9,9 +9,62 @@ class ScoreResult:
     fail_reason: Optional[str]
     matched_by_section: dict[str, dict[str, int]]
     bm25f: float
+    # the keyword part of the score before it's mixed with bm25f
+    keyword_score: float = 0.0
 
 
 @dataclass
 class JobDescpSection:
     weight: float
-    headers: list[str]
\ No newline at end of file
+    headers: list[str]
+
+@dataclass
+class SentenceSpan:
+    start: int
+    end: int
+    token_start: int
+    token_end: int
+    # the sentence's own tokens when a token of the description crosses its boundary (a normalize variant across
+    # a list delimiter, "ci - cd"), a sentence is scored on its own tokens like it always was
+    tokens: Optional[list[str]] = None
+
+
+@dataclass(frozen=True)
+class SentenceFeatures:
+    """what scoring a requirement sentence needs, cached per sentence (hits must not be changed)"""
+    multiplier: float
+    is_soft: bool
+    or_group: bool
+    hits: dict[str, int]
+    score: float
+
+
+@dataclass
+class KeywordFeatures:
+    """a job's keyword score without the keyword weights (see job_analysis.keyword_features)"""
+    fail_reason: Optional[str]
+    # keyword -> summed coefficient (sentence multipliers, section weights)
+    linear: dict[str, float]
+    # (keyword, coefficient) of the negative keywords of soft sentences, each one is capped at -50 on its own
+    capped: list[tuple[str, float]]
+    # the keywords hit in each section, without their weights
+    matched_by_section: dict[str, list[str]]
+
+
+@dataclass
+class ParsedDescription:
+    """A job description that was lowercased, normalized and tokenized once.
+    sections and sentences are offsets into tokens (and into text for the cue regexes) so every scoring
+    stage reads from the same token array instead of re-tokenizing its own copy of the text
+    """
+    text: str
+    tokens: list[str]
+    sections: dict[str, tuple[int, int]]
+    sentences: list[SentenceSpan]
+
+    def sentence_tokens(self, sent: SentenceSpan) -> list[str]:
+        return sent.tokens if sent.tokens is not None else self.tokens[sent.token_start:sent.token_end]
+
+    def section_tokens(self, section: str) -> list[str]:
+        start, end = self.sections.get(section, (0, 0))
+        return self.tokens[start:end]
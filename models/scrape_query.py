@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ScrapeQuery:
+    site: str
+    search_term: str
+    location: str
+    google_search_term: Optional[str] = None
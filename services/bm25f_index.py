@@ -0,0 +1,114 @@
+import numpy as np
+
+from typing import Optional
+
+from config.job_scoring_config import SECTION_HEADERS
+from models.job_analysis import ParsedDescription
+
+
+class BM25FStats:
+    """the corpus side of BM25F (document count, summed field lengths and document frequencies), it can be added up
+    chunk by chunk when the corpus is too big to index at once and then passed to a BM25FIndex of each chunk"""
+
+    def __init__(self, n_fields: int, n_terms: int):
+        self.n_docs = 0
+        self.length_sums = np.zeros(n_fields, dtype=np.float64)
+        self.doc_freq = np.zeros(n_terms, dtype=np.int64)
+
+    def add(self, tf: np.ndarray, lengths: np.ndarray):
+        self.n_docs += 1
+        self.length_sums += lengths
+        self.doc_freq += tf.sum(axis=0) > 0
+
+    @property
+    def avg_lengths(self) -> np.ndarray:
+        return self.length_sums / max(self.n_docs, 1)
+
+
+class BM25FIndex:
+    """BM25F over a whole batch of job descriptions (the sections are the fields).
+
+    only the query terms are indexed, each document is a (fields x terms) term frequency row plus its field lengths,
+    the idf and average field lengths come from the whole batch so a keyword that shows up in every posting of the day
+    is worth less than one that only a few postings mention.
+    with corpus_stats the idf and average field lengths come from those stats instead, so the documents of the index
+    are scored against a bigger corpus they're part of.
+    """
+
+    def __init__(self, terms: list[str], field_weights: dict[str, float] = None, k1: float = 1.5, b: float = 0.75,
+                 corpus_stats: Optional[BM25FStats] = None):
+        field_weights = field_weights or {sec: job_descp.weight for sec, job_descp in SECTION_HEADERS.items()}
+        self.terms = list(dict.fromkeys(terms))
+        self.fields = list(field_weights)
+        self.k1 = k1
+        self.b = b
+        self.corpus_stats = corpus_stats
+
+        self._term_ids = {term: idx for idx, term in enumerate(self.terms)}
+        self._field_weights = np.array([field_weights[field] for field in self.fields], dtype=np.float64)
+        self._tf_rows: list[np.ndarray] = []
+        self._length_rows: list[np.ndarray] = []
+        self._scores = None
+
+    def __len__(self):
+        return len(self._tf_rows)
+
+    def new_stats(self) -> BM25FStats:
+        return BM25FStats(len(self.fields), len(self.terms))
+
+    def document_stats(self, parsed: ParsedDescription) -> tuple[np.ndarray, np.ndarray]:
+        """term frequencies (fields x terms) and field lengths of one description, this is all the index keeps
+        so it can also be computed in another process and added with add_stats"""
+        tf = np.zeros((len(self.fields), len(self.terms)), dtype=np.float64)
+        lengths = np.zeros(len(self.fields), dtype=np.float64)
+        for field_idx, field in enumerate(self.fields):
+            start, end = parsed.sections.get(field, (0, 0))
+            lengths[field_idx] = end - start
+            for tok in parsed.tokens[start:end]:
+                term_idx = self._term_ids.get(tok)
+                if term_idx is not None:
+                    tf[field_idx, term_idx] += 1
+        return tf, lengths
+
+    def add(self, parsed: ParsedDescription) -> int:
+        return self.add_stats(*self.document_stats(parsed))
+
+    def add_stats(self, tf: np.ndarray, lengths: np.ndarray) -> int:
+        self._tf_rows.append(tf)
+        self._length_rows.append(lengths)
+        self._scores = None
+        return len(self._tf_rows) - 1
+
+    def scores(self) -> np.ndarray:
+        """BM25F score of every document in the index against the query terms"""
+        if self._scores is not None:
+            return self._scores
+        if not self._tf_rows:
+            return np.zeros(0)
+
+        tf = np.stack(self._tf_rows)  # docs x fields x terms
+        lengths = np.stack(self._length_rows)  # docs x fields
+        if self.corpus_stats is not None:
+            n_docs = self.corpus_stats.n_docs
+            avg_lengths = self.corpus_stats.avg_lengths
+            doc_freq = self.corpus_stats.doc_freq
+        else:
+            n_docs = len(tf)
+            avg_lengths = lengths.mean(axis=0)
+            doc_freq = (tf.sum(axis=1) > 0).sum(axis=0)
+
+        norm = np.ones_like(lengths)
+        has_len = avg_lengths > 0
+        norm[:, has_len] = (1 - self.b) + self.b * lengths[:, has_len] / avg_lengths[has_len]
+
+        # weighted, length normalized term frequency of each term summed over the fields
+        pseudo_tf = np.einsum("dft,f,df->dt", tf, self._field_weights, 1 / norm)
+
+        idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        saturated = pseudo_tf * (self.k1 + 1) / (pseudo_tf + self.k1)
+        self._scores = saturated @ idf
+        return self._scores
+
+    def score(self, doc_id: int) -> float:
+        return float(self.scores()[doc_id])
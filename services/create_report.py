@@ -1,12 +1,18 @@
+import logging
+import math
 import os
-from dataclasses import asdict
 from datetime import datetime
 
-import pandas as pd
-from openpyxl.reader.excel import load_workbook
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
 
 from models.job import Job
+from services.ranking import rank_jobs, write_rejected_log
+from utils.instrumentation import stage
+
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports")
 
 COLUMNS = {
     "rating": "Rating",
@@ -20,54 +26,89 @@ COLUMNS = {
     "company_url": "Company Site",
     "employees_num": "Number of Employees",
     "is_remote": "Remote",
+    "alternate_urls": "Other Postings",
 }
+COLUMN_WIDTHS = {"desc": 100}
 
-def create_report(jobs: list[Job]) -> str:
-    df = pd.DataFrame([asdict(job) for job in jobs])[list(COLUMNS.keys())]
+# styles are shared by every cell instead of creating new ones per cell
+WRAP_ALIGNMENT = Alignment(wrap_text=True)
+THIN_BORDER = Border(left=Side(style='thin'),
+                     right=Side(style='thin'),
+                     top=Side(style='thin'),
+                     bottom=Side(style='thin'))
+GOOD_FILL = PatternFill(fgColor="B6D7A8", fill_type="solid")
+DEFAULT_FILL = PatternFill(fgColor="FFE599", fill_type="solid")
+BAD_FILL = PatternFill(fgColor="EA9999", fill_type="solid")
 
-    df.rename(columns=COLUMNS, inplace=True)
-    df.sort_values(by=["Rating", "Company"], ascending=[False, True], inplace=True)
 
+def create_report(jobs: list[Job]) -> str:
+    """the report of the best jobs (see JobRanker), the jobs the gates rejected go to the rejected log instead so
+    the report only has jobs worth reading however big the scrape was"""
     time = datetime.now()
     name = f"job_report_{time.day}-{time.month}-{time.year}"
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    df.to_excel(f"{os.path.join(script_dir)}/../reports/{name}.xlsx", index=False)
-    _post_creation_changes(name)
+    with stage("rank"):
+        ranker = rank_jobs(jobs)
+    write_rejected_log(ranker.rejected)
+    ranked = ranker.ranked()
+    logging.info(f"[report] {len(ranked)} jobs in the report, {len(ranker.rejected)} rejected, "
+                 f"{ranker.below_floor} below the score floor")
+
+    write_report(ranked, report_path(name))
 
     return name
 
 
-def _post_creation_changes(report_name: str):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+def report_path(name: str) -> str:
+    return os.path.join(REPORTS_DIR, f"{name}.xlsx")
 
-    wb = load_workbook(f"{os.path.join(script_dir)}/../reports/{report_name}.xlsx")
-    ws = wb.active
 
-    for idx, row in enumerate(ws.iter_rows()):
-        paint_color = "FFE599"
+def write_report(jobs: list[Job], path: str):
+    """write the report in one pass - rows are streamed to the file (openpyxl write only mode)
+    already styled, so the workbook is never loaded back"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
 
-        for cell in row:
-            # fix rows
-            cell.alignment = Alignment(wrap_text=True)
-            if cell.column_letter == "D":
-                ws.column_dimensions["D"].width = 100
-            else:
-                ws.column_dimensions[cell.column_letter].bestFit = True
+    for idx, key in enumerate(COLUMNS, start=1):
+        letter = get_column_letter(idx)
+        if key in COLUMN_WIDTHS:
+            ws.column_dimensions[letter].width = COLUMN_WIDTHS[key]
+        else:
+            ws.column_dimensions[letter].bestFit = True
 
-            if idx == 0:
-                continue
-            # check if different color
-            if cell.column_letter == "A":
-                if cell.value >= 80:
-                    paint_color = "B6D7A8"
-                elif cell.value <= 40:
-                    paint_color = "EA9999"
+    with stage("report_rows"):
+        ws.append([_cell(ws, header) for header in COLUMNS.values()])
+        for job in sorted(jobs, key=_report_order):
+            fill = _rating_fill(job.rating)
+            ws.append([_cell(ws, getattr(job, key), fill) for key in COLUMNS])
+
+    with stage("report_save"):
+        wb.save(path)
+
+
+def _cell(ws, value, fill: PatternFill = None) -> WriteOnlyCell:
+    # nan is what we get for missing values from the scrape, excel should get an empty cell
+    if isinstance(value, float) and math.isnan(value):
+        value = None
+    elif isinstance(value, list):
+        value = "\n".join(value) or None
+    cell = WriteOnlyCell(ws, value=value)
+    cell.alignment = WRAP_ALIGNMENT
+    if fill is not None:
+        cell.fill = fill
+        cell.border = THIN_BORDER
+    return cell
+
+
+def _rating_fill(rating: float) -> PatternFill:
+    if rating >= 80:
+        return GOOD_FILL
+    elif rating <= 40:
+        return BAD_FILL
+    return DEFAULT_FILL
 
-            cell.fill = PatternFill(fgColor=paint_color, fill_type="solid")
-            cell.border = Border(left=Side(style='thin'),
-                     right=Side(style='thin'),
-                     top=Side(style='thin'),
-                     bottom=Side(style='thin'))
 
-    wb.save(f"{os.path.join(script_dir)}/../reports/{report_name}.xlsx")
+def _report_order(job: Job):
+    """rating high to low then company a-z, jobs without a company go last like pandas puts nans last"""
+    has_company = isinstance(job.company, str)
+    return -job.rating, not has_company, job.company if has_company else ""
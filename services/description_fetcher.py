@@ -0,0 +1,245 @@
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import unquote, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from markdownify import markdownify
+from pandas import DataFrame
+from requests.adapters import HTTPAdapter
+
+from config.scrape_config import DESCRIPTION_FETCH_WORKERS, DESCRIPTION_REQUESTS_PER_SECOND, \
+    DESCRIPTION_FETCH_TIMEOUT_SECONDS, DESCRIPTION_CACHE_FRESH_HOURS, DESCRIPTION_CACHE_MAX_ENTRIES, \
+    DESCRIPTION_CACHE_MAX_AGE_DAYS
+from services.scrape_scheduler import ProxyPool
+from utils.score_cache import ScoreCache
+
+DESCRIPTION_CACHE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                           "description_cache.sqlite")
+# same headers jobspy sends to linkedin
+HEADERS = {
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "accept-language": "en-US,en;q=0.9",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+}
+# a proxy that gets these cools down and the request is retried with another one
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+APPLY_URL = re.compile(r'\?url=([^"]+)')
+
+
+def parse_linkedin_job_page(html: str) -> Optional[dict]:
+    """the fields of a linkedin job page we use (same as jobspy's linkedin_fetch_description),
+    None when the page has no description (e.g. the login wall)"""
+    soup = BeautifulSoup(html, "html.parser")
+    div_content = soup.find("div", class_="show-more-less-html__markup")
+    if div_content is None:
+        return None
+
+    job_level = None
+    level_header = soup.find("h3", class_="description__job-criteria-subheader",
+                             string=lambda text: text and "Seniority level" in text)
+    level_tag = level_header.find_next_sibling("span", class_="description__job-criteria-text") \
+        if level_header else None
+    if level_tag is not None:
+        job_level = level_tag.get_text(strip=True).lower()
+
+    job_url_direct = None
+    apply_url_tag = soup.find("code", id="applyUrl")
+    if apply_url_tag is not None:
+        match = APPLY_URL.search(apply_url_tag.decode_contents().strip())
+        if match:
+            job_url_direct = unquote(match.group(1))
+
+    return {
+        "description": markdownify(str(div_content)).strip(),
+        "job_level": job_level,
+        "job_url_direct": job_url_direct,
+    }
+
+
+# the sites whose descriptions we fetch ourselves, the others come with the scrape
+PAGE_PARSERS: dict[str, Callable[[str], Optional[dict]]] = {
+    "www.linkedin.com": parse_linkedin_job_page,
+    "linkedin.com": parse_linkedin_job_page,
+}
+
+
+class HostRateLimiter:
+    """Spaces out the requests with the same key at least 1/rate seconds apart, thread safe.
+    the fetcher keys it by (host, proxy) - every proxy is its own ip to the site"""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot: dict = {}
+        self._lock = threading.Lock()
+
+    def wait(self, key):
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(key, now))
+            self._next_slot[key] = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+class DescriptionFetcher:
+    """Fetches the descriptions of the postings a listing only scrape returns (linkedin_fetch_description=False),
+    many at a time instead of one by one inside scrape_jobs.
+
+    every proxy gets one pooled session (keep alive connections are reused between postings) and the proxies are
+    handed out by a ProxyPool, a proxy that fails or gets rate limited cools down and the posting is retried with
+    another one. requests to a host through a proxy are spaced by requests_per_second.
+    fetched pages are cached on disk by url with their etag / last modified: a cached description younger than
+    fresh_hours is used as is, an older one is revalidated with a conditional request and a 304 keeps it, so
+    an unchanged posting is never downloaded twice, and a posting that can't be revalidated keeps its cached
+    description. the cache is evicted by age and size (DESCRIPTION_CACHE_MAX_*) after every fetch.
+    the fetcher can be shared by the threads of the scrape, close it when the run is done
+    """
+
+    def __init__(self, proxies: list[str] = None, max_workers: int = DESCRIPTION_FETCH_WORKERS,
+                 requests_per_second: float = DESCRIPTION_REQUESTS_PER_SECOND, retries: int = 1,
+                 timeout: float = DESCRIPTION_FETCH_TIMEOUT_SECONDS, cache_path: str = None,
+                 fresh_hours: float = DESCRIPTION_CACHE_FRESH_HOURS,
+                 session_factory: Callable[[], requests.Session] = requests.Session,
+                 rate_limiter: HostRateLimiter = None):
+        self.pool = ProxyPool(proxies or [])
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.cache_path = cache_path or DESCRIPTION_CACHE_FILE_PATH
+        self.fresh_seconds = fresh_hours * 60 * 60
+        self.rate_limiter = rate_limiter or HostRateLimiter(requests_per_second)
+
+        self._session_factory = session_factory
+        self._sessions: dict[Optional[str], requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="description_fetch")
+
+    def fetch_missing(self, jobs_data: DataFrame) -> DataFrame:
+        """fill in the description (and the other page fields) of the postings that have none and that we have a
+        parser for, postings that fail to fetch keep their missing description"""
+        if jobs_data.empty or "job_url" not in jobs_data.columns:
+            return jobs_data
+
+        descriptions = jobs_data["description"] if "description" in jobs_data.columns else [None] * len(jobs_data)
+        missing = [(idx, url) for idx, url, desc in zip(jobs_data.index, jobs_data["job_url"], descriptions)
+                   if isinstance(url, str) and not (isinstance(desc, str) and desc.strip()) and _parser_for(url)]
+        if not missing:
+            return jobs_data
+
+        fetched = self.fetch(list(dict.fromkeys(url for _, url in missing)))
+        jobs_data = jobs_data.copy()
+        for col in ["description", "job_level", "job_url_direct"]:
+            if col not in jobs_data.columns:
+                jobs_data[col] = None
+            jobs_data[col] = jobs_data[col].astype(object)
+
+        for idx, url in missing:
+            for col, value in (fetched.get(url) or {}).items():
+                current = jobs_data.at[idx, col]
+                if value is not None and not (isinstance(current, str) and current):
+                    jobs_data.at[idx, col] = value
+        logging.info(f"[fetch] {sum(url in fetched for _, url in missing)}/{len(missing)} descriptions fetched")
+        return jobs_data
+
+    def fetch(self, urls: list[str]) -> dict[str, dict]:
+        """the page fields of every url we could get (from the cache or the site)"""
+        # sqlite connections belong to the thread that opened them, the workers never touch the cache
+        cache = ScoreCache(self.cache_path, max_entries=DESCRIPTION_CACHE_MAX_ENTRIES,
+                           max_age_days=DESCRIPTION_CACHE_MAX_AGE_DAYS)
+        try:
+            cached = cache.get_many(urls)
+            now = time.time()
+            fetched = {url: entry for url, entry in cached.items() if now - entry["fetched_at"] < self.fresh_seconds}
+
+            to_fetch = [url for url in urls if url not in fetched]
+            entries = self._executor.map(lambda url: self._fetch_page(url, cached.get(url)), to_fetch)
+            new_entries = {url: entry for url, entry in zip(to_fetch, entries) if entry is not None}
+            cache.put_many(new_entries)
+            fetched.update(new_entries)
+            cache.evict()
+        finally:
+            cache.close()
+        return {url: entry["fields"] for url, entry in fetched.items()}
+
+    def close(self):
+        self._executor.shutdown()
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _session(self, proxy: Optional[str]) -> requests.Session:
+        with self._sessions_lock:
+            session = self._sessions.get(proxy)
+            if session is None:
+                session = self._sessions[proxy] = self._session_factory()
+                session.headers.update(HEADERS)
+                if proxy:
+                    session.proxies = {"http": proxy, "https": proxy}
+                # every worker can hold a connection of the proxy's pool
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+            return session
+
+    def _fetch_page(self, url: str, cached: Optional[dict]) -> Optional[dict]:
+        """the cache entry of the page, a 304 keeps the cached fields. when every try failed the cached entry (as it
+        was, so it's revalidated next time) or None"""
+        host = urlparse(url).netloc
+        parser = _parser_for(url)
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for _ in range(self.retries + 1):
+            proxy = self.pool.acquire()
+            self.rate_limiter.wait((host, proxy))
+            try:
+                response = self._session(proxy).get(url, headers=headers, timeout=self.timeout)
+            except Exception as e:
+                logging.warning(f"[fetch] {url}: {e}")
+                self.pool.report_failure(proxy)
+                continue
+
+            if response.status_code == 304 and cached is not None:
+                return {**cached, "fetched_at": time.time()}
+            if response.status_code in RETRY_STATUS_CODES:
+                logging.warning(f"[fetch] {url}: status {response.status_code}")
+                self.pool.report_failure(proxy)
+                continue
+            if response.status_code != 200:
+                logging.warning(f"[fetch] {url}: status {response.status_code}")
+                return None
+
+            fields = parser(response.text)
+            if fields is None:
+                # a login wall or a captcha instead of the job page, the site doesn't like this proxy right now
+                logging.warning(f"[fetch] {url}: no description on the page")
+                self.pool.report_failure(proxy)
+                continue
+            return {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "fields": fields,
+            }
+
+        logging.error(f"[fetch] giving up on {url}")
+        return cached
+
+
+def _parser_for(url: str) -> Optional[Callable[[str], Optional[dict]]]:
+    return PAGE_PARSERS.get(urlparse(url).netloc)
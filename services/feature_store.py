@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+from itertools import compress
+from typing import Optional
+
+import numpy as np
+
+from config.job_scoring_config import KEYWORDS_CONFIG, MUST_HAVE, HARD_AVOID
+from models.job_analysis import KeywordFeatures, ScoreResult
+from services.bm25f_index import BM25FIndex
+from services.job_analysis import ALPHA, config_fingerprint, keyword_features_batch, positive_terms
+from utils.instrumentation import stage
+
+FEATURE_STORE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                       "job_features.npz")
+SECTIONS = ["requirements", "responsibilities", "about"]
+# soft_cap_negative
+NEGATIVE_CAP = 50.0
+
+
+def weight_class(weight: int) -> int:
+    """what the features depend on besides the keyword itself - positive keywords are fuzzy matched, -1000 and
+    below is not counted outside the requirements"""
+    if weight > 0:
+        return 1
+    if weight == 0:
+        return 0
+    return -1 if weight > -1000 else -2
+
+
+def base_fingerprint(must_have: set[str] = MUST_HAVE, hard_avoid: set[str] = HARD_AVOID) -> str:
+    """config_fingerprint of everything but the keywords (SCORING_VERSION included)"""
+    return config_fingerprint({}, must_have, hard_avoid)
+
+
+def description_hash(description: str) -> str:
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+class FeatureStore:
+    """Per job keyword features (see job_analysis.keyword_features) and bm25f stats, so the jobs can be rescored
+    after a change to the keyword weights without reading their descriptions again.
+
+    the keyword score of every job is one matrix-vector product of its linear coefficients with the weights, plus
+    the capped negatives of soft sentences, the bm25f is scored from the stored term frequencies.
+    the features hold while the gates, sections, cues and keywords stay the same and no weight changes sign
+    (positive/zero/negative/-1000 and below, see weight_class). removing keywords only needs a new text pass for
+    the jobs that hit them, any other change and every job is read again.
+    jobs are keyed by the hash of their description, rows of descriptions we didn't see yet are added as needed
+    """
+
+    def __init__(self, base: str, keywords: list[str], classes: list[int]):
+        self.base = base
+        self.keywords = list(keywords)
+        self.classes = list(classes)
+        self.terms = [kw for kw, cls in zip(self.keywords, self.classes) if cls > 0]
+        self.n_fields = len(BM25FIndex([]).fields)
+
+        self.keys: list[str] = []
+        self.fail_reasons: list[str] = []
+        self.linear = np.zeros((0, len(self.keywords)), dtype=np.float64)
+        self.hits = np.zeros((0, len(SECTIONS), len(self.keywords)), dtype=bool)
+        self.capped_rows = np.zeros(0, dtype=np.int64)
+        self.capped_cols = np.zeros(0, dtype=np.int64)
+        self.capped_coefs = np.zeros(0, dtype=np.float64)
+        # term counts and field lengths are whole numbers, float32 keeps them exact at half the size
+        self.tf = np.zeros((0, self.n_fields, len(self.terms)), dtype=np.float32)
+        self.lengths = np.zeros((0, self.n_fields), dtype=np.float32)
+        self._rows: dict[str, int] = {}
+
+    @classmethod
+    def for_config(cls, keywords: dict[str, int] = KEYWORDS_CONFIG, must_have: set[str] = MUST_HAVE,
+                   hard_avoid: set[str] = HARD_AVOID) -> "FeatureStore":
+        return cls(base_fingerprint(must_have, hard_avoid), list(keywords),
+                   [weight_class(w) for w in keywords.values()])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row(self, key: str) -> Optional[int]:
+        return self._rows.get(key)
+
+    def structure(self) -> list:
+        return [self.base, list(zip(self.keywords, self.classes))]
+
+    def add(self, keys: list[str], extracted: list[tuple[KeywordFeatures, np.ndarray, np.ndarray]]):
+        """add (or replace) the rows of keys, extracted is what keyword_features_batch returns for them
+        (with the keywords of this store)"""
+        columns = {kw: idx for idx, kw in enumerate(self.keywords)}
+        linear = np.zeros((len(keys), len(self.keywords)), dtype=np.float64)
+        hits = np.zeros((len(keys), len(SECTIONS), len(self.keywords)), dtype=bool)
+        capped: list[tuple[int, int, float]] = []
+        for idx, (features, _, _) in enumerate(extracted):
+            for kw, coef in features.linear.items():
+                linear[idx, columns[kw]] = coef
+            for sec_idx, sec in enumerate(SECTIONS):
+                for kw in features.matched_by_section.get(sec, ()):
+                    hits[idx, sec_idx, columns[kw]] = True
+            capped.extend((idx, columns[kw], coef) for kw, coef in features.capped)
+
+        rows = []
+        for key in keys:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = len(self.keys)
+                self.keys.append(key)
+                self.fail_reasons.append("")
+            rows.append(row)
+        rows = np.array(rows, dtype=np.int64)
+
+        grow = len(self.keys) - len(self.linear)
+        self.linear = np.concatenate([self.linear, np.zeros((grow, len(self.keywords)))])
+        self.hits = np.concatenate([self.hits, np.zeros((grow, *self.hits.shape[1:]), dtype=bool)])
+        self.tf = np.concatenate([self.tf, np.zeros((grow, *self.tf.shape[1:]), dtype=np.float32)])
+        self.lengths = np.concatenate([self.lengths, np.zeros((grow, self.n_fields), dtype=np.float32)])
+
+        self.linear[rows] = linear
+        self.hits[rows] = hits
+        for row, (features, tf, lengths) in zip(rows, extracted):
+            self.fail_reasons[row] = features.fail_reason or ""
+            # jobs that failed a gate have no bm25f stats
+            self.tf[row] = tf if tf is not None else 0
+            self.lengths[row] = lengths if lengths is not None else 0
+
+        keep = ~np.isin(self.capped_rows, rows)
+        new_capped = np.array(capped, dtype=np.float64).reshape(-1, 3)
+        self.capped_rows = np.concatenate([self.capped_rows[keep], rows[new_capped[:, 0].astype(np.int64)]])
+        self.capped_cols = np.concatenate([self.capped_cols[keep], new_capped[:, 1].astype(np.int64)])
+        self.capped_coefs = np.concatenate([self.capped_coefs[keep], new_capped[:, 2]])
+
+    def drop_keywords(self, keywords: dict[str, int]) -> list[str]:
+        """drop the columns of the keywords that are not in keywords anymore, returns the keys of the jobs that
+        hit one of them (their features are stale and need a new text pass)"""
+        keep = np.array([kw in keywords for kw in self.keywords], dtype=bool)
+        stale = self.hits[:, :, ~keep].any(axis=(1, 2)) | (self.linear[:, ~keep] != 0).any(axis=1)
+        stale[self.capped_rows[~keep[self.capped_cols]]] = True
+
+        term_keep = np.array([kw in keywords for kw in self.terms], dtype=bool)
+        col_map = np.cumsum(keep) - 1
+        capped_keep = keep[self.capped_cols]
+        self.capped_rows = self.capped_rows[capped_keep]
+        self.capped_cols = col_map[self.capped_cols[capped_keep]]
+        self.capped_coefs = self.capped_coefs[capped_keep]
+        self.linear = self.linear[:, keep]
+        self.hits = self.hits[:, :, keep]
+        self.tf = self.tf[:, :, term_keep]
+        self.keywords = [kw for kw, ok in zip(self.keywords, keep) if ok]
+        self.classes = [cls for cls, ok in zip(self.classes, keep) if ok]
+        self.terms = [kw for kw, ok in zip(self.terms, term_keep) if ok]
+        return [key for key, is_stale in zip(self.keys, stale) if is_stale]
+
+    def remove(self, keys: set[str]):
+        if not keys:
+            return
+        keep = np.array([key not in keys for key in self.keys], dtype=bool)
+        new_rows = np.cumsum(keep) - 1
+        capped_keep = keep[self.capped_rows]
+        self.capped_rows = new_rows[self.capped_rows[capped_keep]]
+        self.capped_cols = self.capped_cols[capped_keep]
+        self.capped_coefs = self.capped_coefs[capped_keep]
+        self.linear = self.linear[keep]
+        self.hits = self.hits[keep]
+        self.tf = self.tf[keep]
+        self.lengths = self.lengths[keep]
+        self.keys = [key for key, ok in zip(self.keys, keep) if ok]
+        self.fail_reasons = [reason for reason, ok in zip(self.fail_reasons, keep) if ok]
+        self._rows = {key: idx for idx, key in enumerate(self.keys)}
+
+    def scores(self, rows: list[int], keywords: dict[str, int]) -> list[ScoreResult]:
+        """the ScoreResult of each row with the keyword weights, the bm25f is scored against the rows that passed
+        the gates (same as score_jobs_batch against its batch)"""
+        weights = np.array([keywords[kw] for kw in self.keywords], dtype=np.float64)
+        rows = np.array(rows, dtype=np.int64)
+
+        with stage("rescore_keywords"):
+            capped = np.maximum(weights[self.capped_cols] * self.capped_coefs, -NEGATIVE_CAP)
+            keyword_scores = self.linear[rows] @ weights
+            keyword_scores += np.bincount(self.capped_rows, weights=capped, minlength=len(self.keys))[rows]
+
+        with stage("rescore_bm25f"):
+            index = BM25FIndex(self.terms)
+            bm25f = np.zeros(len(rows))
+            passed = [idx for idx, row in enumerate(rows) if not self.fail_reasons[row]]
+            for idx in passed:
+                index.add_stats(self.tf[rows[idx]].astype(np.float64), self.lengths[rows[idx]].astype(np.float64))
+            if passed:
+                bm25f[passed] = index.scores()
+
+        results = []
+        for row, row_hits, kw_score, row_bm25f in zip(rows.tolist(), self.hits[rows].tolist(), keyword_scores.tolist(),
+                                                      bm25f.tolist()):
+            fail_reason = self.fail_reasons[row]
+            if fail_reason:
+                results.append(ScoreResult(-1000.0, False, fail_reason, {}, 0.0))
+                continue
+            matched_by_section = {sec: {kw: keywords[kw] for kw in compress(self.keywords, sec_hits)}
+                                  for sec, sec_hits in zip(SECTIONS, row_hits)}
+            results.append(ScoreResult(ALPHA * kw_score + (1 - ALPHA) * row_bm25f, True, None, matched_by_section,
+                                       row_bm25f, kw_score))
+        return results
+
+    def save(self, file_path: str = None):
+        path = file_path or FEATURE_STORE_FILE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # written next to the store and moved over it, a crash mid write leaves the old store
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                structure=np.array(json.dumps(self.structure())),
+                keys=np.array(self.keys, dtype="U64"),
+                fail_reasons=np.array(self.fail_reasons, dtype=str),
+                linear=self.linear,
+                hits=self.hits,
+                capped_rows=self.capped_rows,
+                capped_cols=self.capped_cols,
+                capped_coefs=self.capped_coefs,
+                tf=self.tf,
+                lengths=self.lengths,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, file_path: str = None) -> Optional["FeatureStore"]:
+        """the saved store, None when there is none"""
+        path = file_path or FEATURE_STORE_FILE_PATH
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            base, keywords = json.loads(str(data["structure"]))
+            store = cls(base, [kw for kw, _ in keywords], [cls_ for _, cls_ in keywords])
+            store.keys = data["keys"].tolist()
+            store.fail_reasons = data["fail_reasons"].tolist()
+            for name in ["linear", "hits", "capped_rows", "capped_cols", "capped_coefs", "tf", "lengths"]:
+                setattr(store, name, data[name])
+        store._rows = {key: idx for idx, key in enumerate(store.keys)}
+        return store
+
+
+def rescore_descriptions(
+    descriptions: list,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+    file_path: str = None,
+    workers: Optional[int] = None,
+) -> list[Optional[ScoreResult]]:
+    """same scores as score_jobs_batch, but from the feature store - only the descriptions the store doesn't have
+    (or whose features a config change made stale) are read, then the store is saved for the next time.
+    after a weight change this is a matrix-vector product over the stored features instead of a text pass"""
+    with stage("feature_store_load"):
+        store = FeatureStore.load(file_path)
+    config_store = FeatureStore.for_config(keywords, must_have, hard_avoid)
+
+    stale: list[str] = []
+    if store is None or store.base != config_store.base:
+        store = config_store
+    elif store.keywords != config_store.keywords or store.classes != config_store.classes:
+        stale = store.drop_keywords(keywords)
+        # only removed keywords can be dropped, a new keyword or a weight that changed sign can hit any job
+        if store.keywords != config_store.keywords or store.classes != config_store.classes:
+            store, stale = config_store, []
+
+    descriptions = list(descriptions)
+    keys = [description_hash(desc) if isinstance(desc, str) else None for desc in descriptions]
+    # stale jobs that are not in this batch are forgotten, they are read again when a batch has them
+    store.remove(set(stale))
+    missing = {key: desc for key, desc in zip(keys, descriptions) if key and store.row(key) is None}
+    if missing or stale:
+        extracted = keyword_features_batch(list(missing.values()), workers=workers, keywords=keywords,
+                                           must_have=must_have, hard_avoid=hard_avoid)
+        found = [(key, item) for key, item in zip(missing, extracted) if item]
+        store.add([key for key, _ in found], [item for _, item in found])
+        with stage("feature_store_save"):
+            store.save(file_path)
+
+    rows = [store.row(key) if key else None for key in keys]
+    scored = iter(store.scores([row for row in rows if row is not None], keywords))
+    return [next(scored) if row is not None else None for row in rows]
@@ -0,0 +1,114 @@
+import re
+from typing import Callable, Iterable, Optional
+
+# the chars a token is made of (see job_analysis.TOKEN_PATTERN)
+TOKEN_CHARS = re.compile(r"[a-z0-9#+/]")
+# what check returns when the text alone doesn't settle the gates
+UNDECIDED: tuple[bool, Optional[str]] = (False, None)
+
+
+class GateScanner:
+    """The HARD_AVOID / MUST_HAVE gates decided from the raw (lowercased) text, with one regex scan for all the
+    terms before the description is sectioned or tokenized.
+
+    the gates are on tokens, and a term showing up in the text isn't always a token ("php" in "phpunit") while
+    a normalize variant can make a token that isn't in the text as is, so the scanner only answers when the text
+    settles it:
+      - a term that isn't in the text is not a token, unless it's a term a normalize variant can make (those are
+        never trusted)
+      - a term with non token chars around it, inside one section and not touching a normalize variant, is a token
+    anything else is UNDECIDED and the caller gates the parsed description. the answer is always the one
+    job_analysis.gate_failure gives, including which hard avoid term is reported
+    """
+
+    def __init__(self, must_have: Iterable[str], hard_avoid: Iterable[str], variants: re.Pattern,
+                 replacements: Iterable[str]):
+        # same order gate_failure checks them in
+        self.must_have = list(must_have)
+        self.hard_avoid = list(hard_avoid)
+        self.variants = variants
+        terms = list(dict.fromkeys([*self.hard_avoid, *self.must_have]))
+        replacements = list(replacements)
+        self._trusted = {term for term in terms
+                         if all(TOKEN_CHARS.fullmatch(ch) for ch in term)
+                         and not variants.search(term)
+                         and not any(repl in term for repl in replacements)}
+
+        # terms that can overlap in the text need a lookahead so every start is found, e.g. "web" and "web3"
+        alternation = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        overlapping = any(a != b and (b in a or any(a.endswith(b[:idx]) for idx in range(1, len(b))))
+                          for a in terms for b in terms)
+        self._pattern = re.compile(f"(?=({alternation}))" if overlapping else f"({alternation})") if terms else None
+        # the terms found at a start where the longest match is the key
+        self._prefixes = {term: [t for t in terms if term.startswith(t)] for term in terms}
+
+    def check(self, lower: str,
+              sections: Callable[[], list[tuple[str, int, int]]]) -> tuple[bool, Optional[str]]:
+        """(decided, fail reason) - (True, None) passed the gates, (True, reason) failed them, UNDECIDED when the
+        parsed description is needed. sections gives the section spans of the text (SectionSplitter.spans), it's
+        only called when the must have terms are in the text"""
+        found: dict[str, list[int]] = {}
+        if self._pattern is not None:
+            for match in self._pattern.finditer(lower):
+                for term in self._prefixes[match.group(1)]:
+                    found.setdefault(term, []).append(match.start())
+
+        context = _ScanContext(lower, self.variants, sections)
+        for term in self.hard_avoid:
+            if term not in found:
+                if term in self._trusted:
+                    continue
+                return UNDECIDED
+            if term in self._trusted and any(context.is_token(term, start) for start in found[term]):
+                return True, f"hard_avoid:{term}"
+            return UNDECIDED
+
+        all_found = True
+        for term in self.must_have:
+            if term not in self._trusted:
+                return UNDECIDED
+            starts = [start for start in found.get(term, ()) if context.in_requirements(term, start)]
+            if not starts:
+                return True, "missing_must_have"
+            if not any(context.is_token(term, start) for start in starts):
+                all_found = False
+        return (True, None) if all_found else UNDECIDED
+
+
+class _ScanContext:
+    """the section spans and normalize variant matches of one text, only looked up when a term needs them"""
+
+    def __init__(self, lower: str, variants: re.Pattern, sections: Callable[[], list[tuple[str, int, int]]]):
+        self.lower = lower
+        self._variants = variants
+        self._sections = sections
+        self._spans: Optional[list[tuple[str, int, int]]] = None
+        self._variant_spans: Optional[list[tuple[int, int]]] = None
+
+    def spans(self) -> list[tuple[str, int, int]]:
+        if self._spans is None:
+            self._spans = self._sections()
+        return self._spans
+
+    def in_requirements(self, term: str, start: int) -> bool:
+        end = start + len(term)
+        return any(sec == "requirements" and sec_start <= start and end <= sec_end
+                   for sec, sec_start, sec_end in self.spans())
+
+    def is_token(self, term: str, start: int) -> bool:
+        end = start + len(term)
+        lower = self.lower
+        if start > 0 and TOKEN_CHARS.match(lower, start - 1):
+            return False
+        if end < len(lower) and TOKEN_CHARS.match(lower, end):
+            return False
+        # a section header next to the term would split the text there
+        if not any(sec_start <= start and end <= sec_end for _, sec_start, sec_end in self.spans()):
+            return False
+        if self._variant_spans is None:
+            # the tokenizer matches the variants on each section on its own, a header right before or after one
+            # is the start or end of the text there
+            self._variant_spans = [(sec_start + match.start(), sec_start + match.end())
+                                   for _, sec_start, sec_end in self.spans()
+                                   for match in self._variants.finditer(lower[sec_start:sec_end])]
+        return not any(var_start < end and start < var_end for var_start, var_end in self._variant_spans)
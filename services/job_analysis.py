@@ -1,10 +1,31 @@
+import hashlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
 import re
-from rank_bm25 import BM25Okapi
-from rapidfuzz import fuzz, process as rf_process
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Iterator, Optional
 
+import numpy as np
+
+from config import job_scoring_config
 from config.job_scoring_config import SECTION_HEADERS, KEYWORDS_CONFIG, MUST_HAVE, HARD_AVOID, SOFT_CUES, STRONG_CUES, \
     EXAMPLE_CUES
-from models.job_analysis import ScoreResult
+from models.job_analysis import ScoreResult, ParsedDescription, SentenceSpan, SentenceFeatures, KeywordFeatures
+from services.bm25f_index import BM25FIndex, BM25FStats
+from services.gate_scanner import GateScanner, UNDECIDED
+from services.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from services.section_splitter import SectionSplitter
+from utils.instrumentation import INSTRUMENTATION, stage, timed
+from utils.score_cache import ScoreCache
 
 NORMALIZE_VARIANTS = [
     (re.compile(r"\bci\s*/\s*cd\b", re.I), "cicd"),
@@ -14,20 +35,53 @@ NORMALIZE_VARIANTS = [
     (re.compile(r"\bc#\b", re.I), "csharp"),
 ]
 
-def sentence_strength_multiplier(text: str) -> float:
+# one pass tokenizer - a token is a run of [a-z0-9#+/] chars where a NORMALIZE_VARIANTS match counts as its replacement
+_ANY_VARIANT = "|".join(f"(?i:{rx.pattern})" for rx, _ in NORMALIZE_VARIANTS)
+TOKEN_PATTERN = re.compile(
+    "|".join(f"(?P<v{idx}>(?i:{rx.pattern}))" for idx, (rx, _) in enumerate(NORMALIZE_VARIANTS))
+    + rf"|(?:(?!{_ANY_VARIANT})[a-z0-9#+/])+"
+)
+_VARIANT_REPLACEMENTS = {f"v{idx}": repl for idx, (_, repl) in enumerate(NORMALIZE_VARIANTS)}
+
+SECTION_SPLITTER = SectionSplitter(SECTION_HEADERS)
+
+LIST_DELIMITERS = re.compile(r"(?:\n|\r|•|\*|- )+")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+OR_GROUP = re.compile(r"\bor\b", re.I)
+
+# how much of the final score comes from the keyword score, the rest is bm25f
+ALPHA = 0.4
+
+# part of config_fingerprint (and the feature store's fingerprint), bump it with every change to the scoring code
+# that changes a score (tokenizer, splitter, gates...) so the cached scores and stored features of the old code
+# are not used
+SCORING_VERSION = 1
+
+# boilerplate requirement sentences ("experience with aws") repeat across postings, so their features are kept
+# in an lru keyed by the (lowercased) sentence and the keyword matcher they were scored with
+SENTENCE_CACHE_SIZE = 50_000
+_sentence_features: OrderedDict[tuple[str, KeywordMatcher], SentenceFeatures] = OrderedDict()
+
+# a worker process costs tens of ms to start and warm up while a description scores in about a ms, so a batch only
+# goes to as many workers as get this many descriptions each (smaller batches are scored in this process)
+MIN_DESCRIPTIONS_PER_WORKER = 50
+
+def sentence_strength_multiplier(text: str, start: int = 0, end: int | None = None) -> float:
     """We want to give more/less weight to each sentence additional weight based on
         cues we find in it.
         for example:
         'strong experience with python' will have multiplayer of 1.0 - so it will get the full weight of the word python
         'nice to have experience with python' will have a multiplayer of 0.35 - so the weight of the python keyword
         will be lowered
+        start/end let us check a single sentence of the full description without slicing it out
     """
+    end = len(text) if end is None else end
     mult = 1.0
-    if SOFT_CUES.search(text):
+    if SOFT_CUES.search(text, start, end):
         mult *= 0.35
-    if STRONG_CUES.search(text):
+    if STRONG_CUES.search(text, start, end):
         pass  # leave at 1.0
-    if EXAMPLE_CUES.search(text) or ("(" in text and ")" in text):
+    if EXAMPLE_CUES.search(text, start, end) or (text.find("(", start, end) != -1 and text.find(")", start, end) != -1):
         mult *= 0.5
     return mult
 
@@ -41,23 +95,27 @@ def split_requirement_sentences(req_text: str) -> list[str]:
             will return
             ['3–5 years experience', 'React/Next.js.', 'Node.js, Python?', 'REST/GraphQL']
     """
-    lines = re.split(r"(?:\n|\r|•|\*|- )+", req_text)
-    sentences = []
-    for ln in lines:
-        ln = ln.strip()
-        if not ln:
-            continue
-        parts = re.split(r"(?<=[.!?])\s+", ln)
-        sentences.extend(p for p in parts if p)
-    return sentences
+    return [req_text[start:end] for start, end in _sentence_spans(req_text, 0, len(req_text))]
 
-def adjust_negative_for_or_group(sent: str, base_penalty: float) -> float:
-    """This will adjust back up a score weight of an or group
-    example: 'java or python'
-    """
-    if re.search(r"\bor\b", sent, re.I):
-        return base_penalty * 0.5
-    return base_penalty
+def _split_spans(pattern: re.Pattern, text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """same as pattern.split(text[start:end]) but returns offsets into text"""
+    for match in pattern.finditer(text, start, end):
+        yield start, match.start()
+        start = match.end()
+    yield start, end
+
+def _sentence_spans(text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    for line_start, line_end in _split_spans(LIST_DELIMITERS, text, start, end):
+        # strip the line
+        while line_start < line_end and text[line_start].isspace():
+            line_start += 1
+        while line_end > line_start and text[line_end - 1].isspace():
+            line_end -= 1
+        if line_start == line_end:
+            continue
+        for sent_start, sent_end in _split_spans(SENTENCE_END, text, line_start, line_end):
+            if sent_start < sent_end:
+                yield sent_start, sent_end
 
 def soft_cap_negative(pen: float, is_soft: bool, cap: float = 50.0) -> float:
     """This will cap the negative value of a keyword if the sentence has a soft cue
@@ -69,15 +127,35 @@ def soft_cap_negative(pen: float, is_soft: bool, cap: float = 50.0) -> float:
         return -min(abs(pen), cap)
     return pen
 
+def _scan_tokens(text: str, start: int, end: int, tokens: list[str], offsets: list[int], ends: list[int] = None):
+    """tokenize text[start:end] (already lowercased) into tokens, offsets gets the start of each token in text
+    (and ends where it ends)"""
+    # matched on the slice, not with finditer's pos, so the \b of a variant sees the piece start as the start of
+    # the text and not the header glued before it (e.g. "requirementsnode.js")
+    prev_end = -1
+    for match in TOKEN_PATTERN.finditer(text[start:end]):
+        variant = match.lastgroup
+        tok = _VARIANT_REPLACEMENTS[variant] if variant else match.group()
+        # a variant glued to other token chars is still one token (e.g. "aws/ci/cd" -> "aws/cicd")
+        if match.start() == prev_end:
+            tokens[-1] += tok
+            if ends is not None:
+                ends[-1] = start + match.end()
+        else:
+            tokens.append(tok)
+            offsets.append(start + match.start())
+            if ends is not None:
+                ends.append(start + match.end())
+        prev_end = match.end()
+
 def normalize_text(text: str) -> str:
-    t = text.lower()
-    for rx, repl in NORMALIZE_VARIANTS:
-        t = rx.sub(repl, t)
-    t = re.sub(r"[^a-z0-9#+/]+", " ", t)
-    return re.sub(r"\s+", " ", t).strip()
+    return " ".join(tokenize(text))
 
 def tokenize(text: str) -> list[str]:
-    return normalize_text(text).split()
+    lower = text.lower()
+    tokens: list[str] = []
+    _scan_tokens(lower, 0, len(lower), tokens, [])
+    return tokens
 
 def split_sections(raw_text: str) -> dict[str, str]:
     """split the job description the sections based on SECTION_HEADERS so we can give weight adjustments
@@ -92,118 +170,482 @@ def split_sections(raw_text: str) -> dict[str, str]:
     """
 
     lower = raw_text.lower()
-    sections = {key: "" for key in SECTION_HEADERS.keys()}
-    header_map = {h: sec for sec, job_descp in SECTION_HEADERS.items() for h in job_descp.headers}
-    pattern = r"(" + "|".join(re.escape(h.lower()) for h in header_map) + r")"
-    parts = re.split(pattern, lower)
-
-    current_sec = "about"
-    buffer = []
-
-    for part in parts:
-        if part in header_map:
-            sections[current_sec] += " " + " ".join(buffer)
-            buffer = []
-            current_sec = header_map[part]
-        else:
-            buffer.append(part)
-    sections[current_sec] += " " + " ".join(buffer)
-    return {k: v.strip() for k, v in sections.items()}
+    pieces: dict[str, list[str]] = {key: [] for key in SECTION_HEADERS.keys()}
+    for sec, start, end in SECTION_SPLITTER.spans(lower):
+        pieces[sec].append(lower[start:end])
+    return {k: " ".join(v).strip() for k, v in pieces.items()}
+
+@timed("parse_description")
+def parse_description(raw_text: str) -> ParsedDescription:
+    """lowercase and tokenize the job description once, keeping where each section and requirements sentence is
+
+    tokens are grouped by section (in SECTION_HEADERS order) so each section is one range of the token array,
+    sentences are only kept for the requirements section since that's the only one scored by sentence
+    """
+    lower = raw_text.lower()
+    pieces: dict[str, list[tuple[int, int]]] = {sec: [] for sec in SECTION_HEADERS}
+    for sec, start, end in SECTION_SPLITTER.spans(lower):
+        pieces[sec].append((start, end))
+
+    tokens: list[str] = []
+    offsets: list[int] = []
+    ends: list[int] = []
+    sections: dict[str, tuple[int, int]] = {}
+    sentences: list[SentenceSpan] = []
+    for sec, spans in pieces.items():
+        sec_start = len(tokens)
+        for start, end in spans:
+            piece_start = len(tokens)
+            if sec != "requirements":
+                _scan_tokens(lower, start, end, tokens, offsets)
+                continue
+            _scan_tokens(lower, start, end, tokens, offsets, ends)
+            for sent_start, sent_end in _sentence_spans(lower, start, end):
+                tok_start = bisect_left(offsets, sent_start, piece_start)
+                tok_end = bisect_left(offsets, sent_end, tok_start)
+                sent = SentenceSpan(sent_start, sent_end, tok_start, tok_end)
+                # a variant across a sentence boundary is one token of the section but not of the sentences
+                if (tok_end > tok_start and ends[tok_end - 1 - sec_start] > sent_end) or \
+                        (tok_start > piece_start and ends[tok_start - 1 - sec_start] > sent_start):
+                    sent.tokens = []
+                    _scan_tokens(lower, sent_start, sent_end, sent.tokens, [])
+                sentences.append(sent)
+        sections[sec] = (sec_start, len(tokens))
+
+    return ParsedDescription(lower, tokens, sections, sentences)
 
 def keyword_hits(text: str, keywords: dict[str, int], fuzzy_threshold: int = 90) -> dict[str, int]:
     """Find keyword hits in text, also use fuzzy matching to avoid scoring same positive keyword multiple times"""
-    tokens = set(tokenize(text))
-    hits: dict[str, int] = {}
-
-    for keyword, weight in keywords.items():
-        if keyword in tokens:
-            hits[keyword] = weight
-
-
-    candidates = [keyword for keyword, weight in keywords.items() if weight > 0 and keyword not in hits]
-    for tok in tokens:
-        match = None
-        score = 0
-        res = rf_process.extractOne(tok, candidates, scorer=fuzz.token_set_ratio)
-        if res:
-            match, score, _ = res
-        if match and score >= fuzzy_threshold:
-            hits.setdefault(match, keywords[match])
-    return hits
-
-def score_requirements_section(req_text: str, keywords: dict[str,int]) -> float:
+    return get_keyword_matcher(keywords, fuzzy_threshold).hits(tokenize(text))
+
+def sentence_features(parsed: ParsedDescription, sent: SentenceSpan, matcher: KeywordMatcher) -> SentenceFeatures:
+    """the cues, keyword hits and score of a sentence, a sentence that was already seen is a cache hit
+    instead of the cue regexes and the fuzzy pass"""
+    key = (parsed.text[sent.start:sent.end], matcher)
+    features = _sentence_features.get(key)
+    if features is not None:
+        _sentence_features.move_to_end(key)
+        return features
+
+    mult = sentence_strength_multiplier(parsed.text, sent.start, sent.end)
+    is_soft = mult < 1.0
+    or_group = OR_GROUP.search(parsed.text, sent.start, sent.end) is not None
+    hits = matcher.hits(parsed.sentence_tokens(sent))
+    score = 0.0
+    for kw, w in hits.items():
+        adj = w * mult
+        if w < 0:
+            # a negative keyword in an or group ("java or python") only counts half
+            if or_group:
+                adj *= 0.5
+            adj = soft_cap_negative(adj, is_soft, cap=50.0)
+        score += adj
+
+    features = SentenceFeatures(mult, is_soft, or_group, hits, score)
+    _sentence_features[key] = features
+    if len(_sentence_features) > SENTENCE_CACHE_SIZE:
+        _sentence_features.popitem(last=False)
+    return features
+
+def score_requirements_section(parsed: ParsedDescription, keywords: dict[str,int]) -> float:
+    matcher = get_keyword_matcher(keywords)
     total = 0.0
-    sentences = split_requirement_sentences(req_text)
-    for sent in sentences:
-        mult = sentence_strength_multiplier(sent)
-        is_soft = mult < 1.0
-        hits = keyword_hits(sent, keywords)
-        for kw, w in hits.items():
-            adj = w * mult
-            if w < 0:
-                adj = adjust_negative_for_or_group(sent, adj)
-                adj = soft_cap_negative(adj, is_soft, cap=50.0)
-            total += adj
+    for sent in parsed.sentences:
+        total += sentence_features(parsed, sent, matcher).score
     return total
 
-def bm25f_score(sections: dict[str,str], query_terms: list[str]) -> float:
-    """I'm using BM25 per section to also help with the score"""
-    total = 0.0
+def bm25f_score(parsed: ParsedDescription, query_terms: list[str]) -> float:
+    """BM25F of a single description, the description is its own corpus here so the idf doesn't say much -
+    when scoring a batch use score_jobs_batch which scores against the whole batch"""
+    index = BM25FIndex(query_terms)
+    return index.score(index.add(parsed))
 
-    for sec, text in sections.items():
-        if len(text) == 0:
-            continue
-        toks = tokenize(text)
-        bm25 = BM25Okapi([toks])
-        sec_score = bm25.get_scores(query_terms)[0]
-        total += SECTION_HEADERS.get(sec, 1.0).weight * float(sec_score)
+def positive_terms(keywords: dict[str, int]) -> list[str]:
+    return [k for k,w in keywords.items() if w > 0]
 
-    return total
+def apply_bm25f(result: ScoreResult, bm25f: float) -> ScoreResult:
+    """mix the keyword score with the bm25 result, jobs that failed a gate keep their -1000"""
+    if result.gates_passed:
+        result.bm25f = bm25f
+        result.score = ALPHA * result.keyword_score + (1 - ALPHA) * bm25f
+    return result
 
-def score_job_description(
-    raw_text: str,
-    keywords: dict[str, int] = KEYWORDS_CONFIG,
-    must_have: set[str] = MUST_HAVE,
-    hard_avoid: set[str] = HARD_AVOID,
-) -> ScoreResult:
-    sections = split_sections(raw_text)
+@lru_cache(maxsize=32)
+def _get_gate_scanner(must_have: tuple[str, ...], hard_avoid: tuple[str, ...]) -> GateScanner:
+    return GateScanner(must_have, hard_avoid, re.compile(_ANY_VARIANT), _VARIANT_REPLACEMENTS.values())
+
+@timed("gate_scan")
+def gate_description(raw_text: str, must_have: set[str] = MUST_HAVE,
+                     hard_avoid: set[str] = HARD_AVOID) -> tuple[bool, Optional[str]]:
+    """the gates from the raw text before any parsing, (decided, fail reason) - most postings that fail a gate
+    are settled here for the cost of one regex scan, UNDECIDED ones need gate_failure on the parsed description
+    (see GateScanner)"""
+    lower = raw_text.lower()
+    scanner = _get_gate_scanner(tuple(must_have), tuple(hard_avoid))
+    return scanner.check(lower, lambda: SECTION_SPLITTER.spans(lower))
 
+def gate_failure(parsed: ParsedDescription, must_have: set[str], hard_avoid: set[str]) -> Optional[str]:
+    """the reason the job fails a gate, None when it passes them"""
     # First gate the check if raw text has and avoid keyword
     # todo - it may be better the only hard avoid if the keyword is in the requirements
-    tokens = set(tokenize(raw_text))
+    tokens = set(parsed.tokens)
     for term in hard_avoid:
         if term in tokens:
-            return ScoreResult(-1000.0, False, f"hard_avoid:{term}", {}, 0.0)
+            return f"hard_avoid:{term}"
 
     # Another gate here if my "must have" requirements are missing from the requirements section
     # currently it's only to check if the job has python in the description but I may evolve on this if
     # I see good scores on jobs I really don't want
-    req_tokens = set(tokenize(sections.get("requirements","")))
+    req_tokens = set(parsed.section_tokens("requirements"))
     if not must_have.issubset(req_tokens):
-        return ScoreResult(-1000.0, False, "missing_must_have", {}, 0.0)
+        return "missing_must_have"
+    return None
+
+def keyword_features(
+    parsed: ParsedDescription,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+    gates_checked: bool = False,
+) -> KeywordFeatures:
+    """score_parsed_description without the keyword weights, the keyword score for any weights is
 
+        sum(coef * weights[kw] for kw, coef in linear.items()) + sum(max(coef * weights[kw], -50) for kw, coef in capped)
+
+    (capped is soft_cap_negative). the features stay valid while the keywords and the sign of each weight stay the
+    same, the fuzzy matching only looks at the positive keywords
+    """
+    fail_reason = None if gates_checked else gate_failure(parsed, must_have, hard_avoid)
+    if fail_reason is not None:
+        return KeywordFeatures(fail_reason, {}, [], {})
 
+    matcher = get_keyword_matcher(keywords)
+    linear: dict[str, float] = {}
+    capped: list[tuple[str, float]] = []
+    for sent in parsed.sentences:
+        features = sentence_features(parsed, sent, matcher)
+        for kw, w in features.hits.items():
+            coef = features.multiplier
+            if w < 0:
+                if features.or_group:
+                    coef *= 0.5
+                if features.is_soft:
+                    capped.append((kw, coef))
+                    continue
+            linear[kw] = linear.get(kw, 0.0) + coef
+
+    matched_by_section = {"requirements": list(matcher.hits(parsed.section_tokens("requirements")))}
+    for sec in ("responsibilities", "about"):
+        hits = matcher.hits(parsed.section_tokens(sec))
+        mult = SECTION_HEADERS.get(sec).weight
+        for kw, w in hits.items():
+            if w > -1000:
+                linear[kw] = linear.get(kw, 0.0) + mult
+        matched_by_section[sec] = list(hits)
+    return KeywordFeatures(None, linear, capped, matched_by_section)
+
+@timed("keyword_scoring")
+def score_parsed_description(
+    parsed: ParsedDescription,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+    gates_checked: bool = False,
+) -> ScoreResult:
+    """gates and keyword scoring, the bm25f part is added with apply_bm25f once we know the corpus.
+    gates_checked skips the gates when gate_description already passed the description"""
+    fail_reason = None if gates_checked else gate_failure(parsed, must_have, hard_avoid)
+    if fail_reason is not None:
+        return ScoreResult(-1000.0, False, fail_reason, {}, 0.0)
+
+    matcher = get_keyword_matcher(keywords)
     matched_by_section: dict[str, dict[str,int]] = {}
     # score the "requirements" section
-    req_score = score_requirements_section(sections.get("requirements",""), keywords)
-    matched_by_section["requirements"] = keyword_hits(sections.get("requirements",""), keywords)
+    req_score = score_requirements_section(parsed, keywords)
+    matched_by_section["requirements"] = matcher.hits(parsed.section_tokens("requirements"))
 
 
     other = 0.0
     # score the other two sections
     for sec in ("responsibilities", "about"):
-        hits = keyword_hits(sections.get(sec,""), keywords)
+        hits = matcher.hits(parsed.section_tokens(sec))
         mult = SECTION_HEADERS.get(sec).weight
         other += sum(mult * w for w in hits.values() if w > -1000)
         matched_by_section[sec] = hits
 
     kw_score = req_score + other
-    query_terms = [k for k,w in keywords.items() if w > 0]
-    bm25f = bm25f_score(sections, query_terms)
-    alpha = 0.4
-    # mix kw_score with the bm25 result
-    final = alpha * kw_score + (1-alpha) * bm25f
-    return ScoreResult(final, True, None, matched_by_section, bm25f)
+    return ScoreResult(ALPHA * kw_score, True, None, matched_by_section, 0.0, kw_score)
+
+def score_job_description(
+    raw_text: str,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+) -> ScoreResult:
+    decided, fail_reason = gate_description(raw_text, must_have, hard_avoid)
+    if fail_reason is not None:
+        return ScoreResult(-1000.0, False, fail_reason, {}, 0.0)
+    parsed = parse_description(raw_text)
+    result = score_parsed_description(parsed, keywords, must_have, hard_avoid, gates_checked=decided)
+    if not result.gates_passed:
+        return result
+    return apply_bm25f(result, bm25f_score(parsed, positive_terms(keywords)))
+
+def _score_chunk(descriptions: list, keywords: dict[str, int], must_have: set[str],
+                 hard_avoid: set[str]) -> list[Optional[tuple[ScoreResult, np.ndarray, np.ndarray]]]:
+    """keyword score each description and collect its bm25f stats, the bm25f itself needs the whole batch.
+    a description that fails a gate has no bm25f stats (None, None), it's not part of the bm25f corpus"""
+    index = BM25FIndex(positive_terms(keywords))
+    results: list[Optional[tuple[ScoreResult, Optional[np.ndarray], Optional[np.ndarray]]]] = []
+    for desc in descriptions:
+        # descriptions that failed to scrape come back as nan
+        if not isinstance(desc, str):
+            results.append(None)
+            continue
+        try:
+            start = time.perf_counter() if INSTRUMENTATION.enabled else 0
+            decided, fail_reason = gate_description(desc, must_have, hard_avoid)
+            if fail_reason is not None:
+                results.append((ScoreResult(-1000.0, False, fail_reason, {}, 0.0), None, None))
+            else:
+                parsed = parse_description(desc)
+                result = score_parsed_description(parsed, keywords, must_have, hard_avoid, gates_checked=decided)
+                results.append((result, *index.document_stats(parsed)) if result.gates_passed
+                               else (result, None, None))
+            if INSTRUMENTATION.enabled:
+                INSTRUMENTATION.record_description(time.perf_counter() - start, desc)
+        except Exception as e:
+            logging.exception(e)
+            results.append(None)
+    return results
+
+def _feature_chunk(descriptions: list, keywords: dict[str, int], must_have: set[str],
+                   hard_avoid: set[str]) -> list[Optional[tuple[KeywordFeatures, np.ndarray, np.ndarray]]]:
+    """same as _score_chunk but keeps the keyword features instead of the keyword score"""
+    index = BM25FIndex(positive_terms(keywords))
+    results: list[Optional[tuple[KeywordFeatures, Optional[np.ndarray], Optional[np.ndarray]]]] = []
+    for desc in descriptions:
+        if not isinstance(desc, str):
+            results.append(None)
+            continue
+        try:
+            decided, fail_reason = gate_description(desc, must_have, hard_avoid)
+            if fail_reason is not None:
+                results.append((KeywordFeatures(fail_reason, {}, [], {}), None, None))
+                continue
+            parsed = parse_description(desc)
+            features = keyword_features(parsed, keywords, must_have, hard_avoid, gates_checked=decided)
+            results.append((features, *index.document_stats(parsed)) if features.fail_reason is None
+                           else (features, None, None))
+        except Exception as e:
+            logging.exception(e)
+            results.append(None)
+    return results
+
+def _score_chunk_in_worker(descriptions: list, keywords: dict[str, int], must_have: set[str],
+                           hard_avoid: set[str], chunk_fn=_score_chunk) -> tuple[list, Optional[dict]]:
+    """same as _score_chunk, also sends back the instrumentation stats of the chunk to merge in the parent process"""
+    if not INSTRUMENTATION.enabled:
+        return chunk_fn(descriptions, keywords, must_have, hard_avoid), None
+    INSTRUMENTATION.reset()
+    return chunk_fn(descriptions, keywords, must_have, hard_avoid), INSTRUMENTATION.snapshot()
+
+def _warm_up_worker(keywords: dict[str, int], instrument: bool = False):
+    """the regexes are compiled on import, so we only need to build the keyword matcher once per worker"""
+    if instrument:
+        INSTRUMENTATION.enable()
+    get_keyword_matcher(keywords)
+
+def scoring_pool(workers: Optional[int] = None, keywords: dict[str, int] = KEYWORDS_CONFIG) -> ProcessPoolExecutor:
+    """a process pool to pass to score_jobs_batch when it's called for many batches (e.g. every batch of a pipeline
+    run) so there is one pool instead of one per batch. the workers are spawned, not forked, since the caller has
+    other threads running and a forked worker can get a lock one of them held (logging, urllib3) and hang on it"""
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context("spawn"), initializer=_warm_up_worker,
+                               initargs=(keywords, INSTRUMENTATION.enabled))
+
+def config_fingerprint(
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+) -> str:
+    """hash of everything in the config (and the scoring code version) that changes a score, used so cached scores
+    of an old config are not used"""
+    config = {
+        "scoring_version": SCORING_VERSION,
+        "keywords": keywords,
+        "must_have": sorted(must_have),
+        "hard_avoid": sorted(hard_avoid),
+        "sections": {sec: [job_descp.weight, job_descp.headers] for sec, job_descp in SECTION_HEADERS.items()},
+        "cues": [[rx.pattern, rx.flags] for rx in (STRONG_CUES, SOFT_CUES, EXAMPLE_CUES)],
+        "variants": [[rx.pattern, repl] for rx, repl in NORMALIZE_VARIANTS],
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+def reload_scoring_config():
+    """re-read config/job_scoring_config.py without a restart (used by the scoring service)
+
+    the keywords, must have, hard avoid and section dicts/sets are updated in place, so the default arguments
+    and the modules that imported them see the new values. the cue regexes, the section splitter and the sentence
+    cache are rebuilt. when the config file fails to import the old config stays as it was and the error is raised
+    """
+    global STRONG_CUES, SOFT_CUES, EXAMPLE_CUES, SECTION_SPLITTER
+    old_config = dict(vars(job_scoring_config))
+    try:
+        importlib.reload(job_scoring_config)
+        section_splitter = SectionSplitter(job_scoring_config.SECTION_HEADERS)
+    except Exception:
+        vars(job_scoring_config).update(old_config)
+        raise
+
+    for name in ["SECTION_HEADERS", "KEYWORDS_CONFIG", "MUST_HAVE", "HARD_AVOID"]:
+        current, new = old_config[name], getattr(job_scoring_config, name)
+        if new is current:
+            continue
+        current.clear()
+        current.update(new)
+        setattr(job_scoring_config, name, current)
+
+    STRONG_CUES = job_scoring_config.STRONG_CUES
+    SOFT_CUES = job_scoring_config.SOFT_CUES
+    EXAMPLE_CUES = job_scoring_config.EXAMPLE_CUES
+    SECTION_SPLITTER = section_splitter
+    _sentence_features.clear()
+
+def description_key(description: str, fingerprint: str) -> str:
+    return f"{hashlib.sha256(description.encode()).hexdigest()}:{fingerprint}"
+
+def _encode_scored(item: tuple[ScoreResult, Optional[np.ndarray], Optional[np.ndarray]]) -> dict:
+    result, tf, lengths = item
+    if tf is None:
+        return {"result": asdict(result), "tf": None, "lengths": None}
+    return {"result": asdict(result), "tf": tf.tolist(), "lengths": lengths.tolist()}
+
+def _decode_scored(value: dict) -> tuple[ScoreResult, Optional[np.ndarray], Optional[np.ndarray]]:
+    if value["tf"] is None:
+        return ScoreResult(**value["result"]), None, None
+    return ScoreResult(**value["result"]), np.array(value["tf"]), np.array(value["lengths"])
+
+def _score_descriptions(descriptions: list, workers: int, chunk_size: Optional[int], keywords: dict[str, int],
+                        must_have: set[str], hard_avoid: set[str], chunk_fn=_score_chunk,
+                        executor: Optional[Executor] = None) -> list[Optional[tuple]]:
+    workers = min(workers, len(descriptions) // MIN_DESCRIPTIONS_PER_WORKER)
+    if workers <= 1:
+        return chunk_fn(descriptions, keywords, must_have, hard_avoid)
+    if chunk_size is None:
+        # a few chunks per worker so a slow chunk doesn't leave the other workers idle at the end
+        chunk_size = max(1, -(-len(descriptions) // (workers * 4)))
+
+    chunks = [descriptions[i:i + chunk_size] for i in range(0, len(descriptions), chunk_size)]
+    if len(chunks) <= 1:
+        return chunk_fn(descriptions, keywords, must_have, hard_avoid)
+
+    scored: list[Optional[tuple[ScoreResult, np.ndarray, np.ndarray]]] = []
+    pool = nullcontext(executor) if executor is not None else \
+        ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_warm_up_worker,
+                            initargs=(keywords, INSTRUMENTATION.enabled))
+    with pool as executor:
+        chunk_results = executor.map(_score_chunk_in_worker, chunks, [keywords] * len(chunks),
+                                     [must_have] * len(chunks), [hard_avoid] * len(chunks),
+                                     [chunk_fn] * len(chunks))
+        for chunk_result, stats in chunk_results:
+            scored.extend(chunk_result)
+            if stats is not None:
+                INSTRUMENTATION.merge(stats)
+    return scored
+
+def score_jobs_batch(
+    descriptions: list,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+    cache: Optional[ScoreCache] = None,
+    executor: Optional[Executor] = None,
+) -> list[Optional[ScoreResult]]:
+    """Score many job descriptions over a process pool, results are in the same order as descriptions.
+    a description that isn't a string or fails to score gets None (the error is logged) so one bad job
+    doesn't fail the whole batch.
+    the bm25f part is scored against a BM25FIndex of the descriptions of the batch that passed the gates (the ones
+    that failed one are not in the corpus and get a bm25f of 0) so it ranks the postings against each other.
+
+    with a cache, descriptions already scored with the same config (and repeats inside the batch) are not scored again,
+    the cache keeps the keyword score and bm25f stats so the bm25f is still scored against this batch.
+
+    workers defaults to the number of cpus, it's capped so every worker gets MIN_DESCRIPTIONS_PER_WORKER
+    descriptions - with workers=1, a small batch or a single chunk everything runs in this process.
+    a batch that does fan out gets a new process pool, unless it's given one to reuse as executor (see scoring_pool)
+    """
+    scored = score_keywords_batch(descriptions, workers, chunk_size, keywords, must_have, hard_avoid, cache,
+                                  executor)
+    return apply_bm25f_batch(scored, keywords)
+
+def score_keywords_batch(
+    descriptions: list,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+    cache: Optional[ScoreCache] = None,
+    executor: Optional[Executor] = None,
+) -> list[Optional[tuple[ScoreResult, np.ndarray, np.ndarray]]]:
+    """the first half of score_jobs_batch - the keyword score of every description with its bm25f stats
+    (term frequencies, field lengths - None when it failed a gate), before the bm25f is scored against a corpus"""
+    descriptions = list(descriptions)
+    workers = workers or os.cpu_count() or 1
+
+    if cache is None:
+        with stage("score_descriptions"):
+            return _score_descriptions(descriptions, workers, chunk_size, keywords, must_have, hard_avoid,
+                                       executor=executor)
+
+    fingerprint = config_fingerprint(keywords, must_have, hard_avoid)
+    # descriptions that failed to scrape come back as nan, they have no key and no score
+    keys = [description_key(desc, fingerprint) if isinstance(desc, str) else None for desc in descriptions]
+    with stage("score_cache_lookup"):
+        found = {key: _decode_scored(value) for key, value in cache.get_many(key for key in keys if key).items()}
+
+    missing = {key: desc for key, desc in zip(keys, descriptions) if key and key not in found}
+    with stage("score_descriptions"):
+        new_scored = _score_descriptions(list(missing.values()), workers, chunk_size, keywords, must_have,
+                                         hard_avoid, executor=executor)
+    new_found = {key: item for key, item in zip(missing, new_scored) if item}
+    with stage("score_cache_store"):
+        cache.put_many({key: _encode_scored(item) for key, item in new_found.items()})
+    found.update(new_found)
+
+    # copy the result so repeated descriptions don't share the same ScoreResult
+    return [(replace(found[key][0]), *found[key][1:]) if key in found else None for key in keys]
+
+def keyword_features_batch(
+    descriptions: list,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    keywords: dict[str, int] = KEYWORDS_CONFIG,
+    must_have: set[str] = MUST_HAVE,
+    hard_avoid: set[str] = HARD_AVOID,
+) -> list[Optional[tuple[KeywordFeatures, np.ndarray, np.ndarray]]]:
+    """the keyword features (see keyword_features) of every description with its bm25f stats, what
+    services/feature_store keeps to rescore jobs after a weight change without reading the descriptions again"""
+    workers = workers or os.cpu_count() or 1
+    with stage("keyword_features"):
+        return _score_descriptions(list(descriptions), workers, chunk_size, keywords, must_have, hard_avoid,
+                                   chunk_fn=_feature_chunk)
+
+def apply_bm25f_batch(scored: list[Optional[tuple[ScoreResult, np.ndarray, np.ndarray]]],
+                      keywords: dict[str, int] = KEYWORDS_CONFIG,
+                      corpus_stats: Optional[BM25FStats] = None) -> list[Optional[ScoreResult]]:
+    """the second half of score_jobs_batch - mix the bm25f into the keyword scores, the bm25f is scored against the
+    batch itself or against corpus_stats of a bigger corpus the batch is part of.
+    only the descriptions that passed the gates are in the corpus"""
+    with stage("bm25f"):
+        index = BM25FIndex(positive_terms(keywords), corpus_stats=corpus_stats)
+        doc_ids = [index.add_stats(item[1], item[2]) if item and item[0].gates_passed else None for item in scored]
+        bm25f = index.scores()
+    return [apply_bm25f(item[0], float(bm25f[doc_id]) if doc_id is not None else 0.0) if item else None
+            for item, doc_id in zip(scored, doc_ids)]
 
 if __name__ == "__main__":
     descp = ''''''
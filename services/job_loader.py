@@ -0,0 +1,81 @@
+from concurrent.futures import Executor
+from typing import Optional
+
+from pandas import DataFrame, Series
+
+from models.job import Job
+from models.job_analysis import ScoreResult
+from services.job_analysis import score_jobs_batch
+from utils.score_cache import ScoreCache
+from utils.seen_postings import canonical_posting_id
+
+# the only columns of the scraping results we use, the backup is read with only these
+JOB_COLUMNS = [
+    "id", "company", "company_description", "company_num_employees", "company_url_direct", "description",
+    "is_remote", "job_level", "job_url_direct", "location", "title", "job_url", "company_url",
+]
+
+
+def load_jobs_to_classes(jobs_data: DataFrame, cache: ScoreCache = None,
+                         scores: list[Optional[ScoreResult]] = None, executor: Executor = None) -> list[Job]:
+    """build the report jobs column by column instead of row by row, all descriptions are scored in one batch
+    (unless their scores are passed in, e.g. when they were scored against a bigger corpus).
+    executor is a process pool for score_jobs_batch to reuse (see job_analysis.scoring_pool)"""
+    if "alternate_urls" in jobs_data.columns:
+        alternate_urls = jobs_data["alternate_urls"].tolist()
+    else:
+        alternate_urls = [[] for _ in range(len(jobs_data))]
+    jobs_data = jobs_data.reindex(columns=JOB_COLUMNS)
+    columns = {col: _clean_column(jobs_data[col]) for col in JOB_COLUMNS}
+    # fallback to the linkedin urls when there is no direct url
+    company_url = columns["company_url_direct"].fillna(columns["company_url"])
+    url = columns["job_url_direct"].fillna(columns["job_url"])
+
+    if scores is None:
+        scores = _score_descriptions(columns["description"].tolist(), cache, executor)
+    posting_ids = [canonical_posting_id(job_url, posting_id) if isinstance(job_url, str) else posting_id
+                   for posting_id, job_url in zip(_as_list(columns["id"]), _as_list(columns["job_url"]))]
+
+    return [
+        Job(*row) for row in zip(
+            _as_list(columns["company"]),
+            _as_list(columns["company_description"]),
+            _as_list(columns["company_num_employees"]),
+            _as_list(company_url),
+            _as_list(columns["description"]),
+            _as_list(columns["is_remote"]),
+            _as_list(columns["job_level"]),
+            _as_list(url),
+            _as_list(columns["location"]),
+            _as_list(columns["title"]),
+            [score.score if score else 0 for score in scores],
+            alternate_urls,
+            [score.fail_reason if score else None for score in scores],
+            posting_ids,
+            [score.matched_by_section if score else {} for score in scores],
+        )
+    ]
+
+
+def _score_descriptions(descriptions: list, cache: Optional[ScoreCache],
+                        executor: Optional[Executor]) -> list[Optional[ScoreResult]]:
+    own_cache = cache is None
+    if own_cache:
+        cache = ScoreCache()
+    try:
+        scores = score_jobs_batch(descriptions, cache=cache, executor=executor)
+        if own_cache:
+            cache.evict()
+    finally:
+        if own_cache:
+            cache.close()
+    return scores
+
+
+def _clean_column(column: Series) -> Series:
+    """the scrape gives us nan (and sometimes empty strings) for missing values"""
+    return column.mask(column.astype(object) == "")
+
+
+def _as_list(column: Series) -> list:
+    return column.astype(object).where(column.notna(), None).tolist()
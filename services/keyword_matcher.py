@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable
+
+from rapidfuzz import fuzz
+
+# the fuzzy candidates of the most recently seen tokens are kept per matcher, a matcher lives as long as the
+# scoring service so this is an lru instead of every token ever scored
+FUZZY_CACHE_SIZE = 100_000
+
+
+class KeywordMatcher:
+    """Precompiled keyword lookup that replaces running rf_process.extractOne for every token.
+
+    exact hits are a simple hash set lookup, fuzzy hits are answered from a deletion neighbourhood index:
+    two words that are within the fuzzy threshold always share a string we can get by deleting a few chars from
+    both of them, so we only need to run the real scorer on keywords that share one of those strings with the token.
+    the scorer is still fuzz.token_set_ratio so the hits are the same as the old extractOne loop.
+    """
+
+    def __init__(self, keywords: dict[str, int], fuzzy_threshold: int = 90):
+        self.keywords = dict(keywords)
+        self.fuzzy_threshold = fuzzy_threshold
+
+        # keyword order is used to break ties the same way extractOne does (first candidate wins)
+        self._positive = [keyword for keyword, weight in self.keywords.items() if weight > 0]
+        self._order = {keyword: idx for idx, keyword in enumerate(self._positive)}
+
+        keyword_lengths = {len(keyword) for keyword in self._positive}
+        self._max_deletions_by_len: dict[int, int] = {}
+        for kw_len in keyword_lengths:
+            for tok_len in range(1, self._max_partner_len(kw_len) + 1):
+                max_dist = self._max_distance(kw_len, tok_len)
+                if max_dist < abs(kw_len - tok_len):
+                    continue
+                self._max_deletions_by_len[tok_len] = max(self._max_deletions_by_len.get(tok_len, 0), max_dist)
+
+        self._neighbourhood: dict[str, set[str]] = {}
+        for keyword in self._positive:
+            max_dist = max(self._max_distance(len(keyword), tok_len)
+                           for tok_len in range(1, self._max_partner_len(len(keyword)) + 1))
+            for variant in _deletion_variants(keyword, max_dist):
+                self._neighbourhood.setdefault(variant, set()).add(keyword)
+
+        self._cache: OrderedDict[str, tuple[str, ...]] = OrderedDict()
+
+    def _max_distance(self, len_a: int, len_b: int) -> int:
+        """biggest indel distance that still scores >= fuzzy_threshold for two words of those lengths
+        (a little extra slack is fine since every candidate is verified with the real scorer)"""
+        return int((100 - self.fuzzy_threshold) * (len_a + len_b) / 100 + 1e-6)
+
+    def _max_partner_len(self, length: int) -> int:
+        if self.fuzzy_threshold <= 0:
+            return length * 4
+        return int(length * (200 - self.fuzzy_threshold) / self.fuzzy_threshold) + 1
+
+    def fuzzy_candidates(self, token: str) -> tuple[str, ...]:
+        """All positive keywords that fuzzy match the token, best match first"""
+        cached = self._cache.get(token)
+        if cached is not None:
+            self._cache.move_to_end(token)
+            return cached
+
+        max_dist = self._max_deletions_by_len.get(len(token))
+        candidates: set[str] = set()
+        if max_dist is not None:
+            for variant in _deletion_variants(token, max_dist):
+                candidates.update(self._neighbourhood.get(variant, ()))
+
+        scored = []
+        for keyword in candidates:
+            score = fuzz.token_set_ratio(token, keyword)
+            if score >= self.fuzzy_threshold:
+                scored.append((-score, self._order[keyword], keyword))
+
+        res = tuple(keyword for _, _, keyword in sorted(scored))
+        self._cache[token] = res
+        if len(self._cache) > FUZZY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return res
+
+    def hits(self, tokens: Iterable[str]) -> dict[str, int]:
+        """Same result as the old keyword_hits loop - exact hits for every keyword and the best fuzzy positive
+        keyword (that wasn't already hit exactly) for each token"""
+        tokens = dict.fromkeys(tokens)
+        hits: dict[str, int] = {keyword: weight for keyword, weight in self.keywords.items() if keyword in tokens}
+        exact = set(hits)
+
+        for tok in tokens:
+            for keyword in self.fuzzy_candidates(tok):
+                if keyword not in exact:
+                    hits.setdefault(keyword, self.keywords[keyword])
+                    break
+        return hits
+
+
+def _deletion_variants(word: str, max_deletions: int) -> set[str]:
+    variants = {word}
+    for n in range(1, min(max_deletions, len(word)) + 1):
+        for idxs in combinations(range(len(word)), n):
+            variants.add("".join(ch for i, ch in enumerate(word) if i not in idxs))
+    return variants
+
+
+@lru_cache(maxsize=32)
+def _get_keyword_matcher(keywords: tuple[tuple[str, int], ...], fuzzy_threshold: int) -> KeywordMatcher:
+    return KeywordMatcher(dict(keywords), fuzzy_threshold)
+
+
+def get_keyword_matcher(keywords: dict[str, int], fuzzy_threshold: int = 90) -> KeywordMatcher:
+    """matchers are built once per keywords config and reused between calls"""
+    return _get_keyword_matcher(tuple(keywords.items()), fuzzy_threshold)
@@ -0,0 +1,157 @@
+import re
+
+import numpy as np
+from pandas import DataFrame
+
+from config.scrape_config import NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, LSH_BANDS, SHINGLE_SIZE
+
+# plain words are enough to compare descriptions, the scoring tokenizer (normalize variants) is not needed here
+WORD = re.compile(r"\w+")
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_NO_SHINGLES = np.zeros(0, dtype=np.uint64)
+
+
+def shingles(text: str, vocabulary: dict[str, int], size: int = SHINGLE_SIZE) -> np.ndarray:
+    """hashes of the size word shingles of the lowercased text (a short text is a single shingle)
+
+    words are numbered by vocabulary (shared by all the descriptions we compare) and a shingle hash is a polynomial
+    of its word numbers, so a description is a few numpy ops instead of a hash call per shingle.
+    a shingle can show up more than once, minhash doesn't mind
+    """
+    words = WORD.findall(text.lower())
+    word_ids = np.array([vocabulary.setdefault(word, len(vocabulary) + 1) for word in words], dtype=np.uint64)
+    count = max(len(words) - size + 1, 1) if words else 0
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(min(size, len(words))):
+            hashes = hashes * _SHINGLE_MULTIPLIER + word_ids[offset:offset + count]
+    return hashes
+
+
+def minhash_signatures(shingle_sets: list[np.ndarray], num_perm: int = MINHASH_PERMUTATIONS,
+                       seed: int = 0) -> np.ndarray:
+    """(documents, num_perm) minhash signatures, a document without shingles gets an all max signature
+
+    every permutation is a multiply shift hash of the shingle hashes (the uint64 math wraps on purpose)
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(shingle_sets), num_perm), _MAX_HASH, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for idx, doc_shingles in enumerate(shingle_sets):
+            if not len(doc_shingles):
+                continue
+            hashes = (doc_shingles[:, None] * a + b) >> np.uint64(32)
+            signatures[idx] = hashes.min(axis=0)
+    return signatures
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of descriptions that can grow batch by batch (e.g. as each scrape query finishes)
+
+    only descriptions that land in the same lsh bucket are compared, so this isn't quadratic in the number of
+    postings. a candidate pair is a duplicate when the signatures agree on at least threshold of the
+    permutations (the estimated jaccard similarity of their shingles). missing descriptions are never duplicates.
+    a cluster is named after its first description, adding the descriptions in one batch or in many gives the
+    same clusters
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD, num_perm: int = MINHASH_PERMUTATIONS,
+                 bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self._vocabulary: dict[str, int] = {}
+        self._buckets: list[dict[bytes, int]] = [{} for _ in range(bands)]
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint64)
+        self._parent: list[int] = []
+
+    def __len__(self):
+        return len(self._parent)
+
+    def add(self, descriptions: list) -> list[int]:
+        """add descriptions, returns the cluster of each of them (the index of its first description, counting
+        every description added so far)"""
+        start = len(self._parent)
+        has_text = [isinstance(desc, str) and bool(desc.strip()) for desc in descriptions]
+        shingle_sets = [shingles(desc, self._vocabulary) if ok else _NO_SHINGLES
+                        for desc, ok in zip(descriptions, has_text)]
+        signatures = self._signatures = np.vstack([self._signatures, minhash_signatures(shingle_sets, self.num_perm)])
+        self._parent.extend(range(start, start + len(descriptions)))
+
+        rows = self.num_perm // self.bands
+        for band, buckets in enumerate(self._buckets):
+            band_signatures = signatures[:, band * rows:(band + 1) * rows]
+            for idx in range(start, len(self._parent)):
+                if not has_text[idx - start]:
+                    continue
+                first = buckets.setdefault(band_signatures[idx].tobytes(), idx)
+                if first == idx:
+                    continue
+                root_first, root_idx = self._find(first), self._find(idx)
+                if root_first == root_idx:
+                    continue
+                if np.mean(signatures[first] == signatures[idx]) >= self.threshold:
+                    # the smaller index is the root so the cluster is named after its first posting
+                    self._parent[max(root_first, root_idx)] = min(root_first, root_idx)
+
+        return [self._find(idx) for idx in range(start, len(self._parent))]
+
+    def clusters(self) -> list[int]:
+        """the cluster of every description added so far, a later description can merge two earlier clusters"""
+        return [self._find(idx) for idx in range(len(self._parent))]
+
+    def _find(self, idx: int) -> int:
+        parent = self._parent
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+
+def near_duplicate_clusters(descriptions: list, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                            num_perm: int = MINHASH_PERMUTATIONS, bands: int = LSH_BANDS) -> list[int]:
+    """the cluster of every description, given as the index of its first description"""
+    return NearDuplicateIndex(threshold, num_perm, bands).add(descriptions)
+
+
+def collapse_near_duplicates(jobs_data: DataFrame, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> DataFrame:
+    """keep the first posting of every group of near duplicate descriptions (reposts by recruiters, the same job
+    on indeed and linkedin), the urls of the other postings go to its alternate_urls column"""
+    if "description" not in jobs_data.columns or jobs_data.empty:
+        return jobs_data.assign(alternate_urls=[[] for _ in range(len(jobs_data))])
+
+    return collapse_clusters(jobs_data, near_duplicate_clusters(jobs_data["description"].tolist(), threshold))
+
+
+def collapse_clusters(jobs_data: DataFrame, clusters: list[int]) -> DataFrame:
+    """keep the first posting of every cluster (see NearDuplicateIndex.clusters), with the urls of the rest of the
+    cluster in its alternate_urls column"""
+    urls = _posting_urls(jobs_data)
+
+    alternate_urls: dict[int, list[str]] = {}
+    for idx, root in enumerate(clusters):
+        alternates = alternate_urls.setdefault(root, [])
+        if idx != root and urls[idx] is not None and urls[idx] != urls[root] and urls[idx] not in alternates:
+            alternates.append(urls[idx])
+
+    keep = [idx for idx, root in enumerate(clusters) if idx == root]
+    collapsed = jobs_data.iloc[keep].reset_index(drop=True)
+    return collapsed.assign(alternate_urls=[alternate_urls[idx] for idx in keep])
+
+
+def _posting_urls(jobs_data: DataFrame) -> list:
+    """the url the report links to, the direct url and the job board url as a fallback"""
+    url = None
+    for col in ["job_url_direct", "job_url"]:
+        if col in jobs_data.columns:
+            column = jobs_data[col].mask(jobs_data[col].astype(object) == "")
+            url = column if url is None else url.fillna(column)
+    if url is None:
+        return [None] * len(jobs_data)
+    return url.astype(object).where(url.notna(), None).tolist()
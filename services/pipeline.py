@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+import pandas as pd
+from jobspy import scrape_jobs
+from pandas import DataFrame
+
+from config.scrape_config import MAX_CONCURRENT_SCRAPES, PIPELINE_QUEUE_SIZE
+from models.job import Job
+from models.scrape_query import ScrapeQuery
+from services.create_report import create_report
+from services.job_analysis import score_jobs_batch, scoring_pool
+from services.job_loader import load_jobs_to_classes
+from services.near_duplicates import NearDuplicateIndex, collapse_clusters
+from services.scrape_scheduler import ProxyPool, run_query, dedupe_postings
+from utils.backup import append_scraping_results_to_backup_folder
+from utils.instrumentation import stage
+from utils.job_store import JobStore
+from utils.score_cache import ScoreCache
+from utils.seen_postings import SeenPostings
+
+# put on a queue when the stage before it is done
+_DONE = None
+
+
+async def run_pipeline(
+    queries: list[ScrapeQuery],
+    seen_postings: Optional[SeenPostings] = None,
+    proxies: list[str] = None,
+    backup: DataFrame = None,
+    max_workers: int = MAX_CONCURRENT_SCRAPES,
+    retries: int = 1,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    scrape: Callable[..., DataFrame] = scrape_jobs,
+    on_result: Callable[[DataFrame], None] = append_scraping_results_to_backup_folder,
+    write_report: Callable[[list[Job]], str] = create_report,
+    cache_path: str = None,
+    fetch_descriptions: Callable[[DataFrame], DataFrame] = None,
+    job_store: Optional[JobStore] = None,
+    on_report: Callable[[str], None] = None,
+    **scrape_kwargs,
+) -> Optional[str]:
+    """Scrape, score and write the report as a pipeline of stages connected by bounded queues, so the scoring of
+    the first query's postings overlaps with the scrape of the others instead of waiting for all of them.
+
+        scrape (a thread per query) -> ingest (backup, dedupe, seen postings, near duplicates) -> score -> report
+
+    with a backup (the results of a scrape that didn't make it to a report) nothing is scraped, the backup is the
+    only batch. the scoring runs on its own thread which also owns the score cache, the event loop thread only moves
+    batches between the stages. batches big enough to fan out to processes share one (spawned) process pool for the
+    whole run, small ones are scored on the scoring thread.
+
+    every batch is scored as it arrives, which fills the score cache. the report needs the bm25f of every posting
+    against all of them and the jobs sorted by rating, so once the last batch is in the jobs are loaded from the
+    cache (no description is scored twice) and the report is written in one go.
+    without seen_postings every posting is scored and reported, not only the ones we didn't see before.
+    fetch_descriptions fills in the descriptions of a listing only scrape on the query's thread, before the backup.
+    the reported jobs (all of them, not only the ranked ones) are recorded in job_store's current run.
+    on_report gets the report name as soon as the report is written (e.g. ReportDelivery.submit it), before the
+    postings are recorded and marked seen
+    returns the report name, None when there were no new postings
+    """
+    loop = asyncio.get_running_loop()
+    scraped: asyncio.Queue[Optional[DataFrame]] = asyncio.Queue(maxsize=queue_size)
+    to_score: asyncio.Queue[Optional[DataFrame]] = asyncio.Queue(maxsize=queue_size)
+    to_report: asyncio.Queue[Optional[DataFrame]] = asyncio.Queue(maxsize=queue_size)
+    near_duplicates = NearDuplicateIndex()
+    new_postings: list[DataFrame] = []
+
+    async def produce():
+        if backup is not None:
+            await scraped.put(backup)
+        elif queries:
+            pool = ProxyPool(proxies or [])
+            # one backup write at a time, queries that finish together would otherwise write the backup at once
+            backup_lock = asyncio.Lock()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as scrape_executor:
+                async def scrape_one(query: ScrapeQuery):
+                    res = await loop.run_in_executor(scrape_executor, partial(run_query, query, pool, retries,
+                                                                              scrape, fetch_descriptions,
+                                                                              **scrape_kwargs))
+                    if res is not None and not res.empty:
+                        # every query is backed up as soon as it finishes
+                        if on_result is not None:
+                            async with backup_lock:
+                                try:
+                                    await asyncio.to_thread(on_result, res)
+                                except Exception as e:
+                                    # the results still make it to the report, only this batch isn't backed up
+                                    logging.exception(f"[backup] failed to back up {query}: {e}")
+                        await scraped.put(res)
+
+                async with asyncio.TaskGroup() as scrapes:
+                    for query in queries:
+                        scrapes.create_task(scrape_one(query))
+        await scraped.put(_DONE)
+
+    async def ingest():
+        seen_ids: set = set()
+        seen_urls: set = set()
+        while (batch := await scraped.get()) is not _DONE:
+            with stage("pipeline_ingest"):
+                batch = _drop_seen_in_run(dedupe_postings(batch), seen_ids, seen_urls)
+                if seen_postings is not None:
+                    batch = seen_postings.filter_new(batch)
+                if batch.empty:
+                    continue
+                new_postings.append(batch)
+                offset = len(near_duplicates)
+                clusters = near_duplicates.add(batch["description"].tolist() if "description" in batch.columns
+                                               else [None] * len(batch))
+                # only the first posting of a cluster is scored
+                firsts = batch[[root == offset + idx for idx, root in enumerate(clusters)]]
+            if not firsts.empty:
+                await to_score.put(firsts)
+        await to_score.put(_DONE)
+
+    async def score(cache: ScoreCache):
+        while (batch := await to_score.get()) is not _DONE:
+            descriptions = batch["description"].tolist() if "description" in batch.columns else []
+            await loop.run_in_executor(score_executor, partial(score_jobs_batch, descriptions, cache=cache,
+                                                               executor=process_pool))
+            await to_report.put(batch)
+        await to_report.put(_DONE)
+
+    async def report(cache: ScoreCache) -> Optional[str]:
+        while await to_report.get() is not _DONE:
+            pass
+        if not new_postings:
+            return None
+
+        jobs_data = pd.concat(new_postings, ignore_index=True)
+        with stage("near_duplicates"):
+            unique_jobs_data = collapse_clusters(jobs_data, near_duplicates.clusters())
+        with stage("load_jobs"):
+            jobs = await loop.run_in_executor(score_executor, partial(load_jobs_to_classes, unique_jobs_data,
+                                                                      cache=cache, executor=process_pool))
+        with stage("report"):
+            report_name = await asyncio.to_thread(write_report, jobs)
+        if on_report is not None:
+            on_report(report_name)
+        if job_store is not None:
+            with stage("job_store"):
+                job_store.record(jobs)
+        if seen_postings is not None:
+            seen_postings.mark_seen(jobs_data)
+        return report_name
+
+    # sqlite connections belong to the thread that opened them, so the cache is opened, used and closed on the
+    # scoring thread. the pool only starts its workers once a batch is sent to it
+    with ThreadPoolExecutor(max_workers=1) as score_executor, scoring_pool() as process_pool:
+        cache = await loop.run_in_executor(score_executor, partial(ScoreCache, cache_path))
+        try:
+            async with asyncio.TaskGroup() as stages:
+                stages.create_task(produce())
+                stages.create_task(ingest())
+                stages.create_task(score(cache))
+                report_task = stages.create_task(report(cache))
+            await loop.run_in_executor(score_executor, cache.evict)
+        finally:
+            await loop.run_in_executor(score_executor, cache.close)
+
+    report_name = report_task.result()
+    if report_name is None:
+        logging.info("[pipeline] no new postings")
+    return report_name
+
+
+def _drop_seen_in_run(jobs_data: DataFrame, seen_ids: set, seen_urls: set) -> DataFrame:
+    """drop postings an earlier batch of this run already had (dedupe_postings across batches)"""
+    keep = pd.Series(True, index=jobs_data.index)
+    if "id" in jobs_data.columns:
+        keep &= ~jobs_data["id"].isin(seen_ids)
+        seen_ids.update(jobs_data["id"].dropna())
+    if "job_url" in jobs_data.columns:
+        keep &= ~jobs_data["job_url"].isin(seen_urls)
+        seen_urls.update(jobs_data["job_url"].dropna())
+    return jobs_data[keep].reset_index(drop=True)
@@ -0,0 +1,66 @@
+import csv
+import heapq
+import itertools
+import os
+from datetime import datetime
+from typing import Iterable
+
+from config.report_config import REPORT_TOP_K, REPORT_SCORE_FLOOR
+from models.job import Job
+
+REJECTED_LOG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports",
+                                      "rejected_jobs.csv")
+
+
+class JobRanker:
+    """Keeps the top_k best rated jobs that passed the gates and rated at least score_floor, in a bounded heap so
+    memory is top_k jobs however many are added (batch by batch is fine).
+
+    jobs the gates rejected only keep their url and fail reason (see write_rejected_log), the ones below the floor
+    are only counted
+    """
+
+    def __init__(self, top_k: int = REPORT_TOP_K, score_floor: float = REPORT_SCORE_FLOOR):
+        self.top_k = top_k
+        self.score_floor = score_floor
+        self.rejected: list[tuple[str | None, str]] = []
+        self.below_floor = 0
+        self._top: list[tuple[float, int, Job]] = []
+        self._order = itertools.count()
+
+    def add(self, jobs: Iterable[Job]):
+        for job in jobs:
+            if job.fail_reason is not None:
+                self.rejected.append((job.url, job.fail_reason))
+                continue
+            if job.rating < self.score_floor:
+                self.below_floor += 1
+                continue
+            # the order breaks rating ties so jobs are never compared, the first job wins a tie
+            item = (job.rating, -next(self._order), job)
+            if len(self._top) < self.top_k:
+                heapq.heappush(self._top, item)
+            elif item[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, item)
+
+    def ranked(self) -> list[Job]:
+        """the kept jobs, best first"""
+        return [job for _, _, job in sorted(self._top, key=lambda item: item[:2], reverse=True)]
+
+
+def rank_jobs(jobs: Iterable[Job], top_k: int = REPORT_TOP_K,
+              score_floor: float = REPORT_SCORE_FLOOR) -> JobRanker:
+    ranker = JobRanker(top_k, score_floor)
+    ranker.add(jobs)
+    return ranker
+
+
+def write_rejected_log(rejected: list[tuple[str | None, str]], file_path: str = None):
+    """append the rejected jobs (date, fail reason, url) to the rejected log, one line per job"""
+    if not rejected:
+        return
+    path = file_path or REJECTED_LOG_FILE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    today = datetime.now().date().isoformat()
+    with open(path, "a", newline="") as f:
+        csv.writer(f).writerows((today, reason, url or "") for url, reason in rejected)
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+from config.report_config import REPORT_DELIVERY_BACKENDS, REPORT_DROP_DIR, REPORT_WEBHOOK_URL, \
+    REPORT_WEBHOOK_TIMEOUT_SECONDS, REPORT_DELIVERY_COALESCE_SECONDS, REPORT_DELIVERY_RETRIES, \
+    REPORT_DELIVERY_BACKOFF_SECONDS, REPORT_DELIVERY_WAIT_SECONDS
+
+DROP_DIR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports", "outbox")
+
+# put on the queue by close, the worker delivers what it has and stops
+_STOP = None
+
+
+class DesktopBackend:
+    """a macos notification (pync -> terminal-notifier), clicking it opens the newest report"""
+    name = "desktop"
+
+    def deliver(self, report_paths: list[str]):
+        # pync is only there on macos, a machine without it fails the delivery like any other error
+        from pync import Notifier
+
+        message = "Generated new job reports" if len(report_paths) == 1 else \
+            f"Generated {len(report_paths)} new job reports"
+        Notifier.notify(message, title="Job Reports", sound="glass", open=Path(report_paths[-1]).as_uri())
+
+
+class FileDropBackend:
+    """a json file per delivery in a folder another program watches, written to a temp file first so the
+    watcher never reads half a file"""
+    name = "file_drop"
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or REPORT_DROP_DIR or DROP_DIR_PATH
+
+    def deliver(self, report_paths: list[str]):
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now()
+        path = os.path.join(self.directory, f"reports_{now.strftime('%Y%m%d-%H%M%S-%f')}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(_payload(report_paths, now), f)
+        os.replace(tmp_path, path)
+
+
+class WebhookBackend:
+    """a json POST to a local endpoint, anything but a 2xx answer fails the delivery"""
+    name = "webhook"
+
+    def __init__(self, url: str = REPORT_WEBHOOK_URL, timeout: float = REPORT_WEBHOOK_TIMEOUT_SECONDS,
+                 post: Callable[..., requests.Response] = requests.post):
+        self.url = url
+        self.timeout = timeout
+        self._post = post
+
+    def deliver(self, report_paths: list[str]):
+        response = self._post(self.url, json=_payload(report_paths, datetime.now()), timeout=self.timeout)
+        response.raise_for_status()
+
+
+BACKENDS: dict[str, Callable[[], object]] = {
+    "desktop": DesktopBackend,
+    "file_drop": FileDropBackend,
+    "webhook": WebhookBackend,
+}
+
+
+class ReportDelivery:
+    """Delivers the reports of a run to the backends (desktop / file drop / webhook) on a worker thread, so the
+    run hands a report over with submit and goes on without waiting for a notifier.
+
+    reports submitted within coalesce_seconds of each other go out as one delivery. every backend is tried on its
+    own, a backend that fails is retried with a doubling wait and given up on (one log line, no stack trace) after
+    retries, the other backends still get the reports.
+    call close at the end of the run, it waits up to wait_seconds for the deliveries still in progress. the worker
+    is a daemon thread, a notifier that hangs past that doesn't keep the process alive
+    """
+
+    def __init__(self, backends: list = None, coalesce_seconds: float = REPORT_DELIVERY_COALESCE_SECONDS,
+                 retries: int = REPORT_DELIVERY_RETRIES, backoff_seconds: float = REPORT_DELIVERY_BACKOFF_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep):
+        if backends is None:
+            backends = [BACKENDS[name]() for name in REPORT_DELIVERY_BACKENDS]
+        self.backends = backends
+        self.coalesce_seconds = coalesce_seconds
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        # the report paths of every delivery the worker went through
+        self.delivered: list[list[str]] = []
+        self._sleep = sleep
+        self._queue: queue.Queue[Optional[str]] = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="report_delivery", daemon=True)
+        self._worker.start()
+
+    def submit(self, report_path: str):
+        """deliver the report (once it's written), returns right away"""
+        self._queue.put(report_path)
+
+    def close(self, wait_seconds: float = REPORT_DELIVERY_WAIT_SECONDS) -> bool:
+        """deliver what was submitted and stop, False when the deliveries didn't finish within wait_seconds"""
+        self._queue.put(_STOP)
+        self._worker.join(wait_seconds)
+        if self._worker.is_alive():
+            logging.error(f"[deliver] deliveries still running after {wait_seconds}s, not waiting for them")
+            return False
+        return True
+
+    def _run(self):
+        while (report_path := self._queue.get()) is not _STOP:
+            batch = [report_path]
+            stopping = False
+            deadline = time.monotonic() + self.coalesce_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    report_path = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if report_path is _STOP:
+                    stopping = True
+                    break
+                batch.append(report_path)
+
+            self._deliver(list(dict.fromkeys(batch)))
+            if stopping:
+                return
+
+    def _deliver(self, report_paths: list[str]):
+        missing = [path for path in report_paths if not os.path.exists(path)]
+        for path in missing:
+            logging.warning(f"[deliver] report not found: {path}")
+        report_paths = [path for path in report_paths if path not in missing]
+        if not report_paths:
+            return
+
+        succeeded = sum(self._deliver_to(backend, report_paths) for backend in self.backends)
+        self.delivered.append(report_paths)
+        logging.info(f"[deliver] {len(report_paths)} reports delivered to {succeeded}/{len(self.backends)} backends")
+
+    def _deliver_to(self, backend, report_paths: list[str]) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                backend.deliver(report_paths)
+                return True
+            except Exception as e:
+                logging.warning(f"[deliver] {backend.name}: {type(e).__name__}: {e}")
+                if attempt < self.retries:
+                    self._sleep(self.backoff_seconds * 2 ** attempt)
+        logging.error(f"[deliver] giving up on {backend.name} for {len(report_paths)} reports")
+        return False
+
+
+def _payload(report_paths: list[str], now: datetime) -> dict:
+    return {"created_at": now.isoformat(timespec="seconds"),
+            "reports": [os.path.abspath(path) for path in report_paths]}
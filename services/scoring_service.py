@@ -0,0 +1,124 @@
+"""Resident scoring service, keeps the matchers, regexes and caches warm between requests
+
+    python -m services.scoring_service
+
+    POST /score         {"description": "..."}        -> the ScoreResult of the description
+    POST /score/batch   {"descriptions": ["...", ...]} -> {"results": [...]} (bm25f ranks them against each other)
+    POST /config/reload                               -> re-read config/job_scoring_config.py now (not from a browser)
+    GET  /health
+
+config/job_scoring_config.py is also re-read on the first request after it changed, so a new keyword doesn't
+need a restart. requests are served one at a time (the scoring is cpu bound so threads wouldn't help, and the
+score cache connection and the config reload stay on one thread).
+"""
+import logging
+import os
+from dataclasses import asdict
+from typing import Optional
+
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+
+from config import job_scoring_config
+from config.service_config import SERVICE_HOST, SERVICE_PORT, SERVICE_MAX_BATCH, SERVICE_CORS_ORIGINS
+from services import job_analysis
+from services.keyword_matcher import get_keyword_matcher
+from utils.score_cache import ScoreCache
+
+
+class ConfigWatcher:
+    """re-reads the scoring config when its file changes, checked with a stat on every request"""
+
+    def __init__(self, file_path: str = None):
+        self.file_path = file_path or job_scoring_config.__file__
+        self._mtime = self._current_mtime()
+
+    def reload_if_changed(self) -> bool:
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return False
+        try:
+            self.reload()
+        except Exception as e:
+            # keep serving with the old config until the file is fixed
+            logging.exception(e)
+            self._mtime = mtime
+            return False
+        return True
+
+    def reload(self):
+        self._mtime = self._current_mtime()
+        job_analysis.reload_scoring_config()
+        warm_up()
+        logging.info(f"[service] reloaded {self.file_path} ({job_analysis.config_fingerprint()})")
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.file_path).st_mtime_ns
+        except OSError:
+            return None
+
+
+def warm_up():
+    """build what the first request would otherwise pay for"""
+    get_keyword_matcher(job_analysis.KEYWORDS_CONFIG)
+    job_analysis.score_job_description("Requirements:\n- python")
+
+
+def create_app(cache: ScoreCache = None, config_file_path: str = None) -> Flask:
+    app = Flask(__name__)
+    # the browser extension calls us from the job boards' pages, only the scoring endpoints are open to them
+    CORS(app, resources={r"/score(/batch)?": {"origins": SERVICE_CORS_ORIGINS}})
+    watcher = ConfigWatcher(config_file_path)
+    if cache is None:
+        cache = ScoreCache()
+    warm_up()
+
+    @app.before_request
+    def reload_config():
+        watcher.reload_if_changed()
+
+    @app.get("/health")
+    def health():
+        return jsonify(status="ok", config=job_analysis.config_fingerprint())
+
+    @app.post("/score")
+    def score():
+        description = (request.get_json(silent=True) or {}).get("description")
+        if not isinstance(description, str):
+            return jsonify(error="description must be a string"), 400
+        return jsonify(_result_json(job_analysis.score_job_description(description)))
+
+    @app.post("/score/batch")
+    def score_batch():
+        descriptions = (request.get_json(silent=True) or {}).get("descriptions")
+        if not isinstance(descriptions, list):
+            return jsonify(error="descriptions must be a list"), 400
+        if len(descriptions) > SERVICE_MAX_BATCH:
+            return jsonify(error=f"a batch can have at most {SERVICE_MAX_BATCH} descriptions"), 413
+        # in this process - the caches are warm here, a process pool would start cold
+        results = job_analysis.score_jobs_batch(descriptions, workers=1, cache=cache)
+        return jsonify(results=[_result_json(result) for result in results])
+
+    @app.post("/config/reload")
+    def config_reload():
+        # a page open in the browser can still send a simple POST here, the browser adds its Origin to it
+        if request.headers.get("Origin") is not None:
+            return jsonify(error="the config is only reloaded by local tools"), 403
+        try:
+            watcher.reload()
+        except Exception as e:
+            logging.exception(e)
+            return jsonify(error=f"config failed to load: {e}"), 500
+        return jsonify(config=job_analysis.config_fingerprint())
+
+    return app
+
+
+def _result_json(result) -> Optional[dict]:
+    return asdict(result) if result is not None else None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_app().run(host=SERVICE_HOST, port=SERVICE_PORT, threaded=False)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+import pandas as pd
+from jobspy import scrape_jobs
+from pandas import DataFrame
+
+from config.scrape_config import MAX_CONCURRENT_SCRAPES, PROXY_COOLDOWN_SECONDS
+from models.scrape_query import ScrapeQuery
+
+
+class ProxyPool:
+    """Hands out proxies round robin, a proxy that failed a scrape sits out for cooldown seconds"""
+
+    def __init__(self, proxies: list[str], cooldown: float = PROXY_COOLDOWN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.proxies = list(proxies)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._next = 0
+        self._cooling_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[str]:
+        """next proxy that isn't cooling down, if all of them are we use the one that will be ready first"""
+        if not self.proxies:
+            return None
+
+        with self._lock:
+            now = self._clock()
+            for offset in range(len(self.proxies)):
+                idx = (self._next + offset) % len(self.proxies)
+                proxy = self.proxies[idx]
+                if self._cooling_until.get(proxy, 0) <= now:
+                    self._next = idx + 1
+                    return proxy
+
+            return min(self.proxies, key=lambda p: self._cooling_until[p])
+
+    def report_failure(self, proxy: Optional[str]):
+        if proxy is None:
+            return
+        with self._lock:
+            self._cooling_until[proxy] = self._clock() + self.cooldown
+
+
+def scrape_queries(
+    queries: list[ScrapeQuery],
+    proxies: list[str] = None,
+    max_workers: int = MAX_CONCURRENT_SCRAPES,
+    retries: int = 1,
+    scrape: Callable[..., DataFrame] = scrape_jobs,
+    on_result: Callable[[DataFrame], None] = None,
+    fetch_descriptions: Callable[[DataFrame], DataFrame] = None,
+    **scrape_kwargs,
+) -> DataFrame:
+    """Run every query in its own scrape_jobs call on a thread pool (the scrape is mostly waiting on the network)
+    and merge the results into one DataFrame without duplicate postings.
+
+    each query gets the next proxy of the pool, a query that fails is retried with another proxy and the failed
+    proxy cools down. a query that still fails is logged and skipped so the other queries still make it.
+    on_result is called (from this thread) with the results of each query as soon as it finishes, e.g. to back it up,
+    an on_result that fails is logged and the results are still returned
+    fetch_descriptions (see run_query) fills in the descriptions of a listing only scrape
+    """
+    if not queries:
+        return DataFrame()
+
+    pool = ProxyPool(proxies or [])
+
+    results: list[Optional[DataFrame]] = [None] * len(queries)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+        futures = {executor.submit(run_query, query, pool, retries, scrape, fetch_descriptions, **scrape_kwargs): idx
+                   for idx, query in enumerate(queries)}
+        for future in as_completed(futures):
+            res = future.result()
+            if res is None or res.empty:
+                continue
+            results[futures[future]] = res
+            if on_result is not None:
+                try:
+                    on_result(res)
+                except Exception as e:
+                    logging.exception(f"[backup] failed to back up {queries[futures[future]]}: {e}")
+
+    results = [res for res in results if res is not None]
+
+    if not results:
+        return DataFrame()
+    return dedupe_postings(pd.concat(results, ignore_index=True))
+
+
+def run_query(
+    query: ScrapeQuery,
+    pool: ProxyPool,
+    retries: int = 1,
+    scrape: Callable[..., DataFrame] = scrape_jobs,
+    fetch_descriptions: Callable[[DataFrame], DataFrame] = None,
+    **scrape_kwargs,
+) -> Optional[DataFrame]:
+    """scrape one query with the next proxy of the pool, retried with another proxy on failure (the failed proxy
+    cools down), None when all the tries failed.
+    the results go through fetch_descriptions (e.g. DescriptionFetcher.fetch_missing) on this thread, a failed
+    fetch doesn't scrape the query again"""
+    for _ in range(retries + 1):
+        proxy = pool.acquire()
+        try:
+            res = scrape(
+                site_name=[query.site],
+                search_term=query.search_term,
+                google_search_term=query.google_search_term,
+                location=query.location,
+                proxies=[proxy] if proxy else None,
+                **scrape_kwargs
+            )
+        except Exception as e:
+            pool.report_failure(proxy)
+            logging.exception(e)
+            continue
+        if fetch_descriptions is not None and res is not None and not res.empty:
+            res = fetch_descriptions(res)
+        return res
+    logging.error(f"[scrape] giving up on {query}")
+    return None
+
+
+def dedupe_postings(jobs_data: DataFrame) -> DataFrame:
+    """the same posting can come back from more than one query"""
+    if "id" in jobs_data.columns:
+        has_id = jobs_data["id"].notna()
+        jobs_data = jobs_data[~(has_id & jobs_data["id"].duplicated())]
+    if "job_url" in jobs_data.columns:
+        jobs_data = jobs_data.drop_duplicates(subset=["job_url"])
+    return jobs_data.reset_index(drop=True)
@@ -0,0 +1,64 @@
+import re
+
+from models.job_analysis import JobDescpSection
+
+
+class SectionSplitter:
+    """Finds the section headers of a job description, compiled once from SECTION_HEADERS.
+
+    the headers are put in a trie which is compiled into a single regex (shared prefixes like "about"/"about us" or
+    "our stack"/"our technology stack" are only checked once), so finding the headers stays a single linear scan
+    of the text as the header list grows. headers are matched anywhere in the text, not only at line starts.
+
+    the trie finds the longest header at each position, when a shorter header at the same position comes first in
+    SECTION_HEADERS it wins, same as the old "|".join(headers) alternation did.
+    """
+
+    def __init__(self, section_headers: dict[str, JobDescpSection], default_section: str = "about"):
+        self.default_section = default_section
+        self.header_map: dict[str, str] = {h.lower(): sec for sec, job_descp in section_headers.items()
+                                           for h in job_descp.headers}
+        order = {header: idx for idx, header in enumerate(self.header_map)}
+
+        # the header that wins when `header` is the longest one matching at a position
+        self._winner: dict[str, str] = {}
+        for header in self.header_map:
+            prefixes = [h for h in self.header_map if header.startswith(h)]
+            self._winner[header] = min(prefixes, key=order.get)
+
+        trie: dict = {}
+        for header in self.header_map:
+            node = trie
+            for ch in header:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        self.pattern = re.compile(_trie_pattern(trie)) if self.header_map else None
+
+    def spans(self, lower: str) -> list[tuple[str, int, int]]:
+        """the text between headers as (section, start, end) offsets into lower,
+        text before the first header goes to the default section"""
+        spans = []
+        current_sec = self.default_section
+        start = 0
+        pos = 0
+        while self.pattern is not None:
+            match = self.pattern.search(lower, pos)
+            if match is None:
+                break
+            header = self._winner[match.group()]
+            spans.append((current_sec, start, match.start()))
+            current_sec = self.header_map[header]
+            start = pos = match.start() + len(header)
+        spans.append((current_sec, start, len(lower)))
+        return spans
+
+
+def _trie_pattern(node: dict) -> str:
+    """regex of a trie node, the children are tried before ending here so the longest header matches"""
+    alternatives = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        return f"(?:{body})?"
+    return body
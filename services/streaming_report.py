@@ -0,0 +1,82 @@
+from typing import Callable, Iterator, Optional
+
+from pandas import DataFrame
+
+from config.job_scoring_config import KEYWORDS_CONFIG
+from config.report_config import REPORT_TOP_K, REPORT_SCORE_FLOOR, STREAM_CHUNK_ROWS
+from models.job import Job
+from services.bm25f_index import BM25FIndex
+from services.job_analysis import score_keywords_batch, apply_bm25f_batch, positive_terms
+from services.job_loader import JOB_COLUMNS, load_jobs_to_classes
+from services.ranking import JobRanker, write_rejected_log
+from utils.backup import iter_scraping_results_from_back_folder
+from utils.instrumentation import stage
+from utils.score_cache import ScoreCache
+
+
+def top_jobs_from_backup(file_path: str = None, top_k: int = REPORT_TOP_K, chunk_rows: int = STREAM_CHUNK_ROWS,
+                         cache: ScoreCache = None, workers: int = None, score_floor: float = REPORT_SCORE_FLOOR,
+                         on_rejected: Callable[[list[tuple[Optional[str], str]]], None] = write_rejected_log
+                         ) -> list[Job]:
+    """the top_k best rated jobs of a backup of any size (see JobRanker), read and scored chunk_rows postings at
+    a time
+
+    the bm25f of a posting is against the whole backup like score_jobs_batch does for a batch, so this takes two
+    passes over the backup: the first keyword scores every chunk into the score cache and adds up the bm25f corpus
+    stats, the second gets the keyword scores back from the cache, scores the bm25f against the corpus stats and
+    ranks the jobs. memory is a chunk, the ranker and the ids of the postings (for dedupe), however big the backup
+    is. near duplicates are not collapsed here, that needs every posting's signature.
+    the (url, fail reason) of the jobs the gates rejected go to on_rejected at the end
+    """
+    own_cache = cache is None
+    if own_cache:
+        cache = ScoreCache()
+    try:
+        corpus_stats = BM25FIndex(positive_terms(KEYWORDS_CONFIG)).new_stats()
+        with stage("stream_first_pass"):
+            for chunk in _unique_chunks(file_path, ["id", "job_url", "description"], chunk_rows):
+                for item in score_keywords_batch(chunk["description"].tolist(), workers=workers, cache=cache):
+                    if item is not None and item[0].gates_passed:
+                        corpus_stats.add(item[1], item[2])
+
+        ranker = JobRanker(top_k, score_floor)
+        with stage("stream_second_pass"):
+            for chunk in _unique_chunks(file_path, JOB_COLUMNS, chunk_rows):
+                scored = score_keywords_batch(chunk["description"].tolist(), workers=workers, cache=cache)
+                scores = apply_bm25f_batch(scored, KEYWORDS_CONFIG, corpus_stats)
+                ranker.add(load_jobs_to_classes(chunk, scores=scores))
+
+        if own_cache:
+            cache.evict()
+    finally:
+        if own_cache:
+            cache.close()
+
+    on_rejected(ranker.rejected)
+    return ranker.ranked()
+
+
+def _unique_chunks(file_path: Optional[str], columns: list[str], chunk_rows: int) -> Iterator[DataFrame]:
+    """chunks of the backup without the postings an earlier chunk already had (same as dedupe_postings)"""
+    seen_ids: set = set()
+    seen_urls: set = set()
+    for chunk in iter_scraping_results_from_back_folder(file_path, columns, chunk_rows):
+        chunk = chunk.reindex(columns=list(dict.fromkeys([*columns, "id", "job_url", "description"])))
+        keep = []
+        for posting_id, job_url in zip(chunk["id"], chunk["job_url"]):
+            has_id = isinstance(posting_id, str)
+            if has_id and posting_id in seen_ids:
+                keep.append(False)
+                continue
+            if has_id:
+                seen_ids.add(posting_id)
+            if isinstance(job_url, str):
+                if job_url in seen_urls:
+                    keep.append(False)
+                    continue
+                seen_urls.add(job_url)
+            keep.append(True)
+        chunk = chunk[keep].reset_index(drop=True)
+        if not chunk.empty:
+            yield chunk
+
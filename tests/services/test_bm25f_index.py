@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from services.bm25f_index import BM25FIndex
+from services.job_analysis import parse_description
+
+
+class TestBM25FIndex(TestCase):
+    def test_rare_term_scores_higher_than_common_term(self):
+        index = BM25FIndex(["python", "redis"])
+        for desc in ["requirements: python", "requirements: python", "requirements: python", "requirements: redis"]:
+            index.add(parse_description(desc))
+
+        scores = index.scores()
+
+        self.assertGreater(scores[3], scores[0])
+        self.assertEqual(scores[0], scores[1])
+
+    def test_section_weight_applies(self):
+        index = BM25FIndex(["python"])
+        req_id = index.add(parse_description("requirements: python and more words"))
+        about_id = index.add(parse_description("about us: python and more words"))
+
+        self.assertGreater(index.score(req_id), index.score(about_id))
+
+    def test_document_without_query_terms_scores_zero(self):
+        index = BM25FIndex(["python"])
+        doc_id = index.add(parse_description("requirements: java"))
+        index.add(parse_description("requirements: python"))
+
+        self.assertEqual(0.0, index.score(doc_id))
+
+    def test_chunk_scored_against_corpus_stats_matches_whole_corpus(self):
+        descriptions = ["requirements: python", "requirements: python and redis", "about us: redis",
+                        "requirements: java"]
+        whole = BM25FIndex(["python", "redis"])
+        for desc in descriptions:
+            whole.add(parse_description(desc))
+        corpus_stats = whole.new_stats()
+        for desc in descriptions:
+            corpus_stats.add(*whole.document_stats(parse_description(desc)))
+
+        chunk = BM25FIndex(["python", "redis"], corpus_stats=corpus_stats)
+        for desc in descriptions[2:]:
+            chunk.add(parse_description(desc))
+
+        self.assertEqual(list(whole.scores()[2:]), list(chunk.scores()))
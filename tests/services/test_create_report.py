@@ -0,0 +1,41 @@
+import os
+from unittest import TestCase
+
+from openpyxl.reader.excel import load_workbook
+
+from models.job import Job
+from services.create_report import write_report, COLUMNS
+
+
+def create_mock_job(company, rating: float) -> Job:
+    return Job(company=company, company_desc=None, employees_num=float("nan"),
+               company_url="https://linkedin.com/company/1", desc="We are looking for a backend engineer.",
+               is_remote=True, level_desc="Mid", url="https://linkedin.com/jobs/view/1", location="Tel Aviv, Israel",
+               title="Backend Engineer", rating=rating)
+
+
+class TestCreateReport(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_report.xlsx")
+
+    def tearDown(self):
+        if os.path.exists(self.mock_file_path):
+            os.remove(self.mock_file_path)
+
+    def test_write_report_sorts_and_paints_rows(self):
+        jobs = [create_mock_job("B", 50), create_mock_job("A", 50), create_mock_job(float("nan"), 90),
+                create_mock_job("C", 10)]
+
+        write_report(jobs, self.mock_file_path)
+
+        ws = load_workbook(self.mock_file_path).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(tuple(COLUMNS.values()), rows[0])
+        self.assertEqual([(90, None), (50, "A"), (50, "B"), (10, "C")], [row[:2] for row in rows[1:]])
+        self.assertIsNone(rows[1][list(COLUMNS).index("employees_num")])
+
+        self.assertEqual(["00B6D7A8", "00FFE599", "00FFE599", "00EA9999"],
+                         [ws.cell(row=idx, column=1).fill.fgColor.rgb for idx in range(2, 6)])
+        self.assertEqual("thin", ws["B2"].border.left.style)
+        self.assertIsNone(ws["A1"].border.left.style)
+        self.assertTrue(ws["D1"].alignment.wrap_text)
+        self.assertEqual(100, ws.column_dimensions["D"].width)
@@ -0,0 +1,177 @@
+import os
+import threading
+from unittest import TestCase, mock
+
+from pandas import DataFrame
+
+from services import description_fetcher
+from services.description_fetcher import DescriptionFetcher, HostRateLimiter, parse_linkedin_job_page
+from utils.score_cache import ScoreCache
+
+JOB_PAGE = """<html><body>
+<div class="show-more-less-html__markup"><p>We need <strong>python</strong></p><ul><li>flask</li></ul></div>
+<ul><li><h3 class="description__job-criteria-subheader">Seniority level</h3>
+<span class="description__job-criteria-text">Mid-Senior level</span></li></ul>
+<code id="applyUrl"><!--"https://www.linkedin.com/jobs/view/externalApply/1?url=https%3A%2F%2Facme.com%2Fjobs%2F1"--></code>
+</body></html>"""
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = "", headers: dict = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """answers with the job page and an etag, 304 when the etag is sent back, requests through proxy "bad" fail"""
+    requests: list = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.headers = {}
+        self.proxies = {}
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def close(self):
+        pass
+
+    def get(self, url, headers=None, timeout=None):
+        proxy = self.proxies.get("https")
+        with self.lock:
+            self.requests.append((url, proxy, dict(headers or {})))
+        if proxy == "bad":
+            raise ConnectionError("proxy down")
+        if (headers or {}).get("If-None-Match") == f"etag-{url}":
+            return FakeResponse(304)
+        if url.endswith("/404"):
+            return FakeResponse(404)
+        return FakeResponse(200, JOB_PAGE, {"ETag": f"etag-{url}"})
+
+
+class TestParseLinkedinJobPage(TestCase):
+    def test_parse_job_page(self):
+        fields = parse_linkedin_job_page(JOB_PAGE)
+
+        self.assertIn("**python**", fields["description"])
+        self.assertIn("flask", fields["description"])
+        self.assertEqual("mid-senior level", fields["job_level"])
+        self.assertEqual("https://acme.com/jobs/1", fields["job_url_direct"])
+
+    def test_page_without_description(self):
+        self.assertIsNone(parse_linkedin_job_page("<html><body>Sign in</body></html>"))
+
+
+class TestHostRateLimiter(TestCase):
+    def test_requests_to_a_host_are_spaced(self):
+        sleeps = []
+        limiter = HostRateLimiter(2.0, clock=lambda: 0.0, sleep=sleeps.append)
+
+        for key in ["a", "a", "b", "a"]:
+            limiter.wait(key)
+
+        self.assertEqual([0.5, 1.0], sleeps)
+
+
+class TestDescriptionFetcher(TestCase):
+    mock_cache_path = os.path.join(os.getcwd(), "mock_description_cache.sqlite")
+
+    def setUp(self):
+        FakeSession.requests = []
+
+    def tearDown(self):
+        if os.path.exists(self.mock_cache_path):
+            os.remove(self.mock_cache_path)
+
+    def create_fetcher(self, proxies: list[str] = None, fresh_hours: float = 24) -> DescriptionFetcher:
+        return DescriptionFetcher(proxies, max_workers=4, cache_path=self.mock_cache_path, fresh_hours=fresh_hours,
+                                  session_factory=FakeSession, rate_limiter=HostRateLimiter(0))
+
+    def test_fetch_missing_fills_linkedin_descriptions(self):
+        jobs_data = DataFrame([
+            {"id": "li-1", "job_url": "https://www.linkedin.com/jobs/view/1", "description": None},
+            {"id": "li-2", "job_url": "https://www.linkedin.com/jobs/view/2", "description": "already here"},
+            {"id": "in-3", "job_url": "https://www.indeed.com/viewjob?jk=3", "description": None},
+            {"id": "li-4", "job_url": "https://www.linkedin.com/jobs/view/404", "description": None},
+        ])
+        fetcher = self.create_fetcher()
+        try:
+            res = fetcher.fetch_missing(jobs_data)
+        finally:
+            fetcher.close()
+
+        self.assertIn("python", res["description"][0])
+        self.assertEqual("already here", res["description"][1])
+        self.assertNotIsInstance(res["description"][2], str)
+        self.assertNotIsInstance(res["description"][3], str)
+        self.assertEqual("https://acme.com/jobs/1", res["job_url_direct"][0])
+        self.assertEqual(["https://www.linkedin.com/jobs/view/1", "https://www.linkedin.com/jobs/view/404"],
+                         sorted(url for url, _, _ in FakeSession.requests))
+
+    def test_fresh_cache_is_not_requested_again(self):
+        urls = [f"https://www.linkedin.com/jobs/view/{idx}" for idx in range(5)]
+        fetcher = self.create_fetcher()
+        try:
+            first = fetcher.fetch(urls)
+            second = fetcher.fetch(urls)
+        finally:
+            fetcher.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(5, len(FakeSession.requests))
+
+    def test_stale_cache_is_revalidated_with_the_etag(self):
+        url = "https://www.linkedin.com/jobs/view/1"
+        fetcher = self.create_fetcher(fresh_hours=0)
+        try:
+            first = fetcher.fetch([url])
+            second = fetcher.fetch([url])
+        finally:
+            fetcher.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual({"If-None-Match": f"etag-{url}"}, FakeSession.requests[1][2])
+
+    def test_failed_proxy_is_retried_with_another_one(self):
+        fetcher = self.create_fetcher(proxies=["bad", "good"])
+        try:
+            fetched = fetcher.fetch(["https://www.linkedin.com/jobs/view/1"])
+        finally:
+            fetcher.close()
+
+        self.assertEqual(1, len(fetched))
+        self.assertEqual(["bad", "good"], [proxy for _, proxy, _ in FakeSession.requests])
+
+    def test_stale_cache_is_kept_when_revalidation_fails(self):
+        url = "https://www.linkedin.com/jobs/view/1"
+        fetcher = self.create_fetcher(fresh_hours=0)
+        try:
+            first = fetcher.fetch([url])
+        finally:
+            fetcher.close()
+
+        fetcher = self.create_fetcher(proxies=["bad"], fresh_hours=0)
+        try:
+            second = fetcher.fetch([url])
+        finally:
+            fetcher.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(["bad", "bad"], [proxy for _, proxy, _ in FakeSession.requests[1:]])
+
+    def test_cache_is_bounded(self):
+        urls = [f"https://www.linkedin.com/jobs/view/{idx}" for idx in range(5)]
+        fetcher = self.create_fetcher()
+        try:
+            with mock.patch.object(description_fetcher, "DESCRIPTION_CACHE_MAX_ENTRIES", 2):
+                fetcher.fetch(urls)
+        finally:
+            fetcher.close()
+
+        cache = ScoreCache(self.mock_cache_path)
+        try:
+            self.assertEqual(2, len(cache))
+        finally:
+            cache.close()
@@ -0,0 +1,75 @@
+import os
+from unittest import TestCase, mock
+
+from services import feature_store
+from services.feature_store import FeatureStore, rescore_descriptions
+from services.job_analysis import score_jobs_batch
+
+KEYWORDS = {"python": 50, "flask": 40, "aws": 45, "react": 25, "java": -50, "go": -50, "kubernetes": -100}
+MUST_HAVE = {"python"}
+HARD_AVOID = {"php"}
+
+DESCRIPTIONS = [
+    "Requirements:\n- 3+ years of experience with Python and Flask\n- Familiarity with Java or Go (nice to have)",
+    "Requirements:\n- python and aws\nResponsibilities:\nown our aws pipelines",
+    "Requirements:\n- python, java and kubernetes\n- exposure to kubernetes is a plus",
+    "About us:\nwe use python and react\nRequirements:\n- python, flsk and reactjs",
+    "Requirements:\n- php and python",
+    "Requirements:\n- react",
+    float("nan"),
+    "Requirements:\n- python and aws\nResponsibilities:\nown our aws pipelines",
+]
+
+
+class TestRescoreDescriptions(TestCase):
+    mock_store_path = os.path.join(os.getcwd(), "mock_job_features.npz")
+
+    def tearDown(self):
+        if os.path.exists(self.mock_store_path):
+            os.remove(self.mock_store_path)
+
+    def rescore(self, keywords: dict[str, int], descriptions: list = DESCRIPTIONS):
+        return rescore_descriptions(descriptions, keywords, MUST_HAVE, HARD_AVOID, file_path=self.mock_store_path,
+                                    workers=1)
+
+    def assertSameScores(self, keywords: dict[str, int], descriptions: list = DESCRIPTIONS):
+        expected = score_jobs_batch(descriptions, workers=1, keywords=keywords, must_have=MUST_HAVE,
+                                    hard_avoid=HARD_AVOID)
+        for res, exp in zip(self.rescore(keywords, descriptions), expected, strict=True):
+            if exp is None:
+                self.assertIsNone(res)
+                continue
+            self.assertAlmostEqual(exp.score, res.score)
+            self.assertAlmostEqual(exp.bm25f, res.bm25f)
+            self.assertEqual(exp.gates_passed, res.gates_passed)
+            self.assertEqual(exp.fail_reason, res.fail_reason)
+            self.assertEqual(exp.matched_by_section, res.matched_by_section)
+
+    def test_scores_match_scoring_the_descriptions(self):
+        self.assertSameScores(KEYWORDS)
+
+    def test_weight_change_is_rescored_without_reading_the_descriptions(self):
+        self.rescore(KEYWORDS)
+        keywords = {**KEYWORDS, "python": 20, "java": -200, "react": 60}
+        with mock.patch.object(feature_store, "keyword_features_batch") as features_batch:
+            self.rescore(keywords)
+        features_batch.assert_not_called()
+        self.assertSameScores(keywords)
+
+    def test_removed_keyword_only_reads_the_jobs_that_hit_it(self):
+        self.rescore(KEYWORDS)
+        keywords = {kw: w for kw, w in KEYWORDS.items() if kw != "react"}
+        with mock.patch.object(feature_store, "keyword_features_batch",
+                               wraps=feature_store.keyword_features_batch) as features_batch:
+            self.assertSameScores(keywords)
+        self.assertEqual([[DESCRIPTIONS[3]]], [call.args[0] for call in features_batch.mock_calls])
+
+    def test_new_keyword_or_sign_change_reads_every_job(self):
+        self.rescore(KEYWORDS)
+        self.assertSameScores({**KEYWORDS, "redis": 30})
+        self.assertSameScores({**KEYWORDS, "go": 10})
+
+    def test_new_descriptions_are_added_to_the_store(self):
+        self.rescore(KEYWORDS, DESCRIPTIONS[:3])
+        self.assertSameScores(KEYWORDS, DESCRIPTIONS[2:])
+        self.assertEqual(len(set(DESCRIPTIONS[:6])), len(FeatureStore.load(self.mock_store_path)))
@@ -0,0 +1,193 @@
+import os
+from unittest import TestCase, mock
+
+from services import job_analysis
+from services.job_analysis import parse_description, tokenize, split_sections, split_requirement_sentences, \
+    score_jobs_batch, score_job_description, score_requirements_section, gate_description, gate_failure, scoring_pool
+from utils.score_cache import ScoreCache
+
+MOCK_DESCRIPTION = """About us
+We build CI/CD tooling in Node.js.
+Requirements:
+• 3+ years of experience with Python.
+- Familiarity with Java or Go (nice to have)
+Responsibilities:
+Own our aws/ci/cd pipelines
+"""
+
+
+class TestParseDescription(TestCase):
+    def test_tokenize_applies_normalize_variants(self):
+        self.assertEqual(["we", "use", "cicd", "node", "and", "aws/cicd"],
+                         tokenize("We use CI / CD, Node.js and aws/ci-cd"))
+
+    def test_section_tokens_match_tokenized_sections(self):
+        parsed = parse_description(MOCK_DESCRIPTION)
+
+        for sec, text in split_sections(MOCK_DESCRIPTION).items():
+            self.assertEqual(tokenize(text), parsed.section_tokens(sec))
+
+    def test_sentences_match_split_requirement_sentences(self):
+        parsed = parse_description(MOCK_DESCRIPTION)
+        req_text = split_sections(MOCK_DESCRIPTION)["requirements"]
+
+        self.assertEqual(split_requirement_sentences(req_text),
+                         [parsed.text[sent.start:sent.end] for sent in parsed.sentences])
+        self.assertEqual([tokenize(sent) for sent in split_requirement_sentences(req_text)],
+                         [parsed.sentence_tokens(sent) for sent in parsed.sentences])
+
+    def test_variant_across_a_sentence_boundary_stays_split_in_the_sentences(self):
+        description = "Requirements: python, ci/cd and node.js. c#net c# ci - cd ci cd ci/ci/cd"
+        parsed = parse_description(description)
+        req_text = split_sections(description)["requirements"]
+
+        self.assertEqual(tokenize(req_text), parsed.section_tokens("requirements"))
+        self.assertEqual([tokenize(sent) for sent in split_requirement_sentences(req_text)],
+                         [parsed.sentence_tokens(sent) for sent in parsed.sentences])
+
+    def test_variant_right_after_a_glued_header_is_normalized(self):
+        parsed = parse_description("RequirementsNode.js, python")
+        self.assertEqual(["node", "python"], parsed.section_tokens("requirements"))
+
+        parsed = parse_description("requirements: python\nqualificationsci/cd")
+        self.assertEqual(["python", "cicd"], parsed.section_tokens("requirements"))
+        self.assertEqual([["python"], ["cicd"]], [parsed.sentence_tokens(sent) for sent in parsed.sentences])
+
+        parsed = parse_description("aboutci/cd requirements: python")
+        self.assertEqual(["cicd"], parsed.section_tokens("about"))
+
+
+class TestSentenceFeatures(TestCase):
+    keywords = {"python": 10, "java": -70, "go": -20}
+
+    def setUp(self):
+        job_analysis._sentence_features.clear()
+
+    def test_requirements_score_uses_sentence_cues(self):
+        parsed = parse_description(MOCK_DESCRIPTION)
+
+        # python at full weight, java/go get the soft cue (0.35) and the parentheses (0.5) and are in an or group
+        self.assertAlmostEqual(10 + (-70 - 20) * 0.35 * 0.5 * 0.5, score_requirements_section(parsed, self.keywords))
+
+    def test_repeated_sentence_is_a_cache_hit(self):
+        first = parse_description("Requirements:\n- Experience with Python")
+        second = parse_description("About\nwe are a startup\nRequirements:\n- Experience with Python")
+        score_requirements_section(first, self.keywords)
+
+        with mock.patch.object(job_analysis, "sentence_strength_multiplier") as multiplier:
+            self.assertEqual(10, score_requirements_section(second, self.keywords))
+        multiplier.assert_not_called()
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(job_analysis, "SENTENCE_CACHE_SIZE", 2):
+            for idx in range(5):
+                score_requirements_section(parse_description(f"Requirements:\n- python {idx}"), self.keywords)
+
+        self.assertEqual(2, len(job_analysis._sentence_features))
+
+
+class TestScoreJobsBatch(TestCase):
+    descriptions = [
+        MOCK_DESCRIPTION,
+        float("nan"),
+        "Requirements: python, flask and redis",
+        "Requirements: php and python",
+        "Requirements: java",
+    ]
+
+    def test_score_jobs_batch_keeps_input_order(self):
+        expected = [score_job_description(desc) if isinstance(desc, str) else None for desc in self.descriptions]
+        results = score_jobs_batch(self.descriptions, workers=1)
+
+        # bm25f is scored against the whole batch so only the keyword part is the same as a single job
+        self.assertEqual([res and (res.fail_reason, res.matched_by_section, res.keyword_score) for res in expected],
+                         [res and (res.fail_reason, res.matched_by_section, res.keyword_score) for res in results])
+
+    def test_score_jobs_batch_with_process_pool_matches_serial(self):
+        with mock.patch.object(job_analysis, "MIN_DESCRIPTIONS_PER_WORKER", 1):
+            self.assertEqual(score_jobs_batch(self.descriptions, workers=1),
+                             score_jobs_batch(self.descriptions, workers=2, chunk_size=2))
+
+    def test_score_jobs_batch_reuses_the_given_pool(self):
+        expected = score_jobs_batch(self.descriptions, workers=1)
+        with scoring_pool(workers=2) as pool, \
+                mock.patch.object(job_analysis, "MIN_DESCRIPTIONS_PER_WORKER", 1), \
+                mock.patch("services.job_analysis.ProcessPoolExecutor") as mock_pool:
+            for _ in range(2):
+                self.assertEqual(expected, score_jobs_batch(self.descriptions, workers=2, chunk_size=2,
+                                                            executor=pool))
+        mock_pool.assert_not_called()
+        self.assertEqual("spawn", pool._mp_context.get_start_method())
+
+    def test_small_batch_is_scored_without_a_process_pool(self):
+        with mock.patch("services.job_analysis.ProcessPoolExecutor") as mock_pool:
+            score_jobs_batch(self.descriptions * 10, workers=8)
+        mock_pool.assert_not_called()
+
+    def test_score_jobs_batch_with_cache_scores_each_description_once(self):
+        cache_path = os.path.join(os.getcwd(), "mock_score_cache.sqlite")
+        cache = ScoreCache(file_path=cache_path)
+        try:
+            expected = score_jobs_batch(self.descriptions, workers=1)
+            self.assertEqual(expected, score_jobs_batch(self.descriptions, workers=1, cache=cache))
+
+            with mock.patch("services.job_analysis.gate_description") as mock_gate:
+                self.assertEqual(expected, score_jobs_batch(self.descriptions, workers=1, cache=cache))
+                mock_gate.assert_not_called()
+
+            # a different config doesn't use the cached scores
+            with mock.patch("services.job_analysis.gate_description", wraps=gate_description) as mock_gate:
+                score_jobs_batch(self.descriptions, workers=1, cache=cache, must_have={"redis"})
+                self.assertEqual(4, mock_gate.call_count)
+
+            # neither does a new version of the scoring code
+            with mock.patch.object(job_analysis, "SCORING_VERSION", job_analysis.SCORING_VERSION + 1), \
+                    mock.patch("services.job_analysis.gate_description", wraps=gate_description) as mock_gate:
+                score_jobs_batch(self.descriptions, workers=1, cache=cache)
+                self.assertEqual(4, mock_gate.call_count)
+        finally:
+            cache.close()
+            os.remove(cache_path)
+
+
+class TestGateDescription(TestCase):
+    texts = [
+        MOCK_DESCRIPTION,
+        "Requirements:\n- python and php",
+        "Requirements:\n- python, phpunit and pythonic code",
+        "About us: we love python\nRequirements:\n- go and java",
+        "Requirements:php, python",
+        "Requirementsphp python",
+        "Requirements:\n- python\n- c# or ci / cd or node.js",
+        "Requirements:\n- python/ruby and web3",
+        "We use Python.\nRequirements:\n- none",
+        "Requirements:\n- node and ci-cdWhat you'll do\nship",
+        "RequirementsNode.js, python",
+        "requirements: python\nqualificationsci/cd",
+        "aboutci/cd requirements: python",
+        "",
+    ]
+    gates = [
+        ({"python"}, {"angular", "php", "ruby", "web3"}),
+        ({"python", "cicd"}, {"csharp", "node"}),
+        ({"python"}, {"web", "web3", "eb3"}),
+        (set(), {"python/ruby"}),
+        ({"node"}, {"ci"}),
+        ({"python"}, {"js", "cd"}),
+    ]
+
+    def test_decided_gates_match_the_parsed_gates(self):
+        for must_have, hard_avoid in self.gates:
+            for text in self.texts:
+                with self.subTest(text=text, must_have=must_have, hard_avoid=hard_avoid):
+                    decided, fail_reason = gate_description(text, must_have, hard_avoid)
+                    if decided:
+                        self.assertEqual(gate_failure(parse_description(text), must_have, hard_avoid),
+                                         fail_reason)
+
+    def test_clear_gate_failures_are_not_parsed(self):
+        with mock.patch("services.job_analysis.parse_description") as mock_parse:
+            results = score_jobs_batch(["Requirements:\n- java and spring", "Requirements:\n- python and php"],
+                                       workers=1, must_have={"python"}, hard_avoid={"php"})
+        mock_parse.assert_not_called()
+        self.assertEqual(["missing_must_have", "hard_avoid:php"], [res.fail_reason for res in results])
@@ -0,0 +1,60 @@
+import os
+from unittest import TestCase
+
+from services.job_loader import load_jobs_to_classes
+from models.job import Job
+from tests.utils.test_backup import create_mock_dataframe
+from utils.score_cache import ScoreCache
+
+
+class TestLoadJobsToClasses(TestCase):
+    mock_cache_path = os.path.join(os.getcwd(), "mock_score_cache.sqlite")
+
+    def setUp(self):
+        self.cache = ScoreCache(file_path=self.mock_cache_path)
+
+    def tearDown(self):
+        self.cache.close()
+        if os.path.exists(self.mock_cache_path):
+            os.remove(self.mock_cache_path)
+
+    def test_load_jobs_to_classes_builds_jobs(self):
+        jobs = load_jobs_to_classes(create_mock_dataframe(), cache=self.cache)
+
+        self.assertEqual(2, len(jobs))
+        self.assertEqual(Job(company="TestCorp", company_desc="A fictional company for testing.", employees_num=100,
+                             company_url="https://testcorp.com", desc="We are looking for a backend engineer.",
+                             is_remote=True, level_desc="Mid", url="https://testcorp.com/careers/job1",
+                             location="Tel Aviv, Israel", title="Backend Engineer", rating=jobs[0].rating,
+                             fail_reason="missing_must_have", posting_id="li-123"), jobs[0])
+
+    def test_load_jobs_to_classes_cleans_missing_values(self):
+        jobs_data = create_mock_dataframe()
+        jobs_data.loc[0, "company_url_direct"] = float("nan")
+        jobs_data.loc[0, "job_url_direct"] = ""
+        jobs_data.loc[1, "description"] = float("nan")
+        jobs_data.loc[1, "job_level"] = float("nan")
+
+        jobs = load_jobs_to_classes(jobs_data, cache=self.cache)
+
+        self.assertEqual("https://linkedin.com/company/testcorp", jobs[0].company_url)
+        self.assertEqual("https://linkedin.com/jobs/view/123", jobs[0].url)
+        self.assertIsNone(jobs[1].desc)
+        self.assertIsNone(jobs[1].level_desc)
+        self.assertEqual(0, jobs[1].rating)
+
+    def test_load_jobs_to_classes_scores_descriptions(self):
+        jobs_data = create_mock_dataframe()
+        jobs_data.loc[0, "description"] = "Requirements: python, flask and redis"
+
+        jobs = load_jobs_to_classes(jobs_data, cache=self.cache)
+
+        self.assertGreater(jobs[0].rating, 0)
+        self.assertEqual(-1000, jobs[1].rating)
+
+    def test_load_jobs_to_classes_keeps_alternate_urls(self):
+        jobs_data = create_mock_dataframe().assign(alternate_urls=[["https://il.indeed.com/viewjob?jk=1"], []])
+
+        jobs = load_jobs_to_classes(jobs_data, cache=self.cache)
+
+        self.assertEqual([["https://il.indeed.com/viewjob?jk=1"], []], [job.alternate_urls for job in jobs])
@@ -0,0 +1,65 @@
+from unittest import TestCase, mock
+
+from rapidfuzz import fuzz, process as rf_process
+
+from config.job_scoring_config import KEYWORDS_CONFIG
+from services import keyword_matcher
+from services.keyword_matcher import KeywordMatcher, get_keyword_matcher
+
+
+def extract_one_hits(tokens: list[str], keywords: dict[str, int], fuzzy_threshold: int = 90) -> dict[str, int]:
+    """the per token extractOne loop the matcher replaced"""
+    hits = {keyword: weight for keyword, weight in keywords.items() if keyword in tokens}
+    candidates = [keyword for keyword, weight in keywords.items() if weight > 0 and keyword not in hits]
+    for tok in tokens:
+        res = rf_process.extractOne(tok, candidates, scorer=fuzz.token_set_ratio)
+        if res and res[1] >= fuzzy_threshold:
+            hits.setdefault(res[0], keywords[res[0]])
+    return hits
+
+
+def near_miss_tokens(keywords: dict[str, int]) -> set[str]:
+    tokens = set()
+    for keyword in keywords:
+        for i in range(len(keyword) + 1):
+            for ch in "aesx#/":
+                tokens.add(keyword[:i] + ch + keyword[i:])
+            if i < len(keyword):
+                tokens.add(keyword[:i] + keyword[i + 1:])
+                tokens.add(keyword[:i] + "z" + keyword[i + 1:])
+    return tokens
+
+
+class TestKeywordMatcher(TestCase):
+    def test_hits_match_extract_one_for_near_misses(self):
+        matcher = KeywordMatcher(KEYWORDS_CONFIG)
+        for tok in near_miss_tokens(KEYWORDS_CONFIG):
+            self.assertEqual(extract_one_hits([tok], KEYWORDS_CONFIG), matcher.hits([tok]), tok)
+
+    def test_hits_skip_keywords_already_matched_exactly(self):
+        matcher = KeywordMatcher(KEYWORDS_CONFIG)
+        tokens = ["python", "pythons", "mysql", "sql", "microservice", "node", "go"]
+
+        self.assertEqual(extract_one_hits(tokens, KEYWORDS_CONFIG), matcher.hits(tokens))
+
+    def test_negative_keywords_are_only_matched_exactly(self):
+        matcher = KeywordMatcher(KEYWORDS_CONFIG)
+
+        self.assertEqual({}, matcher.hits(["kubernete"]))
+        self.assertEqual({"kubernetes": -100}, matcher.hits(["kubernetes"]))
+
+    def test_lower_threshold_matches_extract_one(self):
+        matcher = KeywordMatcher(KEYWORDS_CONFIG, fuzzy_threshold=80)
+        for tok in near_miss_tokens(KEYWORDS_CONFIG):
+            self.assertEqual(extract_one_hits([tok], KEYWORDS_CONFIG, 80), matcher.hits([tok]), tok)
+
+    def test_fuzzy_cache_is_bounded(self):
+        matcher = KeywordMatcher(KEYWORDS_CONFIG)
+        with mock.patch.object(keyword_matcher, "FUZZY_CACHE_SIZE", 2):
+            for tok in ["pythn", "flsk", "reactt", "pythn"]:
+                matcher.hits([tok])
+
+        self.assertEqual(["reactt", "pythn"], list(matcher._cache))
+
+    def test_get_keyword_matcher_reuses_matcher_for_same_config(self):
+        self.assertIs(get_keyword_matcher(KEYWORDS_CONFIG), get_keyword_matcher(dict(KEYWORDS_CONFIG)))
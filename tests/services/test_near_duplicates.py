@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from services.near_duplicates import near_duplicate_clusters, collapse_near_duplicates
+
+MOCK_DESCRIPTION = """We are looking for a backend engineer to join our platform team in Tel Aviv.
+Requirements:
+- 3+ years of experience with Python and Django
+- Experience with AWS, Docker and Kubernetes
+- Familiarity with PostgreSQL and Redis
+Responsibilities:
+Design, build and own services that handle millions of requests a day.
+"""
+OTHER_DESCRIPTION = """Frontend developer wanted for a growing fintech startup.
+You will build React and TypeScript applications used by thousands of customers and work closely with design.
+"""
+
+
+class TestNearDuplicates(TestCase):
+    def test_near_duplicate_clusters_groups_reposts(self):
+        repost = "Posted by an agency on behalf of our client.\n" + MOCK_DESCRIPTION
+
+        clusters = near_duplicate_clusters([MOCK_DESCRIPTION, OTHER_DESCRIPTION, repost, None, ""])
+
+        self.assertEqual([0, 1, 0, 3, 4], clusters)
+
+    def test_collapse_near_duplicates_keeps_first_posting_with_alternate_urls(self):
+        jobs_data = pd.DataFrame([
+            {"description": MOCK_DESCRIPTION, "job_url": "https://linkedin.com/jobs/view/1", "job_url_direct": None},
+            {"description": OTHER_DESCRIPTION, "job_url": "https://linkedin.com/jobs/view/2", "job_url_direct": None},
+            {"description": MOCK_DESCRIPTION, "job_url": "https://il.indeed.com/viewjob?jk=1",
+             "job_url_direct": "https://testcorp.com/careers/1"},
+        ])
+
+        collapsed = collapse_near_duplicates(jobs_data)
+
+        self.assertEqual(["https://linkedin.com/jobs/view/1", "https://linkedin.com/jobs/view/2"],
+                         collapsed["job_url"].tolist())
+        self.assertEqual([["https://testcorp.com/careers/1"], []], collapsed["alternate_urls"].tolist())
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import shutil
+import threading
+from functools import partial
+from unittest import TestCase, mock
+
+from pandas import DataFrame
+
+from models.scrape_query import ScrapeQuery
+from services import pipeline
+from services.job_analysis import score_jobs_batch as original_score_jobs_batch
+from services.pipeline import run_pipeline
+from utils.backup import append_scraping_results_to_backup_folder, get_scraping_results_from_back_folder
+from utils.job_store import JobStore
+from utils.seen_postings import SeenPostings
+
+BACKEND_DESCRIPTION = """Requirements:
+- 3+ years of experience with Python and Django
+- Experience with AWS, Docker and Kubernetes and PostgreSQL
+"""
+FRONTEND_DESCRIPTION = "Requirements:\n- Experience with React and TypeScript for our customer facing apps"
+
+
+class TestRunPipeline(TestCase):
+    mock_seen_path = os.path.join(os.getcwd(), "mock_pipeline_seen.sqlite")
+    mock_cache_path = os.path.join(os.getcwd(), "mock_pipeline_cache.sqlite")
+    mock_store_path = os.path.join(os.getcwd(), "mock_pipeline_job_store.sqlite")
+    mock_backup_path = os.path.join(os.getcwd(), "mock_pipeline_backup")
+    queries = [
+        ScrapeQuery(site="linkedin", search_term="python developer", location="Tel aviv"),
+        ScrapeQuery(site="indeed", search_term="python developer", location="Tel aviv"),
+    ]
+
+    def setUp(self):
+        self.seen = SeenPostings(file_path=self.mock_seen_path)
+        self.reports = []
+        self.backed_up = []
+
+    def tearDown(self):
+        self.seen.close()
+        for path in [self.mock_seen_path, self.mock_cache_path, self.mock_store_path]:
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(self.mock_backup_path, ignore_errors=True)
+
+    def write_report(self, jobs):
+        self.reports.append(jobs)
+        return "mock_report"
+
+    def run_pipeline(self, **kwargs):
+        return asyncio.run(run_pipeline(seen_postings=self.seen, on_result=self.backed_up.append,
+                                        write_report=self.write_report, cache_path=self.mock_cache_path, **kwargs))
+
+    @staticmethod
+    def scrape(site_name, **kwargs):
+        if site_name == ["linkedin"]:
+            return DataFrame([
+                {"id": "li-1", "job_url": "https://linkedin.com/jobs/view/1", "description": BACKEND_DESCRIPTION},
+                {"id": "li-2", "job_url": "https://linkedin.com/jobs/view/2", "description": FRONTEND_DESCRIPTION},
+            ])
+        return DataFrame([
+            # the same job reposted on indeed, and a posting both queries found
+            {"id": "in-1", "job_url": "https://il.indeed.com/viewjob?jk=1", "description": BACKEND_DESCRIPTION},
+            {"id": "li-2", "job_url": "https://linkedin.com/jobs/view/2", "description": FRONTEND_DESCRIPTION},
+        ])
+
+    def test_run_pipeline_scores_new_postings_once(self):
+        report_name = self.run_pipeline(queries=self.queries, scrape=self.scrape)
+
+        self.assertEqual("mock_report", report_name)
+        self.assertEqual(2, len(self.backed_up))
+        # the queries finish in any order, so either copy of the reposted job can be the one that's kept
+        self.assertEqual(2, len(self.reports[0]))
+        self.assertEqual([["https://il.indeed.com/viewjob?jk=1", "https://linkedin.com/jobs/view/1"],
+                          ["https://linkedin.com/jobs/view/2"]],
+                         sorted(sorted([job.url] + job.alternate_urls) for job in self.reports[0]))
+
+        # the next run has nothing new
+        self.assertIsNone(self.run_pipeline(queries=self.queries, scrape=self.scrape))
+        self.assertEqual(1, len(self.reports))
+
+    def test_run_pipeline_scores_while_other_queries_scrape(self):
+        first_scored = threading.Event()
+
+        def scrape(site_name, **kwargs):
+            # the indeed query only finishes after the linkedin postings made it through scoring
+            if site_name == ["indeed"] and not first_scored.wait(timeout=5):
+                raise TimeoutError("linkedin postings were not scored while indeed was scraping")
+            return self.scrape(site_name)
+
+        def score_jobs_batch(descriptions, **kwargs):
+            res = original_score_jobs_batch(descriptions, **kwargs)
+            first_scored.set()
+            return res
+
+        with mock.patch.object(pipeline, "score_jobs_batch", side_effect=score_jobs_batch):
+            self.run_pipeline(queries=self.queries, scrape=scrape, retries=0)
+
+        self.assertEqual(2, len(self.backed_up))
+        self.assertEqual(2, len(self.reports[0]))
+
+    def test_run_pipeline_shares_one_process_pool(self):
+        executors = []
+
+        def score_jobs_batch(descriptions, executor=None, **kwargs):
+            executors.append(executor)
+            return original_score_jobs_batch(descriptions, executor=executor, **kwargs)
+
+        with mock.patch.object(pipeline, "score_jobs_batch", side_effect=score_jobs_batch), \
+                mock.patch("services.job_loader.score_jobs_batch", side_effect=score_jobs_batch):
+            self.run_pipeline(queries=self.queries, scrape=self.scrape)
+
+        # the batch of the query that finished first (the other one only adds a repost) and the report
+        self.assertEqual(2, len(executors))
+        self.assertEqual(1, len({id(executor) for executor in executors}))
+        self.assertIsNotNone(executors[0])
+
+    def test_queries_finishing_together_are_all_backed_up(self):
+        queries = [ScrapeQuery(site="linkedin", search_term=str(idx), location="Tel aviv") for idx in range(8)]
+        finished = threading.Barrier(len(queries))
+
+        def scrape(search_term, **kwargs):
+            # every query returns at the same time, so their backup writes overlap
+            finished.wait(timeout=5)
+            return DataFrame([{"id": f"li-{search_term}", "job_url": f"https://linkedin.com/jobs/view/{search_term}",
+                               "description": BACKEND_DESCRIPTION}])
+
+        asyncio.run(run_pipeline(queries=queries, scrape=scrape, max_workers=len(queries), retries=0,
+                                 on_result=partial(append_scraping_results_to_backup_folder,
+                                                   file_path=self.mock_backup_path),
+                                 write_report=self.write_report, cache_path=self.mock_cache_path))
+
+        backed_up = get_scraping_results_from_back_folder(self.mock_backup_path)
+        self.assertEqual(sorted(f"li-{idx}" for idx in range(8)), sorted(backed_up["id"]))
+        self.assertEqual(8, len(os.listdir(self.mock_backup_path)))
+
+    def test_run_pipeline_with_backup_does_not_scrape(self):
+        def scrape(**kwargs):
+            raise AssertionError("should not scrape")
+
+        backup = self.scrape(["linkedin"])
+        reported = []
+        self.assertEqual("mock_report", self.run_pipeline(queries=[], backup=backup, scrape=scrape,
+                                                          on_report=reported.append))
+
+        self.assertEqual(["mock_report"], reported)
+        self.assertEqual([], self.backed_up)
+        self.assertEqual(2, len(self.reports[0]))
+
+    def test_run_pipeline_records_the_reported_jobs(self):
+        store = JobStore(file_path=self.mock_store_path)
+        try:
+            run_id = store.start_run("test")
+            self.run_pipeline(queries=[], backup=self.scrape(["linkedin"]), job_store=store)
+
+            stored = store.query()
+        finally:
+            store.close()
+        self.assertEqual(["li-1", "li-2"], sorted(job.posting_id for job in stored))
+        self.assertEqual({run_id}, {job.run_id for job in stored})
+        self.assertIn("python", stored[0].matched_by_section["requirements"])
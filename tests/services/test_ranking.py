@@ -0,0 +1,54 @@
+import csv
+import os
+from unittest import TestCase
+
+from services.ranking import JobRanker, rank_jobs, write_rejected_log
+from tests.services.test_create_report import create_mock_job
+
+
+def create_ranked_job(company: str, rating: float, fail_reason: str = None):
+    job = create_mock_job(company, rating)
+    job.url = f"https://linkedin.com/jobs/view/{company}"
+    job.fail_reason = fail_reason
+    return job
+
+
+class TestJobRanker(TestCase):
+    def test_keeps_the_best_jobs_above_the_floor(self):
+        jobs = [create_ranked_job(company, rating) for company, rating in
+                [("a", 10), ("b", 90), ("c", -20), ("d", 50), ("e", 70)]]
+
+        ranker = rank_jobs(jobs, top_k=3, score_floor=0)
+
+        self.assertEqual(["b", "e", "d"], [job.company for job in ranker.ranked()])
+        self.assertEqual(1, ranker.below_floor)
+
+    def test_rejected_jobs_keep_only_url_and_reason(self):
+        ranker = JobRanker(top_k=10, score_floor=0)
+        ranker.add([create_ranked_job("a", 40)])
+        ranker.add([create_ranked_job("b", -1000, "hard_avoid:php"), create_ranked_job("c", 60)])
+
+        self.assertEqual(["c", "a"], [job.company for job in ranker.ranked()])
+        self.assertEqual([("https://linkedin.com/jobs/view/b", "hard_avoid:php")], ranker.rejected)
+
+    def test_first_job_wins_a_tie(self):
+        jobs = [create_ranked_job(company, 50) for company in "abc"]
+
+        self.assertEqual(["a", "b"], [job.company for job in rank_jobs(jobs, top_k=2).ranked()])
+
+
+class TestWriteRejectedLog(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_rejected_jobs.csv")
+
+    def tearDown(self):
+        if os.path.exists(self.mock_file_path):
+            os.remove(self.mock_file_path)
+
+    def test_rejected_log_is_appended(self):
+        write_rejected_log([("https://linkedin.com/jobs/view/1", "missing_must_have")], self.mock_file_path)
+        write_rejected_log([(None, "hard_avoid:php")], self.mock_file_path)
+
+        with open(self.mock_file_path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([["missing_must_have", "https://linkedin.com/jobs/view/1"], ["hard_avoid:php", ""]],
+                         [row[1:] for row in rows])
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import threading
+from unittest import TestCase
+
+from services.report_delivery import ReportDelivery, FileDropBackend, WebhookBackend
+
+
+class RecordingBackend:
+    """fails the first `failures` deliveries, can be held until release is set"""
+    name = "recording"
+
+    def __init__(self, failures: int = 0, release: threading.Event = None):
+        self.failures = failures
+        self.release = release
+        self.deliveries = []
+
+    def deliver(self, report_paths: list[str]):
+        if self.release is not None:
+            self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise OSError("terminal-notifier not found")
+        self.deliveries.append(report_paths)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"status {self.status_code}")
+
+
+class TestReportDelivery(TestCase):
+    mock_dir = os.path.join(os.getcwd(), "mock_report_delivery")
+
+    def setUp(self):
+        os.makedirs(self.mock_dir, exist_ok=True)
+        self.reports = []
+        for idx in range(2):
+            path = os.path.join(self.mock_dir, f"job_report_{idx}.xlsx")
+            open(path, "w").close()
+            self.reports.append(path)
+        self.sleeps = []
+
+    def tearDown(self):
+        shutil.rmtree(self.mock_dir, ignore_errors=True)
+
+    def create_delivery(self, backends: list, coalesce_seconds: float = 5) -> ReportDelivery:
+        return ReportDelivery(backends, coalesce_seconds=coalesce_seconds, retries=2, backoff_seconds=1,
+                              sleep=self.sleeps.append)
+
+    def test_reports_submitted_together_are_one_delivery(self):
+        backend = RecordingBackend()
+        delivery = self.create_delivery([backend])
+        for path in [*self.reports, self.reports[0]]:
+            delivery.submit(path)
+
+        self.assertTrue(delivery.close())
+        self.assertEqual([self.reports], backend.deliveries)
+
+    def test_failed_backend_is_retried_and_does_not_stop_the_others(self):
+        flaky = RecordingBackend(failures=2)
+        broken = RecordingBackend(failures=10)
+        working = RecordingBackend()
+        delivery = self.create_delivery([broken, flaky, working])
+        delivery.submit(self.reports[0])
+
+        self.assertTrue(delivery.close())
+        self.assertEqual([], broken.deliveries)
+        self.assertEqual([[self.reports[0]]], flaky.deliveries)
+        self.assertEqual([[self.reports[0]]], working.deliveries)
+        self.assertEqual([1, 2, 1, 2], self.sleeps)
+
+    def test_missing_report_is_not_delivered(self):
+        backend = RecordingBackend()
+        delivery = self.create_delivery([backend])
+        delivery.submit(os.path.join(self.mock_dir, "missing.xlsx"))
+
+        self.assertTrue(delivery.close())
+        self.assertEqual([], backend.deliveries)
+
+    def test_submit_does_not_wait_for_a_slow_backend(self):
+        release = threading.Event()
+        backend = RecordingBackend(release=release)
+        delivery = self.create_delivery([backend], coalesce_seconds=0)
+        delivery.submit(self.reports[0])
+        delivery.submit(self.reports[1])
+
+        self.assertFalse(delivery.close(wait_seconds=0.1))
+        release.set()
+        self.assertTrue(delivery.close())
+        self.assertEqual(self.reports, [path for paths in backend.deliveries for path in paths])
+
+    def test_file_drop_writes_the_report_paths(self):
+        drop_dir = os.path.join(self.mock_dir, "outbox")
+        FileDropBackend(drop_dir).deliver(self.reports)
+
+        [name] = os.listdir(drop_dir)
+        with open(os.path.join(drop_dir, name)) as f:
+            self.assertEqual(self.reports, json.load(f)["reports"])
+
+    def test_webhook_fails_on_error_status(self):
+        posts = []
+
+        def post(url, json=None, timeout=None):
+            posts.append((url, json["reports"]))
+            return FakeResponse(503 if len(posts) == 1 else 204)
+
+        backend = WebhookBackend("http://127.0.0.1:5002/reports", post=post)
+        with self.assertRaises(RuntimeError):
+            backend.deliver(self.reports)
+        backend.deliver(self.reports)
+
+        self.assertEqual([("http://127.0.0.1:5002/reports", self.reports)] * 2, posts)
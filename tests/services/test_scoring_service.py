@@ -0,0 +1,105 @@
+import os
+import time
+from unittest import TestCase, mock
+
+from config import job_scoring_config
+from services import job_analysis
+from services.scoring_service import create_app
+from utils.score_cache import ScoreCache
+
+DESCRIPTION = "Requirements:\n- 3+ years of experience with Python, Flask and AWS"
+
+
+class TestScoringService(TestCase):
+    mock_cache_path = os.path.join(os.getcwd(), "mock_service_cache.sqlite")
+    mock_config_path = os.path.join(os.getcwd(), "mock_job_scoring_config.py")
+
+    def setUp(self):
+        with open(self.mock_config_path, "w") as f:
+            f.write("# config\n")
+        self.cache = ScoreCache(file_path=self.mock_cache_path)
+        self.client = create_app(cache=self.cache, config_file_path=self.mock_config_path).test_client()
+
+    def tearDown(self):
+        self.cache.close()
+        for path in [self.mock_cache_path, self.mock_config_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_score(self):
+        res = self.client.post("/score", json={"description": DESCRIPTION})
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(job_analysis.score_job_description(DESCRIPTION).score, res.json["score"])
+
+    def test_score_without_description(self):
+        self.assertEqual(400, self.client.post("/score", json={}).status_code)
+
+    def test_score_batch(self):
+        res = self.client.post("/score/batch", json={"descriptions": [DESCRIPTION, None]})
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(job_analysis.score_jobs_batch([DESCRIPTION, None], workers=1)[0].score,
+                         res.json["results"][0]["score"])
+        self.assertIsNone(res.json["results"][1])
+        self.assertEqual(1, len(self.cache))
+
+    def test_only_the_extension_pages_can_call_from_a_browser(self):
+        allowed = self.client.post("/score", json={"description": DESCRIPTION},
+                                   headers={"Origin": "https://www.linkedin.com"})
+        other = self.client.post("/score", json={"description": DESCRIPTION},
+                                 headers={"Origin": "https://example.com"})
+
+        self.assertEqual("https://www.linkedin.com", allowed.headers.get("Access-Control-Allow-Origin"))
+        self.assertIsNone(other.headers.get("Access-Control-Allow-Origin"))
+        with mock.patch.object(job_analysis, "reload_scoring_config") as reload:
+            res = self.client.post("/config/reload", headers={"Origin": "https://www.linkedin.com"})
+        self.assertEqual(403, res.status_code)
+        self.assertIsNone(res.headers.get("Access-Control-Allow-Origin"))
+        reload.assert_not_called()
+
+    def test_config_change_is_reloaded_on_next_request(self):
+        with mock.patch.object(job_analysis, "reload_scoring_config") as reload:
+            self.client.get("/health")
+            reload.assert_not_called()
+
+            stat = os.stat(self.mock_config_path)
+            os.utime(self.mock_config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.client.get("/health")
+            self.client.get("/health")
+        reload.assert_called_once()
+
+
+class TestReloadScoringConfig(TestCase):
+    def test_reload_updates_config_in_place(self):
+        keywords = job_scoring_config.KEYWORDS_CONFIG
+        original = dict(keywords)
+
+        def reload(module):
+            module.KEYWORDS_CONFIG = {**original, "elixir": 40}
+
+        try:
+            with mock.patch("importlib.reload", side_effect=reload):
+                job_analysis.reload_scoring_config()
+
+            self.assertIs(keywords, job_scoring_config.KEYWORDS_CONFIG)
+            self.assertEqual(40, job_analysis.KEYWORDS_CONFIG["elixir"])
+            self.assertGreater(job_analysis.score_job_description("Requirements:\n- python and elixir").score,
+                               job_analysis.score_job_description("Requirements:\n- python").score)
+        finally:
+            keywords.clear()
+            keywords.update(original)
+
+    def test_failed_reload_keeps_old_config(self):
+        keywords = job_scoring_config.KEYWORDS_CONFIG
+
+        def reload(module):
+            module.KEYWORDS_CONFIG = {"elixir": 40}
+            raise SyntaxError("broken config")
+
+        with mock.patch("importlib.reload", side_effect=reload):
+            with self.assertRaises(SyntaxError):
+                job_analysis.reload_scoring_config()
+
+        self.assertIs(keywords, job_scoring_config.KEYWORDS_CONFIG)
+        self.assertNotIn("elixir", keywords)
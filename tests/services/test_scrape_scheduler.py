@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import TestCase
+
+from pandas import DataFrame
+
+from models.scrape_query import ScrapeQuery
+from services.scrape_scheduler import ProxyPool, scrape_queries
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProxyPool(TestCase):
+    def test_acquire_round_robin(self):
+        pool = ProxyPool(["a", "b", "c"])
+
+        self.assertEqual(["a", "b", "c", "a"], [pool.acquire() for _ in range(4)])
+
+    def test_failed_proxy_cools_down(self):
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], cooldown=10, clock=clock)
+        pool.report_failure("a")
+
+        self.assertEqual(["b", "b"], [pool.acquire(), pool.acquire()])
+        clock.now = 11
+        self.assertEqual("a", pool.acquire())
+
+    def test_acquire_without_proxies(self):
+        self.assertIsNone(ProxyPool([]).acquire())
+
+
+class TestScrapeQueries(TestCase):
+    queries = [
+        ScrapeQuery(site="linkedin", search_term="python developer", location="Tel aviv"),
+        ScrapeQuery(site="indeed", search_term="python developer", location="Tel aviv"),
+        ScrapeQuery(site="linkedin", search_term="backend developer", location="Tel aviv"),
+    ]
+
+    def test_scrape_queries_merges_and_dedupes(self):
+        def scrape(site_name, search_term, **kwargs):
+            return DataFrame([
+                {"id": f"{site_name[0]}-1", "job_url": f"https://{site_name[0]}.com/1", "title": search_term},
+                {"id": f"{site_name[0]}-{search_term}", "job_url": f"https://{site_name[0]}.com/{search_term}",
+                 "title": search_term},
+            ])
+
+        res = scrape_queries(self.queries, scrape=scrape)
+
+        self.assertEqual(["linkedin-1", "linkedin-python developer", "indeed-1", "indeed-python developer",
+                          "linkedin-backend developer"], res["id"].tolist())
+
+    def test_scrape_queries_runs_concurrently(self):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def scrape(**kwargs):
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return DataFrame()
+
+        scrape_queries(self.queries, max_workers=3, scrape=scrape)
+
+        self.assertEqual(3, max(max_running))
+
+    def test_scrape_queries_retries_with_another_proxy(self):
+        used_proxies = []
+
+        def scrape(proxies, **kwargs):
+            used_proxies.append(proxies[0])
+            if proxies[0] == "bad":
+                raise ConnectionError("proxy down")
+            return DataFrame([{"id": "1", "job_url": "https://linkedin.com/1"}])
+
+        with self.assertLogs(level="ERROR"):
+            res = scrape_queries(self.queries[:1], proxies=["bad", "good"], scrape=scrape)
+
+        self.assertEqual(["bad", "good"], used_proxies)
+        self.assertEqual(1, len(res))
+
+    def test_scrape_queries_skips_failed_query(self):
+        def scrape(search_term, **kwargs):
+            if search_term == "backend developer":
+                raise ConnectionError("blocked")
+            return DataFrame([{"id": search_term, "job_url": search_term}])
+
+        with self.assertLogs(level="ERROR"):
+            res = scrape_queries(self.queries, retries=0, scrape=scrape)
+
+        self.assertEqual(["python developer"], res["id"].tolist())
+
+    def test_scrape_queries_calls_on_result_for_each_query(self):
+        batches = []
+
+        def scrape(search_term, site_name, **kwargs):
+            return DataFrame([{"id": f"{site_name[0]}-{search_term}", "job_url": f"{site_name[0]}-{search_term}"}])
+
+        scrape_queries(self.queries, scrape=scrape, on_result=batches.append)
+
+        self.assertEqual(3, len(batches))
+
+    def test_scrape_queries_keeps_results_when_on_result_fails(self):
+        def scrape(search_term, site_name, **kwargs):
+            return DataFrame([{"id": f"{site_name[0]}-{search_term}", "job_url": f"{site_name[0]}-{search_term}"}])
+
+        def on_result(jobs_data):
+            raise OSError("disk full")
+
+        with self.assertLogs(level="ERROR"):
+            res = scrape_queries(self.queries, scrape=scrape, on_result=on_result)
+
+        self.assertEqual(3, len(res))
+
+    def test_scrape_queries_fetches_descriptions_before_on_result(self):
+        batches = []
+
+        def scrape(search_term, site_name, **kwargs):
+            return DataFrame([{"id": f"{site_name[0]}-{search_term}", "job_url": f"{site_name[0]}-{search_term}"}])
+
+        res = scrape_queries(self.queries, scrape=scrape, on_result=batches.append,
+                             fetch_descriptions=lambda jobs_data: jobs_data.assign(description="fetched"))
+
+        self.assertEqual(["fetched"] * 3, res["description"].tolist())
+        self.assertEqual(["fetched"] * 3, [batch["description"][0] for batch in batches])
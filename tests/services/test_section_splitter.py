@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from models.job_analysis import JobDescpSection
+from services.section_splitter import SectionSplitter
+
+
+class TestSectionSplitter(TestCase):
+    def test_spans_split_text_between_headers(self):
+        splitter = SectionSplitter({
+            "about": JobDescpSection(weight=0.3, headers=["about"]),
+            "requirements": JobDescpSection(weight=1.0, headers=["Requirements"]),
+        })
+        text = "intro about the job requirements: python"
+
+        self.assertEqual([("about", 0, 6), ("about", 11, 20), ("requirements", 32, 40)], splitter.spans(text))
+
+    def test_header_listed_first_wins_over_longer_header(self):
+        splitter = SectionSplitter({
+            "about": JobDescpSection(weight=0.3, headers=["about", "about us"]),
+            "requirements": JobDescpSection(weight=1.0, headers=["about us team"]),
+        })
+
+        self.assertEqual([("about", 0, 0), ("about", 5, 8)], splitter.spans("about us"))
+
+    def test_longer_header_wins_when_listed_first(self):
+        splitter = SectionSplitter({
+            "requirements": JobDescpSection(weight=1.0, headers=["about us team"]),
+            "about": JobDescpSection(weight=0.3, headers=["about"]),
+        })
+
+        self.assertEqual([("about", 0, 0), ("requirements", 13, 15), ("about", 20, 20)],
+                         splitter.spans("about us team! about"))
+
+    def test_text_without_headers_is_default_section(self):
+        splitter = SectionSplitter({"about": JobDescpSection(weight=0.3, headers=["about"])})
+
+        self.assertEqual([("about", 0, 9)], splitter.spans("no header"))
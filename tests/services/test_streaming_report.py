@@ -0,0 +1,68 @@
+import os
+import shutil
+from unittest import TestCase
+
+from pandas import DataFrame
+
+from services.job_loader import load_jobs_to_classes
+from services.streaming_report import top_jobs_from_backup
+from utils.backup import append_scraping_results_to_backup_folder
+from utils.score_cache import ScoreCache
+
+DESCRIPTIONS = [
+    "Requirements:\n- python, flask and redis",
+    "Requirements:\n- python and aws",
+    "Requirements:\n- python",
+    "Requirements:\n- python, java and kubernetes",
+    "About us:\nwe use python and react",
+]
+
+
+def create_mock_dataframe(start: int, end: int) -> DataFrame:
+    return DataFrame([{"id": f"li-{idx}", "job_url": f"https://linkedin.com/jobs/view/{idx}", "company": f"c{idx}",
+                       "title": "Backend Engineer", "description": DESCRIPTIONS[idx % len(DESCRIPTIONS)]}
+                      for idx in range(start, end)])
+
+
+class TestTopJobsFromBackup(TestCase):
+    mock_folder_path = os.path.join(os.getcwd(), "mock_streaming_backup")
+    mock_cache_path = os.path.join(os.getcwd(), "mock_streaming_cache.sqlite")
+
+    def setUp(self):
+        self.cache = ScoreCache(file_path=self.mock_cache_path)
+        append_scraping_results_to_backup_folder(create_mock_dataframe(0, 6), file_path=self.mock_folder_path)
+        # the second part repeats li-4 and li-5
+        append_scraping_results_to_backup_folder(create_mock_dataframe(4, 10), file_path=self.mock_folder_path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.mock_folder_path)
+        os.remove(self.mock_cache_path)
+
+    def top_jobs(self, **kwargs):
+        self.rejected = []
+        return top_jobs_from_backup(self.mock_folder_path, cache=self.cache, workers=1,
+                                    on_rejected=self.rejected.extend, **kwargs)
+
+    def test_top_jobs_match_scoring_the_whole_backup(self):
+        top = self.top_jobs(top_k=3, chunk_rows=2)
+
+        jobs = load_jobs_to_classes(create_mock_dataframe(0, 10), cache=self.cache)
+        expected = sorted(jobs, key=lambda job: -job.rating)[:3]
+        self.assertEqual([(job.company, job.rating) for job in expected],
+                         [(job.company, job.rating) for job in top])
+
+    def test_top_jobs_skip_duplicate_postings(self):
+        top = self.top_jobs(top_k=100, chunk_rows=4, score_floor=float("-inf"))
+
+        # "About us:\nwe use python and react" is missing python in the requirements
+        self.assertEqual(sorted(f"c{idx}" for idx in range(10) if idx % 5 != 4), sorted(job.company for job in top))
+        self.assertEqual([("https://linkedin.com/jobs/view/4", "missing_must_have"),
+                          ("https://linkedin.com/jobs/view/9", "missing_must_have")], sorted(self.rejected))
+
+    def test_top_jobs_leave_out_jobs_below_the_score_floor(self):
+        top = self.top_jobs(top_k=100, chunk_rows=4, score_floor=0)
+
+        # python, java and kubernetes
+        self.assertNotIn("c3", [job.company for job in top])
+        self.assertTrue(all(job.rating >= 0 for job in top))
@@ -0,0 +1,33 @@
+import os
+from unittest import TestCase, mock
+
+import main
+from benchmarks.import_budget import measure_import, IMPORT_BUDGET_MS
+from utils import backup
+
+
+class TestMain(TestCase):
+    def test_import_main_is_within_budget(self):
+        import_ms, heavy = min(measure_import("main") for _ in range(3))
+
+        self.assertEqual([], heavy)
+        self.assertLessEqual(import_ms, IMPORT_BUDGET_MS)
+
+    def test_commands_without_backup_exit_early(self):
+        missing_path = os.path.join(os.getcwd(), "mock_missing_backup")
+
+        for command in ["score", "report", "rescore-backup"]:
+            with mock.patch.object(backup, "SCRAPING_BACKUP_FILE_PATH", missing_path), \
+                    mock.patch.object(main, "_report_pipeline") as report_pipeline, \
+                    mock.patch("builtins.print") as printed:
+                self.assertEqual(0, main.main([command]))
+
+            report_pipeline.assert_not_called()
+            self.assertIn("No backup", printed.call_args.args[0])
+
+    def test_run_without_backup_scrapes(self):
+        with mock.patch.object(backup, "SCRAPING_BACKUP_FILE_PATH", os.path.join(os.getcwd(), "mock_missing_backup")), \
+                mock.patch.object(main, "_report_pipeline") as report_pipeline:
+            main.main([])
+
+        report_pipeline.assert_called_once_with(scrape=True)
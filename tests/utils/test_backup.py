@@ -1,11 +1,14 @@
 import os
-from unittest import TestCase
+import shutil
+from unittest import TestCase, mock
 
 from pandas import DataFrame
 from pandas._testing import assert_frame_equal
 
+from utils import backup
 from utils.backup import save_scraping_results_to_backup_folder, delete_scraping_results_from_backup_folder, \
-    get_scraping_results_from_back_folder
+    get_scraping_results_from_back_folder, append_scraping_results_to_backup_folder, \
+    iter_scraping_results_from_back_folder, has_scraping_backup
 
 
 def create_mock_dataframe() -> DataFrame:
@@ -92,3 +95,89 @@ class TestBackup(TestCase):
         res = get_scraping_results_from_back_folder(self.mock_file_path)
         self.assertIsNone(res)
 
+
+class TestArrowBackup(TestCase):
+    mock_folder_path = os.path.join(os.getcwd(), "mock_scraping_backup")
+
+    def assertDataframeEqual(self, a, b):
+        try:
+            assert_frame_equal(a, b)
+        except AssertionError as e:
+            raise self.failureException() from e
+
+    def tearDown(self):
+        if os.path.exists(self.mock_folder_path):
+            shutil.rmtree(self.mock_folder_path)
+
+    def test_save_and_get_scraping_results(self):
+        save_scraping_results_to_backup_folder(create_mock_dataframe(), file_path=self.mock_folder_path)
+
+        self.assertDataframeEqual(create_mock_dataframe(),
+                                  get_scraping_results_from_back_folder(self.mock_folder_path))
+
+    def test_save_replaces_existing_backup(self):
+        save_scraping_results_to_backup_folder(create_mock_dataframe(), file_path=self.mock_folder_path)
+        save_scraping_results_to_backup_folder(create_mock_dataframe(), file_path=self.mock_folder_path)
+
+        self.assertEqual(2, len(get_scraping_results_from_back_folder(self.mock_folder_path)))
+
+    def test_append_adds_batches(self):
+        mock_data = create_mock_dataframe()
+        append_scraping_results_to_backup_folder(mock_data.iloc[[0]], file_path=self.mock_folder_path)
+        append_scraping_results_to_backup_folder(mock_data.iloc[[1]], file_path=self.mock_folder_path)
+
+        self.assertDataframeEqual(mock_data, get_scraping_results_from_back_folder(self.mock_folder_path))
+
+    def test_get_reads_only_requested_columns(self):
+        save_scraping_results_to_backup_folder(create_mock_dataframe(), file_path=self.mock_folder_path)
+
+        res = get_scraping_results_from_back_folder(self.mock_folder_path, columns=["title", "missing", "company"])
+
+        self.assertEqual(["company", "title"], sorted(res.columns))
+
+    def test_iter_reads_backup_in_chunks(self):
+        mock_data = create_mock_dataframe()
+        append_scraping_results_to_backup_folder(mock_data, file_path=self.mock_folder_path)
+        append_scraping_results_to_backup_folder(mock_data.iloc[[0]], file_path=self.mock_folder_path)
+
+        chunks = list(iter_scraping_results_from_back_folder(self.mock_folder_path, columns=["title", "missing"],
+                                                             chunk_rows=1))
+
+        self.assertEqual([1, 1, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual(["Backend Engineer", "Frontend Developer", "Backend Engineer"],
+                         [chunk["title"].iloc[0] for chunk in chunks])
+
+    def test_delete_removes_backup_folder(self):
+        save_scraping_results_to_backup_folder(create_mock_dataframe(), file_path=self.mock_folder_path)
+
+        delete_scraping_results_from_backup_folder(file_path=self.mock_folder_path)
+
+        self.assertFalse(os.path.exists(self.mock_folder_path))
+        self.assertIsNone(get_scraping_results_from_back_folder(self.mock_folder_path))
+
+    def test_append_stores_mixed_type_columns_as_strings(self):
+        mock_data = create_mock_dataframe()
+        mock_data["company_num_employees"] = [50, "1,001-5,000"]
+
+        append_scraping_results_to_backup_folder(mock_data, file_path=self.mock_folder_path)
+
+        res = get_scraping_results_from_back_folder(self.mock_folder_path)
+        self.assertEqual(["50", "1,001-5,000"], res["company_num_employees"].tolist())
+        self.assertEqual([True, False], res["is_remote"].tolist())
+
+    def test_legacy_csv_backup_is_read_when_the_folder_is_empty(self):
+        legacy_path = f"{self.mock_folder_path}.csv"
+        with mock.patch.object(backup, "SCRAPING_BACKUP_FILE_PATH", self.mock_folder_path), \
+                mock.patch.object(backup, "LEGACY_SCRAPING_BACKUP_FILE_PATH", legacy_path):
+            try:
+                with open(legacy_path, "w") as f:
+                    f.write(create_mock_dataframe().to_csv(index=False))
+
+                self.assertTrue(has_scraping_backup())
+                self.assertEqual(2, len(get_scraping_results_from_back_folder()))
+
+                delete_scraping_results_from_backup_folder()
+                self.assertFalse(has_scraping_backup())
+            finally:
+                if os.path.exists(legacy_path):
+                    os.remove(legacy_path)
@@ -0,0 +1,64 @@
+import json
+import os
+from unittest import TestCase
+
+from utils.instrumentation import Instrumentation
+
+
+class TestInstrumentation(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_run_summary.json")
+
+    def tearDown(self):
+        for path in (self.mock_file_path, self.mock_file_path.replace(".json", ".prof")):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_stage_does_nothing_when_disabled(self):
+        instrumentation = Instrumentation()
+        with instrumentation.stage("scrape"):
+            pass
+
+        self.assertEqual({}, instrumentation.stages)
+        self.assertIsNone(instrumentation.write_summary(self.mock_file_path))
+
+    def test_stage_records_time_and_count(self):
+        instrumentation = Instrumentation(enabled=True)
+        for _ in range(3):
+            with instrumentation.stage("scrape"):
+                pass
+
+        self.assertEqual(3, instrumentation.stages["scrape"].count)
+        self.assertGreaterEqual(instrumentation.stages["scrape"].total_s, 0)
+
+    def test_record_description_keeps_slowest(self):
+        instrumentation = Instrumentation(enabled=True, slowest_n=2)
+        for seconds in [0.1, 0.5, 0.2, 0.4]:
+            instrumentation.record_description(seconds, f"desc {seconds}")
+
+        self.assertEqual([0.4, 0.5], sorted(seconds for seconds, _ in instrumentation.snapshot()["slowest"]))
+
+    def test_merge_snapshot(self):
+        worker = Instrumentation(enabled=True)
+        worker.record("parse_description", 0.5, count=2)
+        worker.record_description(0.5, "slow desc")
+        instrumentation = Instrumentation(enabled=True)
+        instrumentation.record("parse_description", 1.0)
+
+        instrumentation.merge(worker.snapshot())
+
+        self.assertEqual(3, instrumentation.stages["parse_description"].count)
+        self.assertEqual(1.5, instrumentation.stages["parse_description"].total_s)
+        self.assertEqual([(0.5, "slow desc")], instrumentation.snapshot()["slowest"])
+
+    def test_write_summary_with_profile(self):
+        instrumentation = Instrumentation(enabled=True, profile=True)
+        instrumentation.start_profile()
+        with instrumentation.stage("report"):
+            sum(range(1000))
+
+        instrumentation.write_summary(self.mock_file_path)
+
+        with open(self.mock_file_path) as f:
+            summary = json.load(f)
+        self.assertEqual(1, summary["stages"]["report"]["count"])
+        self.assertTrue(os.path.exists(summary["profile"]["file"]))
@@ -0,0 +1,75 @@
+import os
+import time
+from unittest import TestCase, mock
+
+from models.job import Job
+from utils import job_store
+from utils.job_store import JobStore
+
+
+def create_mock_job(posting_id: str, rating: float, company: str = "TestCorp", desc: str = "Backend role in Python.",
+                    matched_by_section: dict = None, fail_reason: str = None) -> Job:
+    return Job(company=company, company_desc=None, employees_num=None, company_url=None, desc=desc, is_remote=True,
+               level_desc="Mid", url=f"https://linkedin.com/jobs/view/{posting_id}", location="Tel Aviv",
+               title="Backend Engineer", rating=rating, fail_reason=fail_reason, posting_id=posting_id,
+               matched_by_section=matched_by_section or {})
+
+
+class TestJobStore(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_job_store.sqlite")
+
+    def setUp(self):
+        self.store = JobStore(file_path=self.mock_file_path)
+        self.store.start_run("test")
+        self.store.record([
+            create_mock_job("li-1", 80, desc="Python and Redis on AWS",
+                            matched_by_section={"requirements": {"python": 50, "redis": 30}, "about": {"aws": 45}}),
+            create_mock_job("li-2", 40, company="Sample Inc", desc="Redis is nice to have",
+                            matched_by_section={"nice_to_have": {"redis": 30}}),
+            create_mock_job("li-3", -1000, desc="PHP", fail_reason="hard_avoid:php"),
+        ])
+
+    def tearDown(self):
+        self.store.close()
+        if os.path.exists(self.mock_file_path):
+            os.remove(self.mock_file_path)
+
+    def test_query_by_keyword_in_section(self):
+        self.assertEqual(["li-1", "li-2"], [job.posting_id for job in self.store.query(keyword="redis")])
+        self.assertEqual(["li-1"], [job.posting_id for job in self.store.query(keyword="redis",
+                                                                               section="requirements")])
+
+    def test_query_filters_are_combined(self):
+        self.assertEqual(["li-2"], [job.posting_id for job in self.store.query(company="sample inc")])
+        self.assertEqual(["li-1"], [job.posting_id for job in self.store.query(keyword="redis", min_rating=60)])
+        self.assertEqual(["li-3"], [job.posting_id for job in self.store.query(passed_gates=False)])
+        with mock.patch.object(job_store.time, "time", return_value=time.time() + 100 * 24 * 60 * 60):
+            self.assertEqual([], self.store.query(since_days=90))
+
+    def test_stored_job_round_trip(self):
+        job = self.store.query(keyword="aws")[0]
+
+        self.assertEqual("Python and Redis on AWS", job.desc)
+        self.assertEqual({"requirements": {"python": 50, "redis": 30}, "about": {"aws": 45}}, job.matched_by_section)
+        self.assertIs(True, job.is_remote)
+        self.assertEqual(self.store.run_id, job.run_id)
+
+    def test_record_again_updates_the_job(self):
+        first_seen = self.store.query(keyword="aws")[0].first_seen
+        run_id = self.store.start_run("test")
+        self.store.record([create_mock_job("li-1", 90, desc="Python and Kafka",
+                                           matched_by_section={"requirements": {"kafka": 20}})])
+
+        self.assertEqual(3, len(self.store))
+        self.assertEqual([], self.store.query(keyword="aws"))
+        job = self.store.query(keyword="kafka")[0]
+        self.assertEqual((90, run_id, first_seen), (job.rating, job.run_id, job.first_seen))
+
+    def test_full_text_query(self):
+        if not self.store.has_full_text:
+            self.skipTest("sqlite without fts5")
+        self.assertEqual(["li-1", "li-2"], [job.posting_id for job in self.store.query(text="redis")])
+
+        self.store.record([create_mock_job("li-1", 80, desc="Python and Kafka")])
+        self.assertEqual(["li-2"], [job.posting_id for job in self.store.query(text="redis")])
+        self.assertEqual(["li-1"], [job.posting_id for job in self.store.query(text="kafka")])
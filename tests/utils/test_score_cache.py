@@ -0,0 +1,50 @@
+import os
+import time
+from unittest import TestCase
+
+from utils.score_cache import ScoreCache
+
+
+class TestScoreCache(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_score_cache.sqlite")
+
+    def setUp(self):
+        self.cache = ScoreCache(file_path=self.mock_file_path, max_entries=2, max_age_days=1)
+
+    def tearDown(self):
+        self.cache.close()
+        if os.path.exists(self.mock_file_path):
+            os.remove(self.mock_file_path)
+
+    def test_get_many_returns_only_found_keys(self):
+        self.cache.put_many({"a": {"score": 1}, "b": [1, 2]})
+
+        self.assertEqual({"a": {"score": 1}, "b": [1, 2]}, self.cache.get_many(["a", "b", "c"]))
+
+    def test_get_many_handles_more_keys_than_query_limit(self):
+        self.cache.put_many({str(i): i for i in range(1200)})
+
+        self.assertEqual(1200, len(self.cache.get_many(str(i) for i in range(1200))))
+
+    def test_evict_removes_least_recently_used_above_max_entries(self):
+        self.cache.put_many({"a": 1})
+        self.cache.put_many({"b": 2})
+        self.cache.put_many({"c": 3})
+        self.cache.get_many(["a"])
+
+        self.assertEqual(1, self.cache.evict())
+        self.assertEqual({"a": 1, "c": 3}, self.cache.get_many(["a", "b", "c"]))
+
+    def test_evict_removes_old_entries(self):
+        self.cache.put_many({"a": 1})
+        self.cache._conn.execute("UPDATE scores SET last_used = ?", (time.time() - 2 * 24 * 60 * 60,))
+
+        self.assertEqual(1, self.cache.evict())
+        self.assertEqual(0, len(self.cache))
+
+    def test_cache_persists_between_connections(self):
+        self.cache.put_many({"a": 1})
+        self.cache.close()
+        self.cache = ScoreCache(file_path=self.mock_file_path)
+
+        self.assertEqual({"a": 1}, self.cache.get_many(["a"]))
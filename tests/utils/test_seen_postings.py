@@ -0,0 +1,64 @@
+import os
+from unittest import TestCase
+
+from pandas import DataFrame
+
+from utils.seen_postings import SeenPostings, canonical_posting_id
+
+
+def create_mock_dataframe() -> DataFrame:
+    return DataFrame([
+        {"id": "li-123", "job_url": "https://linkedin.com/jobs/view/123", "description": "Backend role in Python."},
+        {"id": "in-abc", "job_url": "https://il.indeed.com/viewjob?jk=abc", "description": "Frontend role in React."},
+        {"id": None, "job_url": "https://linkedin.com/jobs/view/456", "description": float("nan")},
+    ])
+
+
+class TestSeenPostings(TestCase):
+    mock_file_path = os.path.join(os.getcwd(), "mock_seen_postings.sqlite")
+
+    def setUp(self):
+        self.seen = SeenPostings(file_path=self.mock_file_path)
+
+    def tearDown(self):
+        self.seen.close()
+        if os.path.exists(self.mock_file_path):
+            os.remove(self.mock_file_path)
+
+    def test_filter_new_keeps_everything_on_first_run(self):
+        self.assertEqual(3, len(self.seen.filter_new(create_mock_dataframe())))
+
+    def test_filter_new_drops_seen_postings(self):
+        self.seen.mark_seen(create_mock_dataframe())
+
+        self.assertTrue(self.seen.filter_new(create_mock_dataframe()).empty)
+
+    def test_filter_new_keeps_postings_with_changed_description(self):
+        self.seen.mark_seen(create_mock_dataframe())
+        jobs_data = create_mock_dataframe()
+        jobs_data.loc[1, "description"] = "Frontend role in React and Python."
+
+        self.assertEqual(["in-abc"], self.seen.filter_new(jobs_data)["id"].tolist())
+
+    def test_filter_new_matches_by_job_url(self):
+        self.seen.mark_seen(create_mock_dataframe())
+        jobs_data = create_mock_dataframe()
+        jobs_data.loc[0, "id"] = "li-other-id"
+
+        self.assertTrue(self.seen.filter_new(jobs_data).empty)
+
+    def test_postings_without_a_url(self):
+        jobs_data = DataFrame([
+            {"id": "li-789", "job_url": float("nan"), "description": "Data role in SQL."},
+            {"id": None, "job_url": float("nan"), "description": "Data role in SQL."},
+        ])
+        self.seen.mark_seen(jobs_data)
+
+        # the one without an id can't be told apart from a new posting
+        self.assertEqual([1], self.seen.filter_new(jobs_data).index.tolist())
+        self.assertEqual("", canonical_posting_id(None))
+
+    def test_canonical_posting_id_from_url(self):
+        self.assertEqual("li-456", canonical_posting_id("https://www.linkedin.com/jobs/view/python-dev-at-x-456"))
+        self.assertEqual("in-be3e8b", canonical_posting_id("https://il.indeed.com/viewjob?jk=be3e8b"))
+        self.assertEqual("li-1", canonical_posting_id("https://linkedin.com/jobs/view/1", "li-1"))
@@ -1,30 +1,160 @@
 import os
-from typing import Union
+import shutil
+import time
+import uuid
+from typing import TYPE_CHECKING, Iterator, Union
 
-from pandas import DataFrame, read_csv
+# pandas and pyarrow are imported by the functions that use them, so checking for a backup stays cheap
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
+# the backup is a folder of arrow (feather v2) files, one per batch of scraping results.
+# a path ending with .csv is still read/written as a single csv file (older backups)
 SCRAPING_BACKUP_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
-                                         "scraping_backup.csv")
+                                         "scraping_backup")
+# where the backup was before it was a folder, a backup left there by a run that failed is still read (and deleted
+# after its report) when the folder has nothing
+LEGACY_SCRAPING_BACKUP_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                                "scraping_backup.csv")
+BACKUP_COMPRESSION = "zstd"
 
 
-def save_scraping_results_to_backup_folder(scraping_results: DataFrame, file_path: str = None):
-    path = file_path or SCRAPING_BACKUP_FILE_PATH
-    with open(path, "w") as f:
-        f.write(scraping_results.to_csv(index=False))
+def has_scraping_backup(file_path: str = None) -> bool:
+    path = _backup_to_read(file_path)
+    if _is_csv(path):
+        return os.path.exists(path)
+    return bool(_backup_parts(path))
 
 
-def delete_scraping_results_from_backup_folder(file_path: str = None):
+def save_scraping_results_to_backup_folder(scraping_results: "DataFrame", file_path: str = None):
+    """replace the backup with scraping_results"""
     path = file_path or SCRAPING_BACKUP_FILE_PATH
+    if _is_csv(path):
+        with open(path, "w") as f:
+            scraping_results.to_csv(f, index=False)
+        return
+
+    delete_scraping_results_from_backup_folder(path)
+    append_scraping_results_to_backup_folder(scraping_results, path)
+
 
-    if os.path.exists(path):
-        os.remove(path)
+def append_scraping_results_to_backup_folder(scraping_results: "DataFrame", file_path: str = None):
+    """add a batch of scraping results to the backup without touching what's already there,
+    so a scrape can back up each query as soon as it finishes"""
+    import pyarrow.feather as feather
 
-def get_scraping_results_from_back_folder(file_path: str = None) -> Union[DataFrame, None]:
     path = file_path or SCRAPING_BACKUP_FILE_PATH
+    if _is_csv(path):
+        write_header = not os.path.exists(path)
+        with open(path, "a") as f:
+            scraping_results.to_csv(f, index=False, header=write_header)
+        return
+
+    os.makedirs(path, exist_ok=True)
+    # parts are read in name order, the time keeps them in write order and the uuid apart when written together
+    part_path = os.path.join(path, f"part-{time.time_ns():020d}-{uuid.uuid4().hex}.arrow")
+    # write to a temp file first so a crash mid write doesn't leave a broken part behind
+    tmp_path = f"{part_path}.tmp"
+    feather.write_feather(_to_arrow(scraping_results), tmp_path, compression=BACKUP_COMPRESSION)
+    os.replace(tmp_path, part_path)
+
+
+def delete_scraping_results_from_backup_folder(file_path: str = None):
+    paths = [file_path] if file_path else [SCRAPING_BACKUP_FILE_PATH, LEGACY_SCRAPING_BACKUP_FILE_PATH]
+
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def get_scraping_results_from_back_folder(file_path: str = None,
+                                          columns: list[str] = None) -> Union["DataFrame", None]:
+    """read the backup, with columns only those columns are read (missing ones are skipped)"""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    path = _backup_to_read(file_path)
+
+    if not os.path.exists(path):
+        return None
+    if _is_csv(path):
+        return pd.read_csv(path, usecols=lambda col: columns is None or col in columns)
 
-    if os.path.exists(path):
-        return read_csv(path)
-    else:
+    frames = []
+    for part in _backup_parts(path):
+        part_columns = None
+        if columns is not None:
+            with pa.memory_map(part) as source:
+                schema_names = pa.ipc.open_file(source).schema.names
+            part_columns = [col for col in columns if col in schema_names]
+        frames.append(feather.read_table(part, columns=part_columns, memory_map=True).to_pandas())
+
+    if not frames:
         return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_scraping_results_from_back_folder(file_path: str = None, columns: list[str] = None,
+                                           chunk_rows: int = 2000) -> Iterator["DataFrame"]:
+    """read the backup chunk_rows rows at a time, for backups too big to read at once.
+    the arrow parts are memory mapped so only the chunk being converted to pandas is in memory"""
+    import pandas as pd
+    import pyarrow as pa
+
+    path = _backup_to_read(file_path)
+
+    if not os.path.exists(path):
+        return
+    if _is_csv(path):
+        yield from pd.read_csv(path, usecols=lambda col: columns is None or col in columns, chunksize=chunk_rows)
+        return
+
+    for part in _backup_parts(path):
+        with pa.memory_map(part) as source:
+            reader = pa.ipc.open_file(source)
+            part_columns = None if columns is None else [col for col in columns if col in reader.schema.names]
+            for batch_idx in range(reader.num_record_batches):
+                batch = reader.get_batch(batch_idx)
+                if part_columns is not None:
+                    batch = batch.select(part_columns)
+                for offset in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(offset, chunk_rows).to_pandas()
+
+
+def _backup_to_read(file_path: str = None) -> str:
+    if file_path:
+        return file_path
+    if not _backup_parts(SCRAPING_BACKUP_FILE_PATH) and os.path.exists(LEGACY_SCRAPING_BACKUP_FILE_PATH):
+        return LEGACY_SCRAPING_BACKUP_FILE_PATH
+    return SCRAPING_BACKUP_FILE_PATH
+
+
+def _to_arrow(scraping_results: "DataFrame"):
+    """the results as an arrow table, an object column arrow can't type (jobspy mixes ints and strings, e.g.
+    company_num_employees 50 and "1,001-5,000") is stored as strings like the csv backup had it"""
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(scraping_results, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    scraping_results = scraping_results.copy()
+    for col in scraping_results.columns:
+        values = scraping_results[col]
+        try:
+            pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            scraping_results[col] = values.astype(object).where(values.isna(), values.astype(str))
+    return pa.Table.from_pandas(scraping_results, preserve_index=False)
+
+
+def _is_csv(path: str) -> bool:
+    return path.endswith(".csv")
 
 
+def _backup_parts(path: str) -> list[str]:
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".arrow"))
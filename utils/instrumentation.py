@@ -0,0 +1,157 @@
+import cProfile
+import heapq
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from functools import wraps
+from typing import Optional
+
+RUN_SUMMARY_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports")
+
+# a nullcontext can be entered any number of times, so when instrumentation is off every stage() returns this one
+_NULL_STAGE = nullcontext()
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, seconds: float, count: int = 1):
+        self.count += count
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+
+class Instrumentation:
+    """Per stage wall time and call counts, the slowest descriptions and an optional cProfile of the run.
+
+    turned off by default (JOBHUNT_INSTRUMENT=1 / JOBHUNT_PROFILE=1 turn it on), when off stage() and timed() only
+    cost an attribute check
+    """
+
+    def __init__(self, enabled: bool = False, profile: bool = False, slowest_n: int = 10):
+        self.enabled = enabled
+        self.profile = profile
+        self.slowest_n = slowest_n
+        self.stages: dict[str, StageStats] = {}
+        self._slowest: list[tuple[float, str]] = []
+        self._profiler: Optional[cProfile.Profile] = None
+
+    def enable(self, profile: bool = False):
+        self.enabled = True
+        self.profile = profile
+
+    def reset(self):
+        self.stages = {}
+        self._slowest = []
+        self._profiler = None
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+
+    def record(self, name: str, seconds: float, count: int = 1):
+        self.stages.setdefault(name, StageStats()).add(seconds, count)
+
+    def record_description(self, seconds: float, description: str):
+        """keep the slowest_n descriptions, only their start is kept so the summary stays small"""
+        item = (seconds, description[:200])
+        if len(self._slowest) < self.slowest_n:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def snapshot(self) -> dict:
+        """stats that can be sent back from a worker process and merged in the parent"""
+        return {"stages": {name: asdict(stats) for name, stats in self.stages.items()}, "slowest": self._slowest}
+
+    def merge(self, snapshot: dict):
+        for name, stats in snapshot["stages"].items():
+            merged = self.stages.setdefault(name, StageStats())
+            merged.count += stats["count"]
+            merged.total_s += stats["total_s"]
+            merged.max_s = max(merged.max_s, stats["max_s"])
+        for seconds, description in snapshot["slowest"]:
+            self.record_description(seconds, description)
+
+    def start_profile(self):
+        if self.enabled and self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def write_summary(self, file_path: str = None) -> Optional[str]:
+        """write the run summary json (and the cProfile stats next to it), returns the summary path"""
+        if not self.enabled:
+            return None
+
+        time_now = datetime.now()
+        path = file_path or os.path.join(RUN_SUMMARY_FOLDER, f"run_summary_{time_now.day}-{time_now.month}-"
+                                                             f"{time_now.year}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        summary = {
+            "created_at": time_now.isoformat(),
+            "stages": {name: asdict(stats) for name, stats in
+                       sorted(self.stages.items(), key=lambda item: -item[1].total_s)},
+            "slowest_descriptions": [{"seconds": seconds, "description": description}
+                                     for seconds, description in sorted(self._slowest, reverse=True)],
+        }
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            profile_path = f"{os.path.splitext(path)[0]}.prof"
+            self._profiler.dump_stats(profile_path)
+            top = io.StringIO()
+            pstats.Stats(self._profiler, stream=top).sort_stats("cumulative").print_stats(30)
+            summary["profile"] = {"file": profile_path, "top_cumulative": top.getvalue()}
+            self._profiler = None
+
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        return path
+
+
+class _StageTimer:
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation: Instrumentation, name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._instrumentation.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get("JOBHUNT_INSTRUMENT") == "1"
+                                          or os.environ.get("JOBHUNT_PROFILE") == "1",
+                                  profile=os.environ.get("JOBHUNT_PROFILE") == "1")
+
+
+def stage(name: str):
+    """with stage("scrape"): ... records the wall time of the block when instrumentation is on"""
+    return INSTRUMENTATION.stage(name)
+
+
+def timed(name: str):
+    """decorator version of stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not INSTRUMENTATION.enabled:
+                return func(*args, **kwargs)
+            with _StageTimer(INSTRUMENTATION, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
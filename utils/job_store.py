@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import time
+import zlib
+from typing import Iterable, Optional
+
+from models.job import Job, StoredJob
+from utils.sqlite_queries import select_in
+
+JOB_STORE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                   "job_store.sqlite")
+
+_JOB_COLUMNS = ["posting_id", "run_id", "first_seen", "last_seen", "company", "title", "location", "url",
+                "level_desc", "is_remote", "rating", "fail_reason", "description"]
+
+
+class JobStore:
+    """Every job we scored, with the keywords it matched per section and the run it was last seen in, so the
+    history can be queried without the old reports (e.g. postings with redis in the requirements, last 90 days,
+    rated over 60 - see query).
+
+    a posting is one row however many runs saw it, a run that sees it again updates it (last_seen, rating...).
+    descriptions are stored zlib compressed and the full text index (sqlite's fts5, when the sqlite build has it)
+    is contentless, so the text isn't stored twice
+    """
+
+    def __init__(self, file_path: str = None):
+        path = file_path or JOB_STORE_FILE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # the run record adds jobs to unless it's given one (see start_run)
+        self.run_id: Optional[int] = None
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id INTEGER PRIMARY KEY, command TEXT NOT NULL, started_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id INTEGER PRIMARY KEY, posting_id TEXT NOT NULL UNIQUE, run_id INTEGER NOT NULL, "
+            "first_seen REAL NOT NULL, last_seen REAL NOT NULL, company TEXT, title TEXT, location TEXT, url TEXT, "
+            "level_desc TEXT, is_remote INTEGER, rating REAL NOT NULL, fail_reason TEXT, description BLOB);"
+            "CREATE INDEX IF NOT EXISTS jobs_company ON jobs (company COLLATE NOCASE);"
+            "CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);"
+            "CREATE INDEX IF NOT EXISTS jobs_rating ON jobs (rating);"
+            "CREATE INDEX IF NOT EXISTS jobs_run_id ON jobs (run_id);"
+            # keyword first so "every job with this keyword (in this section)" is a range of the primary key.
+            # weight is the keyword's weight when the job was scored (the values of matched_by_section)
+            "CREATE TABLE IF NOT EXISTS job_keywords ("
+            "keyword TEXT NOT NULL, section TEXT NOT NULL, job_id INTEGER NOT NULL, weight INTEGER NOT NULL, "
+            "PRIMARY KEY (keyword, section, job_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS job_keywords_job_id ON job_keywords (job_id);"
+        )
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_text USING fts5(title, description, content='')"
+            )
+            self.has_full_text = True
+        except sqlite3.OperationalError:
+            # sqlite built without fts5, everything but query(text=...) works
+            self.has_full_text = False
+        self._conn.commit()
+
+    def start_run(self, command: str) -> int:
+        """start a new run (the one record adds jobs to from now on) and return its id"""
+        self.run_id = self._conn.execute("INSERT INTO runs (command, started_at) VALUES (?, ?)",
+                                         (command, time.time())).lastrowid
+        self._conn.commit()
+        return self.run_id
+
+    def record(self, jobs: Iterable[Job], run_id: int = None):
+        """add the jobs of a run or update the ones we already have, jobs without a posting id or url are skipped"""
+        run_id = self.run_id if run_id is None else run_id
+        if run_id is None:
+            raise ValueError("start_run before recording jobs")
+        jobs = {job.posting_id or job.url: job for job in jobs if job.posting_id or job.url}
+        if not jobs:
+            return
+        now = time.time()
+        known = self._known_jobs(list(jobs))
+
+        if self.has_full_text:
+            # a contentless index only forgets a row when it's given the text it indexed
+            self._conn.executemany(
+                "INSERT INTO jobs_text (jobs_text, rowid, title, description) VALUES ('delete', ?, ?, ?)",
+                [(job_id, title, _decompress(description)) for job_id, title, description in known.values()]
+            )
+        self._conn.executemany(
+            "INSERT INTO jobs (posting_id, run_id, first_seen, last_seen, company, title, location, url, level_desc, "
+            "is_remote, rating, fail_reason, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(posting_id) DO UPDATE SET "
+            "run_id = excluded.run_id, last_seen = excluded.last_seen, company = excluded.company, "
+            "title = excluded.title, location = excluded.location, url = excluded.url, "
+            "level_desc = excluded.level_desc, is_remote = excluded.is_remote, rating = excluded.rating, "
+            "fail_reason = excluded.fail_reason, description = excluded.description",
+            [(posting_id, run_id, now, now, job.company, job.title, job.location, job.url, job.level_desc,
+              job.is_remote, job.rating, job.fail_reason, _compress(job.desc))
+             for posting_id, job in jobs.items()]
+        )
+
+        job_ids = {posting_id: job_id for posting_id, (job_id, _, _) in self._known_jobs(list(jobs)).items()}
+        self._conn.executemany("DELETE FROM job_keywords WHERE job_id = ?",
+                               [(job_id,) for job_id, _, _ in known.values()])
+        self._conn.executemany(
+            "INSERT INTO job_keywords (keyword, section, job_id, weight) VALUES (?, ?, ?, ?)",
+            [(keyword, section, job_ids[posting_id], weight) for posting_id, job in jobs.items()
+             for section, matched in job.matched_by_section.items() for keyword, weight in matched.items()]
+        )
+        if self.has_full_text:
+            self._conn.executemany(
+                "INSERT INTO jobs_text (rowid, title, description) VALUES (?, ?, ?)",
+                [(job_ids[posting_id], job.title, job.desc) for posting_id, job in jobs.items()]
+            )
+        self._conn.commit()
+
+    def query(self, keyword: str = None, section: str = None, company: str = None, since_days: float = None,
+              min_rating: float = None, text: str = None, passed_gates: bool = None,
+              limit: int = None) -> list[StoredJob]:
+        """the stored jobs that match every filter given, best rated first.
+        keyword (optionally only in section) is a scoring keyword the job matched, company is case insensitive,
+        since_days is on the last time a run saw the job and text is an fts5 match on the title and description"""
+        where, params = [], []
+        if keyword is not None:
+            if section is not None:
+                where.append("job_id IN (SELECT job_id FROM job_keywords WHERE keyword = ? AND section = ?)")
+                params += [keyword, section]
+            else:
+                where.append("job_id IN (SELECT job_id FROM job_keywords WHERE keyword = ?)")
+                params.append(keyword)
+        elif section is not None:
+            raise ValueError("section only filters a keyword")
+        if company is not None:
+            where.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if since_days is not None:
+            where.append("last_seen >= ?")
+            params.append(time.time() - since_days * 24 * 60 * 60)
+        if min_rating is not None:
+            where.append("rating >= ?")
+            params.append(min_rating)
+        if passed_gates is not None:
+            where.append("fail_reason IS NULL" if passed_gates else "fail_reason IS NOT NULL")
+        if text is not None:
+            if not self.has_full_text:
+                raise ValueError("full text search needs a sqlite build with fts5")
+            where.append("job_id IN (SELECT rowid FROM jobs_text WHERE jobs_text MATCH ?)")
+            params.append(text)
+
+        sql = f"SELECT job_id, {', '.join(_JOB_COLUMNS)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY rating DESC, job_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._conn.execute(sql, params).fetchall()
+
+        matched = self._matched_by_section([row[0] for row in rows])
+        return [
+            StoredJob(*row[1:10], None if row[10] is None else bool(row[10]), row[11], row[12], _decompress(row[13]),
+                      matched.get(row[0], {}))
+            for row in rows
+        ]
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def _known_jobs(self, posting_ids: list[str]) -> dict[str, tuple[int, Optional[str], Optional[bytes]]]:
+        """posting id -> (job id, title, compressed description) of the postings we already have"""
+        rows = select_in(self._conn, "SELECT posting_id, job_id, title, description FROM jobs "
+                                     "WHERE posting_id IN ({placeholders})", posting_ids)
+        return {posting_id: (job_id, title, description) for posting_id, job_id, title, description in rows}
+
+    def _matched_by_section(self, job_ids: list[int]) -> dict[int, dict[str, dict[str, int]]]:
+        matched: dict[int, dict[str, dict[str, int]]] = {}
+        rows = select_in(self._conn, "SELECT job_id, section, keyword, weight FROM job_keywords "
+                                     "WHERE job_id IN ({placeholders})", job_ids)
+        for job_id, section, keyword, weight in rows:
+            matched.setdefault(job_id, {}).setdefault(section, {})[keyword] = weight
+        return matched
+
+
+def _compress(text: Optional[str]) -> Optional[bytes]:
+    return zlib.compress(text.encode()) if isinstance(text, str) else None
+
+
+def _decompress(data: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(data).decode() if data is not None else None
@@ -0,0 +1,71 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Iterable
+
+from utils.sqlite_queries import select_in
+
+SCORE_CACHE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                     "score_cache.sqlite")
+
+
+class ScoreCache:
+    """On disk cache of scoring results, the values are anything json serializable.
+
+    the keys are built by the caller (services/job_analysis uses the description hash + the config fingerprint)
+    so a config change simply stops hitting the old entries and they get evicted by age/size later.
+    """
+
+    def __init__(self, file_path: str = None, max_entries: int = 50_000, max_age_days: float = 90):
+        path = file_path or SCORE_CACHE_FILE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, Any] = {
+            key: json.loads(value)
+            for key, value in select_in(self._conn, "SELECT key, value FROM scores WHERE key IN ({placeholders})", keys)
+        }
+
+        if found:
+            now = time.time()
+            self._conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: dict[str, Any]):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO scores (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(value), now, now) for key, value in items.items()]
+        )
+        self._conn.commit()
+
+    def evict(self) -> int:
+        """remove entries not used in max_age_days and then the least recently used ones above max_entries,
+        returns how many entries were removed"""
+        removed = self._conn.execute("DELETE FROM scores WHERE last_used < ?",
+                                     (time.time() - self.max_age_days * 24 * 60 * 60,)).rowcount
+        removed += self._conn.execute(
+            "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        self._conn.commit()
+        return removed
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from typing import Optional
+
+from pandas import DataFrame
+
+from utils.sqlite_queries import select_in
+
+SEEN_POSTINGS_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backup_results",
+                                       "seen_postings.sqlite")
+
+_POSTING_ID_PATTERNS = [
+    (re.compile(r"linkedin\.com/jobs/view/(?:[^/?#]*-)?(\d+)"), "li"),
+    (re.compile(r"indeed\.[a-z.]+/.*[?&]jk=([0-9a-f]+)"), "in"),
+]
+
+
+def canonical_posting_id(job_url: str, posting_id: Optional[str] = None) -> str:
+    """the id jobspy gives the posting (li-123, in-abc), if we don't have one we try to take it from the url
+    and fall back to the url itself ("" when there is no url either)"""
+    if isinstance(posting_id, str) and posting_id:
+        return posting_id
+    # a missing url comes back as nan
+    if not isinstance(job_url, str):
+        return ""
+    for pattern, site in _POSTING_ID_PATTERNS:
+        match = pattern.search(job_url)
+        if match:
+            return f"{site}-{match.group(1)}"
+    return job_url
+
+
+def description_hash(description) -> str:
+    # descriptions that failed to scrape come back as nan
+    text = description if isinstance(description, str) else ""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class SeenPostings:
+    """Index of the postings we already scored, so a run only works on new postings
+    (or postings whose description changed since we saw them)"""
+
+    def __init__(self, file_path: str = None):
+        path = file_path or SEEN_POSTINGS_FILE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "posting_id TEXT PRIMARY KEY, job_url TEXT NOT NULL, description_hash TEXT NOT NULL, "
+            "first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_job_url ON postings (job_url)")
+        self._conn.commit()
+
+    def filter_new(self, jobs_data: DataFrame) -> DataFrame:
+        """drop the postings we already saw with the same description, a posting without an id or url is kept"""
+        if jobs_data.empty:
+            return jobs_data
+
+        keys = self._posting_keys(jobs_data)
+        known_by_id = self._lookup("posting_id", [posting_id for posting_id, _, _ in keys if posting_id])
+        known_by_url = self._lookup("job_url", [job_url for _, job_url, _ in keys if job_url])
+
+        is_new = [
+            not posting_id or known_by_id.get(posting_id, known_by_url.get(job_url)) != desc_hash
+            for posting_id, job_url, desc_hash in keys
+        ]
+        return jobs_data[is_new]
+
+    def mark_seen(self, jobs_data: DataFrame):
+        """postings without an id or url can't be looked up again, they are not marked"""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT INTO postings (posting_id, job_url, description_hash, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(posting_id) DO UPDATE SET "
+            "job_url = excluded.job_url, description_hash = excluded.description_hash, last_seen = excluded.last_seen",
+            [(posting_id, job_url, desc_hash, now, now) for posting_id, job_url, desc_hash in
+             self._posting_keys(jobs_data) if posting_id]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _posting_keys(jobs_data: DataFrame) -> list[tuple[str, str, str]]:
+        ids = jobs_data["id"] if "id" in jobs_data.columns else [None] * len(jobs_data)
+        return [
+            (canonical_posting_id(job_url, posting_id), job_url if isinstance(job_url, str) else "",
+             description_hash(desc))
+            for posting_id, job_url, desc in zip(ids, jobs_data["job_url"], jobs_data["description"])
+        ]
+
+    def _lookup(self, column: str, values: list[str]) -> dict[str, str]:
+        return dict(select_in(
+            self._conn, f"SELECT {column}, description_hash FROM postings WHERE {column} IN ({{placeholders}})",
+            list(dict.fromkeys(values))
+        ))
@@ -0,0 +1,13 @@
+import sqlite3
+from typing import Iterator
+
+# sqlite has a limit on the number of "?" in one query
+MAX_QUERY_PARAMS = 500
+
+
+def select_in(conn: sqlite3.Connection, sql: str, values: list) -> Iterator[tuple]:
+    """the rows of sql for every value, sql has one "{placeholders}" where the IN list goes
+    (e.g. "SELECT key, value FROM scores WHERE key IN ({placeholders})"), values are sent MAX_QUERY_PARAMS at a time"""
+    for i in range(0, len(values), MAX_QUERY_PARAMS):
+        chunk = values[i:i + MAX_QUERY_PARAMS]
+        yield from conn.execute(sql.format(placeholders=",".join("?" * len(chunk))), chunk)